@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Apply a delta update package to an extracted offline package.
+
+Shipped inside every update archive built with --delta-from, next to
+apply_update.bat. Uses only the standard library, so any Python 3 on the
+offline machine can run it:
+
+    apply_update.bat C:\\path\\to\\extracted\\package
+    python apply_update.py C:\\path\\to\\extracted\\package
+
+Before anything is touched, every file the update changes or deletes is
+checked against the hash it had in the build the update was made from.
+Running it again after an interruption is safe: files that already have
+their new content are accepted as well.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import sys
+from pathlib import Path
+
+UPDATE_MANIFEST = "update_manifest.json"
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def check_base(install_dir: Path, manifest: dict) -> list:
+    """Return the files of the install that match neither the old nor the new build."""
+    problems = []
+    for rel, base_digest in manifest["base"].items():
+        path = install_dir / rel
+        if not path.is_file():
+            # Deleted files may already be gone; changed files must exist
+            if rel not in manifest["deleted"]:
+                problems.append(f"missing: {rel}")
+            continue
+        digest = file_sha256(path)
+        if digest != base_digest and digest != manifest["files"].get(rel):
+            problems.append(f"modified: {rel}")
+    return problems
+
+
+def apply(update_dir: Path, install_dir: Path, manifest: dict):
+    for rel, digest in sorted(manifest["files"].items()):
+        src = update_dir / "files" / rel
+        if file_sha256(src) != digest:
+            raise RuntimeError(f"Corrupt file in update package: {rel}")
+        dst = install_dir / rel
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        tmp = dst.with_name(dst.name + ".update-tmp")
+        shutil.copy2(src, tmp)
+        os.replace(tmp, dst)
+
+    for rel in manifest["deleted"]:
+        try:
+            os.remove(install_dir / rel)
+        except FileNotFoundError:
+            pass
+
+
+def verify(install_dir: Path, manifest: dict) -> list:
+    return [rel for rel, digest in sorted(manifest["files"].items())
+            if file_sha256(install_dir / rel) != digest]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Apply an auto-python-toolkit update package")
+    parser.add_argument("install_dir", nargs="?", default=".", help="Extracted package to update")
+    parser.add_argument("--force", action="store_true",
+                        help="Apply even if the install does not match the expected build")
+    args = parser.parse_args()
+
+    update_dir = Path(__file__).resolve().parent
+    install_dir = Path(args.install_dir).resolve()
+    with open(update_dir / UPDATE_MANIFEST, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    print(f"Updating {install_dir}")
+    print(f"  from {manifest['from']}")
+    print(f"  to   {manifest['to']}")
+
+    problems = check_base(install_dir, manifest)
+    if problems and not args.force:
+        print("The install does not match the build this update was made for:")
+        for line in problems:
+            print(f"  {line}")
+        print("Nothing was changed. Use --force to apply anyway.")
+        sys.exit(1)
+
+    apply(update_dir, install_dir, manifest)
+    failed = verify(install_dir, manifest)
+    if failed:
+        print("Hash check failed after updating:")
+        for rel in failed:
+            print(f"  {rel}")
+        sys.exit(1)
+
+    print(f"Done: {len(manifest['files'])} files written, {len(manifest['deleted'])} removed.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,494 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import struct
+import threading
+import time
+import zipfile
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Collection, Dict, Iterable, Optional
+
+from import_cache import RACY_WINDOW_NS
+
+# Compression methods selectable for the package archive. Only store and
+# deflate can be extracted by Windows Explorer on every supported Windows.
+COMPRESSION_METHODS = {
+    "store": zipfile.ZIP_STORED,
+    "deflate": zipfile.ZIP_DEFLATED,
+    "lzma": zipfile.ZIP_LZMA,
+}
+# zipfile supports Zstandard members from Python 3.14
+if hasattr(zipfile, "ZIP_ZSTANDARD"):
+    COMPRESSION_METHODS["zstd"] = zipfile.ZIP_ZSTANDARD
+
+# Valid --level values of the methods that take one; zipfile ignores the
+# level for store and lzma
+LEVEL_RANGES = {
+    "deflate": (0, 9),
+    "zstd": (1, 22),
+}
+
+# Payloads that are already compressed; recompressing them only burns CPU
+STORED_SUFFIXES = {
+    ".whl", ".zip", ".egg", ".pyz", ".jar",
+    ".gz", ".tgz", ".bz2", ".xz", ".lzma", ".zst", ".7z",
+    ".png", ".jpg", ".jpeg", ".gif", ".webp", ".ico",
+    ".mp3", ".mp4", ".ogg",
+}
+
+# Members that compress to more than this fraction of their size are stored.
+# This catches binaries such as .pyd/.dll files that barely shrink.
+STORE_RATIO = 0.97
+
+# Files above this size are compressed in chunks on the writer thread, so
+# memory use stays bounded no matter how large a single file is
+LARGE_FILE_BYTES = 32 * 1024 * 1024
+
+# Upper bound on file data held in memory by queued compression jobs
+MAX_INFLIGHT_BYTES = 256 * 1024 * 1024
+
+MANIFEST_VERSION = 1
+
+
+def check_level(compression: str, level: Optional[int]):
+    """
+    Check a compression level against the range of its method.
+
+    Raises:
+        ValueError: If the method takes no level or the level is out of range
+    """
+    if level is None:
+        return
+    if compression not in LEVEL_RANGES:
+        raise ValueError(f"--compression {compression} does not take a --level")
+    low, high = LEVEL_RANGES[compression]
+    if not low <= level <= high:
+        raise ValueError(f"--level for {compression} must be between {low} and {high}, not {level}")
+
+
+class _ZipInternals:
+    """
+    The private zipfile API the writer depends on, kept in one place.
+
+    zipfile has no public way to write a member compressed elsewhere, so
+    raw members are appended the way ZipFile.write() does it internally
+    (_writecheck, _didModify, start_dir) and compressors are created with
+    _get_compressor. Checked against CPython 3.11 and 3.13; available()
+    fails clearly should a later version drop any of it.
+    """
+
+    @staticmethod
+    def available() -> bool:
+        return (hasattr(zipfile, "_get_compressor") and hasattr(zipfile.ZipFile, "_writecheck")
+                and hasattr(zipfile.ZipInfo("x"), "_compresslevel"))
+
+    @staticmethod
+    def compressor(method: int, level: Optional[int]):
+        return zipfile._get_compressor(method, level)
+
+    @staticmethod
+    def set_level(zinfo: zipfile.ZipInfo, level: Optional[int]):
+        """Set the level ZipFile.open(zinfo, "w") compresses with."""
+        zinfo._compresslevel = level
+
+    @staticmethod
+    def append_raw(zf: zipfile.ZipFile, zinfo: zipfile.ZipInfo, write_payload: Callable[[object], None]):
+        """
+        Append a member whose CRC, sizes and compress_type are already set;
+        write_payload is called with the archive's file object to write the
+        compressed data.
+        """
+        if zinfo.compress_type == zipfile.ZIP_LZMA:
+            # Compressed data includes an end-of-stream marker
+            zinfo.flag_bits |= 0x02
+        zip64 = zinfo.file_size > zipfile.ZIP64_LIMIT or zinfo.compress_size > zipfile.ZIP64_LIMIT
+        zf.fp.seek(zf.start_dir)
+        zinfo.header_offset = zf.fp.tell()
+        zf._writecheck(zinfo)
+        zf._didModify = True
+        zf.fp.write(zinfo.FileHeader(zip64))
+        write_payload(zf.fp)
+        zf.filelist.append(zinfo)
+        zf.NameToInfo[zinfo.filename] = zinfo
+        zf.start_dir = zf.fp.tell()
+
+
+def _compress_member(data: bytes, method: int, level: Optional[int]):
+    """Compress one member; runs on a worker thread (zlib and lzma release the GIL)."""
+    crc = zlib.crc32(data)
+    if method != zipfile.ZIP_STORED:
+        compressor = _ZipInternals.compressor(method, level)
+        payload = compressor.compress(data) + compressor.flush()
+        if len(payload) < len(data) * STORE_RATIO:
+            return crc, payload, method
+    return crc, data, zipfile.ZIP_STORED
+
+
+def load_manifest(manifest_path: Path, archive_path: Path) -> Optional[Dict]:
+    """Return the manifest written for an archive, or None if it no longer describes it."""
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+        st = Path(archive_path).stat()
+        if (manifest.get("version") != MANIFEST_VERSION
+                or manifest["archive"] != {"size": st.st_size, "mtime_ns": st.st_mtime_ns}):
+            return None
+        return manifest
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+class _PreviousArchive:
+    """
+    Read access to the compressed members of the archive built last time,
+    so members whose source did not change can be copied without
+    recompressing them.
+    """
+
+    def __init__(self, archive_path: Path, manifest: Dict):
+        with zipfile.ZipFile(archive_path) as zf:
+            self.infos = {info.filename: info for info in zf.infolist()}
+        self.files = manifest["files"]
+        self.created_ns = manifest["created_ns"]
+        self.fp = open(archive_path, "rb")
+        self.lock = threading.Lock()
+
+    def entry_for(self, arcname: str) -> Optional[Dict]:
+        entry = self.files.get(arcname)
+        info = self.infos.get(arcname)
+        if entry is None or info is None or info.flag_bits & 0x01 or info.file_size != entry["size"]:
+            return None
+        return entry
+
+    def trusted(self, entry: Dict, st: os.stat_result) -> bool:
+        """Whether a file is known unchanged from its stat alone, as in ImportCache."""
+        return (entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and st.st_mtime_ns < self.created_ns - RACY_WINDOW_NS)
+
+    def _data_offset(self, info: zipfile.ZipInfo) -> int:
+        self.fp.seek(info.header_offset)
+        header = self.fp.read(zipfile.sizeFileHeader)
+        name_len, extra_len = struct.unpack("<HH", header[26:30])
+        return info.header_offset + zipfile.sizeFileHeader + name_len + extra_len
+
+    def read_raw(self, arcname: str):
+        """Return (crc, compressed payload, method) of a member."""
+        info = self.infos[arcname]
+        with self.lock:
+            self.fp.seek(self._data_offset(info))
+            payload = self.fp.read(info.compress_size)
+        return info.CRC, payload, info.compress_type
+
+    def copy_raw(self, arcname: str, dst):
+        """Copy a member's compressed payload to dst in chunks."""
+        info = self.infos[arcname]
+        with self.lock:
+            self.fp.seek(self._data_offset(info))
+            remaining = info.compress_size
+            while remaining:
+                chunk = self.fp.read(min(remaining, 1024 * 1024))
+                if not chunk:
+                    raise zipfile.BadZipFile(f"Truncated member in previous archive: {arcname}")
+                dst.write(chunk)
+                remaining -= len(chunk)
+
+    def close(self):
+        self.fp.close()
+
+
+def _compress_file(src: Path, method: int, level: Optional[int],
+                   previous: Optional[_PreviousArchive] = None, arcname: str = ""):
+    """
+    Read and compress a file. If the previous archive holds a member with the
+    same content, its compressed payload is reused instead.
+
+    Returns:
+        (file size, crc, payload, method, sha256, reused)
+    """
+    with open(src, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if previous is not None:
+        entry = previous.entry_for(arcname)
+        if entry is not None and entry["sha256"] == digest:
+            return (len(data),) + previous.read_raw(arcname) + (digest, True)
+    return (len(data),) + _compress_member(data, method, level) + (digest, False)
+
+
+class ArchiveWriter:
+    """
+    Writes files straight from their original locations into a zip archive,
+    so packaging needs no staging copy of the project or its venv.
+
+    Members are read and compressed in parallel on a thread pool and written
+    in the order they were added, so the archive is deterministic. The
+    archive is built under a temporary name and only moved into place once
+    it is complete.
+
+    With a manifest path, the size, mtime and sha256 of every file are
+    recorded next to the archive. The next build of the same archive copies
+    the compressed members of unchanged files from the previous archive
+    instead of compressing them again.
+    """
+
+    def __init__(self, archive_path: Path, compression: str = "deflate",
+                 level: Optional[int] = None, workers: Optional[int] = None,
+                 manifest_path: Optional[Path] = None):
+        """
+        Args:
+            archive_path: Path of the zip archive to create
+            compression: One of COMPRESSION_METHODS
+            level: Compression level, or None for the method's default;
+                see LEVEL_RANGES
+            workers: Number of compression threads (default: CPU count)
+            manifest_path: Where to keep the file manifest for incremental
+                rebuilds, or None to always compress everything
+        """
+        if compression not in COMPRESSION_METHODS:
+            raise ValueError(f"Unsupported compression method: {compression}")
+        check_level(compression, level)
+        if not _ZipInternals.available():
+            raise RuntimeError("This Python's zipfile module lacks the internals ArchiveWriter needs")
+        self.archive_path = Path(archive_path)
+        self.partial_path = self.archive_path.with_name(self.archive_path.name + ".partial")
+        self.compression = compression
+        self.method = COMPRESSION_METHODS[compression]
+        self.level = level
+        self.workers = workers or os.cpu_count() or 1
+        self.manifest_path = Path(manifest_path) if manifest_path else None
+        self.archive_path.parent.mkdir(parents=True, exist_ok=True)
+        self.created_ns = time.time_ns()
+        self.previous = self._open_previous()
+        self.zip = zipfile.ZipFile(self.partial_path, "w", self.method, allowZip64=True,
+                                   compresslevel=level, strict_timestamps=False)
+        self.executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._queue = deque()
+        self._inflight_bytes = 0
+        self._manifest_files = {}
+        self.file_count = 0
+        self.bytes_in = 0
+        self.reused_count = 0
+        self.reused_bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+    def _open_previous(self) -> Optional[_PreviousArchive]:
+        """Open the previous build of this archive if its manifest still describes it."""
+        if self.manifest_path is None:
+            return None
+        manifest = load_manifest(self.manifest_path, self.archive_path)
+        if manifest is None or manifest["compression"] != self.compression or manifest["level"] != self.level:
+            return None
+        try:
+            return _PreviousArchive(self.archive_path, manifest)
+        except (OSError, KeyError, zipfile.BadZipFile):
+            return None
+
+    def _method_for(self, arcname: str) -> int:
+        if os.path.splitext(arcname)[1].lower() in STORED_SUFFIXES:
+            return zipfile.ZIP_STORED
+        return self.method
+
+    def _enqueue(self, zinfo: zipfile.ZipInfo, future, size: int, entry: Optional[Dict] = None):
+        self._queue.append((zinfo, future, size, entry))
+        self._inflight_bytes += size
+        while self._queue and (self._inflight_bytes > MAX_INFLIGHT_BYTES
+                               or len(self._queue) > self.workers * 16):
+            self._write_next()
+
+    def _write_next(self):
+        zinfo, future, size, entry = self._queue.popleft()
+        self._inflight_bytes -= size
+        if future is None:
+            self.zip.mkdir(zinfo)
+            return
+        file_size, crc, payload, method, digest, reused = future.result()
+        zinfo.file_size = file_size
+        zinfo.compress_type = method
+        zinfo.CRC = crc
+        zinfo.compress_size = len(payload)
+        self._write_raw(zinfo, payload)
+        if entry is not None:
+            entry["sha256"] = digest
+            self._record(zinfo.filename, entry, reused)
+
+    def _record(self, arcname: str, entry: Dict, reused: bool):
+        self._manifest_files[arcname] = entry
+        if reused:
+            self.reused_count += 1
+            self.reused_bytes += entry["size"]
+
+    def _write_raw(self, zinfo: zipfile.ZipInfo, payload: Optional[bytes] = None, copy_from: str = ""):
+        """
+        Append an already-compressed member to the archive, from payload or
+        copied from member copy_from of the previous archive.
+        """
+        if copy_from:
+            _ZipInternals.append_raw(self.zip, zinfo, lambda fp: self.previous.copy_raw(copy_from, fp))
+        else:
+            _ZipInternals.append_raw(self.zip, zinfo, lambda fp: fp.write(payload))
+
+    def _drain(self):
+        while self._queue:
+            self._write_next()
+
+    def add_file(self, src: Path, arcname: str):
+        """Add a single file under the given archive name."""
+        st = os.stat(src)
+        zinfo = zipfile.ZipInfo.from_file(src, arcname, strict_timestamps=False)
+        method = self._method_for(arcname)
+        entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns}
+        previous = self.previous.entry_for(arcname) if self.previous else None
+        self.file_count += 1
+        self.bytes_in += zinfo.file_size
+
+        if previous is not None and self.previous.trusted(previous, st):
+            # Unchanged since the last build: copy its compressed member
+            info = self.previous.infos[arcname]
+            entry["sha256"] = previous["sha256"]
+            if zinfo.file_size > LARGE_FILE_BYTES:
+                self._drain()
+                zinfo.compress_type = info.compress_type
+                zinfo.CRC = info.CRC
+                zinfo.compress_size = info.compress_size
+                self._write_raw(zinfo, copy_from=arcname)
+                self._record(arcname, entry, True)
+                return
+            future = self.executor.submit(
+                lambda: (info.file_size,) + self.previous.read_raw(arcname) + (previous["sha256"], True))
+            self._enqueue(zinfo, future, info.compress_size, entry)
+            return
+
+        if zinfo.file_size > LARGE_FILE_BYTES:
+            # Stream it through zipfile's own compressor to bound memory
+            self._drain()
+            zinfo.compress_type = method
+            _ZipInternals.set_level(zinfo, self.level)
+            digest = hashlib.sha256()
+            with open(src, "rb") as f, self.zip.open(zinfo, "w") as dst:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    digest.update(chunk)
+                    dst.write(chunk)
+            entry["sha256"] = digest.hexdigest()
+            self._record(arcname, entry, False)
+            return
+
+        # Changed mtime but possibly the same content: _compress_file checks the hash
+        future = self.executor.submit(_compress_file, src, method, self.level,
+                                      self.previous if previous is not None else None, arcname)
+        self._enqueue(zinfo, future, zinfo.file_size, entry)
+
+    def add_dir(self, arcname: str):
+        """Add an explicit directory entry, so empty directories survive extraction."""
+        zinfo = zipfile.ZipInfo(arcname.rstrip("/") + "/", date_time=time.localtime()[:6])
+        zinfo.external_attr = (0o40775 << 16) | 0x10
+        zinfo.CRC = 0
+        zinfo.compress_size = 0
+        self._enqueue(zinfo, None, 0)
+
+    def add_bytes(self, arcname: str, data: bytes):
+        """Add a generated file from memory."""
+        zinfo = zipfile.ZipInfo(arcname, date_time=time.localtime()[:6])
+        zinfo.external_attr = 0o644 << 16
+        method = self._method_for(arcname)
+        future = self.executor.submit(
+            lambda: (len(data),) + _compress_member(data, method, self.level)
+            + (hashlib.sha256(data).hexdigest(), False))
+        self._enqueue(zinfo, future, len(data), {"size": len(data), "mtime_ns": 0})
+        self.file_count += 1
+        self.bytes_in += len(data)
+
+    def add_tree(self, src_dir: Path, arcname: str, exclude: Iterable[str] = (),
+                 skip_files: Collection[Path] = (),
+                 skip: Optional[Callable[[str, bool], bool]] = None):
+        """
+        Add a directory tree recursively.
+
+        Args:
+            src_dir: Directory to add
+            arcname: Archive path the directory is stored under
+            exclude: Names of top-level entries of src_dir to leave out
+            skip_files: Individual files anywhere in the tree to leave out
+            skip: Called with the path relative to src_dir (using "/") and
+                whether it is a directory; entries it returns True for are
+                left out, directories with all their contents
+        """
+        src_dir = Path(src_dir)
+        exclude = set(exclude)
+        skip_files = set(skip_files)
+        arcname = arcname.rstrip("/")
+        self.add_dir(arcname)
+        for root, dirs, files in os.walk(src_dir):
+            rel_root = os.path.relpath(root, src_dir)
+            if rel_root == ".":
+                dirs[:] = [d for d in dirs if d not in exclude]
+                files = [f for f in files if f not in exclude]
+                prefix = arcname
+                rel_prefix = ""
+            else:
+                rel_prefix = Path(rel_root).as_posix() + "/"
+                prefix = f"{arcname}/{rel_prefix[:-1]}"
+            if skip is not None:
+                dirs[:] = [d for d in dirs if not skip(rel_prefix + d, True)]
+                files = [f for f in files if not skip(rel_prefix + f, False)]
+            dirs.sort()
+            for name in dirs:
+                self.add_dir(f"{prefix}/{name}")
+            for name in sorted(files):
+                if skip_files and Path(root) / name in skip_files:
+                    continue
+                self.add_file(Path(root) / name, f"{prefix}/{name}")
+
+    def close(self):
+        """Finish the archive and move it into place."""
+        try:
+            self._drain()
+        finally:
+            self.executor.shutdown()
+            if self.previous is not None:
+                self.previous.close()
+        self.zip.close()
+        os.replace(self.partial_path, self.archive_path)
+        if self.manifest_path is not None:
+            self._write_manifest()
+
+    def _write_manifest(self):
+        st = self.archive_path.stat()
+        manifest = {
+            "version": MANIFEST_VERSION,
+            "compression": self.compression,
+            "level": self.level,
+            "created_ns": self.created_ns,
+            "archive": {"size": st.st_size, "mtime_ns": st.st_mtime_ns},
+            "files": self._manifest_files,
+        }
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.manifest_path.with_name(f".{self.manifest_path.name}.{os.getpid()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, sort_keys=True)
+        os.replace(tmp, self.manifest_path)
+
+    def abort(self):
+        """Discard a partially written archive."""
+        self.executor.shutdown(cancel_futures=True)
+        self._queue.clear()
+        if self.previous is not None:
+            self.previous.close()
+        self.zip.close()
+        try:
+            os.remove(self.partial_path)
+        except OSError:
+            pass
@@ -0,0 +1,2 @@
+# -*- coding: utf-8 -*-
+"""Offline benchmarks for the toolkit. Run modules with ``python -m benchmarks.<name>``."""
@@ -0,0 +1,126 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare the "fast" (tokenizer) and "ast" import engines.
+
+First checks that both engines return identical imports for generated files
+and for every parseable file of a corpus directory (the running
+interpreter's standard library by default), then times them on large
+generated files.
+
+    python -m benchmarks.bench_import_engines
+    python -m benchmarks.bench_import_engines --corpus path/to/project --size-mb 20
+"""
+
+import argparse
+import ast
+import random
+import sys
+import sysconfig
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+from dependency_analyzer import DependencyAnalyzer
+
+# Snippets covering the import forms both engines must agree on
+SNIPPETS = [
+    "import {m}\n",
+    "import {m}.sub as alias, {n}\n",
+    "from {m} import thing\n",
+    "from {m}.sub import (\n    a,\n    b,\n)\n",
+    "from . import sibling\n",
+    "from .{m} import helper\n",
+    "try:\n    import {m}\nexcept ImportError:\n    {m} = None\n",
+    "if TYPE_CHECKING:\n    from {m} import Typed\n",
+    "if sys.platform == 'win32': import {m}\n",
+    "def f():\n    import {m}; return {m}\n",
+    "x = 1; from {m} import y\n",
+    "s = '''\nimport not_{m}\n'''\n",
+    "# import commented_{m}\n",
+    "v = f\"{{value!r:>10}}\"\n",
+    "def g():\n    yield from range(3)\n",
+    "def h():\n    raise ValueError('x') from None\n",
+    "data = {{'from': 1, 'key': [i for i in range(10)]}}\n",
+    "class C:\n    def method(self, a: int = 1) -> None:\n        return a\n",
+]
+
+MODULES = ["numpy", "requests", "yaml", "flask", "bs4", "attr", "lxml", "pkg_a", "pkg_b"]
+
+
+def generate_source(size_bytes: int, seed: int = 0) -> str:
+    """Generate syntactically valid Python source of roughly the given size."""
+    rng = random.Random(seed)
+    parts = ["import sys\nfrom typing import TYPE_CHECKING\n"]
+    size = len(parts[0])
+    while size < size_bytes:
+        snippet = rng.choice(SNIPPETS).format(m=rng.choice(MODULES), n=rng.choice(MODULES))
+        parts.append(snippet)
+        size += len(snippet)
+    return "".join(parts)
+
+
+def check_equivalence(sources: List[Tuple[str, str]]) -> List[str]:
+    """Return the names of sources on which the two engines disagree."""
+    mismatches = []
+    for name, source in sources:
+        try:
+            ast.parse(source)
+        except (SyntaxError, ValueError):
+            # Engines only promise identical results for valid files
+            continue
+        fast = DependencyAnalyzer._extract_imports(source, "fast")
+        full = DependencyAnalyzer._extract_imports(source, "ast")
+        if fast != full:
+            mismatches.append(f"{name}: fast-only={sorted(fast - full)} ast-only={sorted(full - fast)}")
+    return mismatches
+
+
+def load_corpus(corpus: Path) -> List[Tuple[str, str]]:
+    sources = []
+    for path in sorted(corpus.rglob("*.py")):
+        try:
+            sources.append((str(path), path.read_bytes().decode("utf-8")))
+        except (OSError, UnicodeDecodeError):
+            continue
+    return sources
+
+
+def time_engine(source: str, engine: str, repeat: int) -> float:
+    """Return the best wall time of extracting imports from source."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        DependencyAnalyzer._extract_imports(source, engine)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the fast and ast import engines")
+    parser.add_argument("--corpus", type=Path, default=Path(sysconfig.get_paths()["stdlib"]),
+                        help="Directory of real Python files for the equivalence check")
+    parser.add_argument("--size-mb", type=float, default=10, help="Size of the largest generated file")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repetitions per engine")
+    args = parser.parse_args()
+
+    generated = [(f"generated-{i}", generate_source(20_000, seed=i)) for i in range(200)]
+    corpus = load_corpus(args.corpus) if args.corpus.is_dir() else []
+    mismatches = check_equivalence(generated + corpus)
+    print(f"Equivalence: {len(generated) + len(corpus)} files, {len(mismatches)} mismatches")
+    for line in mismatches:
+        print(f"  {line}")
+
+    print(f"{'size':>10} {'ast (s)':>10} {'fast (s)':>10} {'speedup':>8}")
+    for fraction in (0.1, 0.5, 1.0):
+        source = generate_source(int(args.size_mb * fraction * 1024 * 1024))
+        ast_time = time_engine(source, "ast", args.repeat)
+        fast_time = time_engine(source, "fast", args.repeat)
+        print(f"{len(source) / 1024 / 1024:>8.1f}MB {ast_time:>10.3f} {fast_time:>10.3f} "
+              f"{ast_time / fast_time:>7.1f}x")
+
+    sys.exit(1 if mismatches else 0)
+
+
+if __name__ == "__main__":
+    main()
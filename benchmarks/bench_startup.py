@@ -0,0 +1,158 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Compare interpreter startup with and without the --precompile and
+--zip-site-packages layouts.
+
+Builds three copies of the pure-Python packages of a site-packages
+directory (the running interpreter's by default) and times importing them
+in a fresh interpreter:
+
+    plain        sources only, as packaged without --precompile
+    precompiled  sources plus unchecked-hash pycs in __pycache__
+    zipped       one zipimport bundle holding sources and pycs
+
+A cold run imports from a fresh copy of the layout, like the first run after
+extracting a package; for the plain layout that includes compiling every
+module. Warm runs import from the same copy again.
+
+    python -m benchmarks.bench_startup
+    python -m benchmarks.bench_startup --site-packages venv/Lib/site-packages --modules requests,yaml
+"""
+
+import argparse
+import shutil
+import statistics
+import subprocess
+import sys
+import sysconfig
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from precompile import BUNDLE_NAME, BytecodeCompiler, build_bundle, pure_python_entries
+
+LAYOUTS = ("plain", "precompiled", "zipped")
+
+
+def import_code(path_entry: Path, modules: List[str]) -> str:
+    return f"import sys; sys.path.insert(0, {str(path_entry)!r})\n" + "".join(
+        f"import {name}\n" for name in modules)
+
+
+def run_imports(path_entry: Path, modules: List[str]) -> float:
+    """Return the wall time of a fresh interpreter importing the modules."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, "-I", "-S", "-c", import_code(path_entry, modules)],
+                   check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def module_name(entry: str) -> str:
+    return entry[:-3] if entry.endswith(".py") else entry
+
+
+def copy_plain(site_packages: Path, entries: List[str], plain: Path) -> List[str]:
+    """
+    Copy the entries without bytecode and return those that import cleanly
+    from the copy alone, removing the rest, until all that remain do.
+    """
+    plain.mkdir(parents=True)
+    for entry in entries:
+        src = site_packages / entry
+        if src.is_dir():
+            shutil.copytree(src, plain / entry, ignore=shutil.ignore_patterns("__pycache__"))
+        else:
+            shutil.copy2(src, plain / entry)
+
+    while True:
+        failed = []
+        for entry in entries:
+            try:
+                run_imports(plain, [module_name(entry)])
+            except subprocess.CalledProcessError:
+                failed.append(entry)
+        if not failed:
+            break
+        for entry in failed:
+            path = plain / entry
+            shutil.rmtree(path) if path.is_dir() else path.unlink()
+        entries = [entry for entry in entries if entry not in failed]
+    for path in plain.rglob("__pycache__"):
+        shutil.rmtree(path)
+    return entries
+
+
+def build_templates(plain: Path, entries: List[str], work: Path) -> dict:
+    """Build the other layouts from the plain one; timed runs start from copies of these."""
+    compiler = BytecodeCompiler(sys.executable, "%d.%d" % sys.version_info[:2], work / "bytecode")
+    pycs = compiler.compile_tree(plain)
+
+    precompiled = work / "template-precompiled"
+    shutil.copytree(plain, precompiled)
+    for rel, pyc in pycs.items():
+        parent, _, name = rel.rpartition("/")
+        dst = precompiled / parent / "__pycache__" / f"{name[:-3]}.{compiler.tag}.pyc"
+        dst.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(pyc, dst)
+
+    zipped = work / "template-zipped"
+    zipped.mkdir()
+    build_bundle(zipped / BUNDLE_NAME, plain, entries, pycs)
+    return {"plain": plain, "precompiled": precompiled, "zipped": zipped}
+
+
+def time_layout(template: Path, path_entry: Callable[[Path], Path], modules: List[str],
+                work: Path, runs: int):
+    """Return the median cold and warm import times of a layout."""
+    cold, warm = [], []
+    for i in range(runs):
+        copy = work / f"run-{template.name}-{i}"
+        shutil.copytree(template, copy)
+        cold.append(run_imports(path_entry(copy), modules))
+        warm.append(run_imports(path_entry(copy), modules))
+        shutil.rmtree(copy)
+    return statistics.median(cold), statistics.median(warm)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark startup of the plain, precompiled and zipped layouts")
+    parser.add_argument("--site-packages", type=Path, default=Path(sysconfig.get_paths()["purelib"]),
+                        help="Directory whose pure-Python packages are imported")
+    parser.add_argument("--modules", help="Comma separated packages to import (default: all that import cleanly)")
+    parser.add_argument("--runs", type=int, default=5, help="Cold and warm runs per layout")
+    args = parser.parse_args()
+
+    entries = pure_python_entries(args.site_packages)
+    if args.modules:
+        wanted = set(args.modules.split(","))
+        entries = [entry for entry in entries if module_name(entry) in wanted]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work = Path(tmp)
+        plain = work / "template-plain"
+        entries = copy_plain(args.site_packages, entries, plain)
+        modules = [module_name(entry) for entry in entries]
+        if not modules:
+            print(f"No pure-Python packages to import in {args.site_packages}")
+            sys.exit(1)
+        print(f"Importing {len(modules)} packages from {args.site_packages} "
+              f"with Python {sys.version.split()[0]}")
+        templates = build_templates(plain, entries, work)
+        files = {name: sum(1 for p in path.rglob("*") if p.is_file()) for name, path in templates.items()}
+        results = {}
+        for name in LAYOUTS:
+            entry = (lambda copy: copy / BUNDLE_NAME) if name == "zipped" else (lambda copy: copy)
+            results[name] = time_layout(templates[name], entry, modules, work, args.runs)
+
+    base_cold = results["plain"][0]
+    print(f"{'layout':<12} {'files':>7} {'cold (ms)':>10} {'warm (ms)':>10} {'cold vs plain':>14}")
+    for name in LAYOUTS:
+        cold, warm = results[name]
+        print(f"{name:<12} {files[name]:>7} {cold * 1000:>10.1f} {warm * 1000:>10.1f} "
+              f"{base_cold / cold:>13.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Generate synthetic projects for the benchmarks.
+
+Everything is derived from a seed, so the same settings always produce the
+same project. Nothing is downloaded: third-party imports only name
+packages, and the venv is filled with generated files.
+
+    python -m benchmarks.project_generator /tmp/synthetic --files 2000 --depth 4 --venv-mb 50
+"""
+
+import argparse
+import json
+import random
+from pathlib import Path
+from typing import Dict, List
+
+THIRD_PARTY = ["numpy", "requests", "yaml", "flask", "bs4", "attr", "lxml", "pandas", "click", "jinja2"]
+STDLIB = ["os", "sys", "json", "re", "collections", "itertools", "pathlib", "typing", "logging"]
+
+FILLER = [
+    "value_{n} = {n} * 2\n",
+    "def function_{n}(a, b={n}):\n    total = a + b\n    return total * {n}\n\n",
+    "class Model{n}:\n    def __init__(self):\n        self.items = [i for i in range({n})]\n\n"
+    "    def size(self):\n        return len(self.items)\n\n",
+    "MESSAGE_{n} = '''\nimport not_a_module_{n}\n'''\n",
+    "# from commented_{n} import nothing\n",
+    "mapping_{n} = {{'key': {n}, 'from': 'import'}}\n",
+]
+
+# Appended to a file to make it fail to parse
+SYNTAX_ERROR = "def broken(:\n    pass\n"
+
+
+def _import_line(rng: random.Random, local_modules: List[str]) -> str:
+    pool = rng.choice([THIRD_PARTY, STDLIB, local_modules or STDLIB])
+    name = rng.choice(pool)
+    return rng.choice([f"import {name}\n", f"from {name} import thing\n",
+                       f"try:\n    import {name}\nexcept ImportError:\n    {name} = None\n"])
+
+
+def generate_source(rng: random.Random, size: int, import_density: float, local_modules: List[str]) -> str:
+    """Generate Python source of roughly the given size in which about
+    import_density of the statements are imports."""
+    parts = []
+    length = 0
+    n = 0
+    while length < size:
+        if rng.random() < import_density:
+            chunk = _import_line(rng, local_modules)
+        else:
+            chunk = rng.choice(FILLER).format(n=n)
+        parts.append(chunk)
+        length += len(chunk)
+        n += 1
+    return "".join(parts)
+
+
+def script_block(dependencies: List[str]) -> str:
+    """Return a PEP 723 inline script metadata block."""
+    lines = ["# /// script", '# requires-python = ">=3.8"', "# dependencies = ["]
+    lines.extend(f'#   "{dep}",' for dep in dependencies)
+    lines.extend(["# ]", "# ///", ""])
+    return "\n".join(lines)
+
+
+def generate_venv(venv: Path, size_bytes: int, rng: random.Random) -> int:
+    """
+    Fill a fake Windows venv with packages of generated files: half Python
+    source, which compresses well, and half random bytes standing in for
+    extension modules, which does not.
+
+    Returns:
+        Number of files written
+    """
+    site_packages = venv / "Lib" / "site-packages"
+    site_packages.mkdir(parents=True, exist_ok=True)
+    (venv / "Scripts").mkdir(exist_ok=True)
+    (venv / "pyvenv.cfg").write_text("home = C:\\Python311\nversion = 3.11.11\n")
+    count = 1
+    written = 0
+    package = 0
+    while written < size_bytes:
+        pkg_dir = site_packages / f"fakepkg{package}"
+        pkg_dir.mkdir(exist_ok=True)
+        for i in range(20):
+            if written >= size_bytes:
+                break
+            size = rng.randint(2_000, 60_000)
+            if i % 2:
+                (pkg_dir / f"_ext{i}.pyd").write_bytes(rng.randbytes(size))
+            else:
+                (pkg_dir / f"module{i}.py").write_text(generate_source(rng, size, 0.05, []))
+            written += size
+            count += 1
+        package += 1
+    return count
+
+
+def generate_project(root: Path, files: int = 500, depth: int = 3, file_kb: float = 4.0,
+                     import_density: float = 0.1, syntax_error_ratio: float = 0.0,
+                     venv_mb: float = 0.0, seed: int = 0, script_metadata: bool = False) -> Dict:
+    """
+    Generate a project under root.
+
+    Args:
+        root: Directory to create the project in; must not exist or be empty
+        files: Number of Python files, including main.py and __init__.py files
+        depth: Maximum package nesting depth
+        file_kb: Average file size in KB; sizes vary between half and 1.5 times this
+        import_density: Fraction of statements that are imports
+        syntax_error_ratio: Fraction of files that do not parse
+        venv_mb: Size of the fake venv/ in MB (0: no venv)
+        seed: Random seed
+        script_metadata: Start main.py with a PEP 723 script block; the
+            analysis then takes the dependencies from it and reads no other file
+
+    Returns:
+        A summary dict with the settings and the number of files and bytes written
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+
+    dependencies = rng.sample(THIRD_PARTY, 4)
+    main = script_block(dependencies) if script_metadata else ""
+    main += generate_source(rng, int(file_kb * 1024), import_density, [])
+    (root / "main.py").write_text(main)
+    written_files, written_bytes = 1, len(main)
+
+    local_modules: List[str] = []
+    packages = [Path(".")]
+    while written_files < files:
+        parent = rng.choice(packages)
+        if len(parent.parts) < depth and rng.random() < 0.1:
+            package = parent / f"pkg{len(packages)}"
+            (root / package).mkdir(parents=True, exist_ok=True)
+            (root / package / "__init__.py").write_text("")
+            packages.append(package)
+            written_files += 1
+            continue
+        module = f"mod{written_files}"
+        size = int(file_kb * 1024 * rng.uniform(0.5, 1.5))
+        source = generate_source(rng, size, import_density, local_modules)
+        if rng.random() < syntax_error_ratio:
+            source += SYNTAX_ERROR
+        (root / parent / f"{module}.py").write_text(source)
+        dotted = ".".join(parent.parts + (module,)) if parent.parts else module
+        local_modules.append(dotted)
+        written_files += 1
+        written_bytes += len(source)
+
+    venv_files = generate_venv(root / "venv", int(venv_mb * 1024 * 1024), rng) if venv_mb else 0
+
+    return {
+        "files": files,
+        "depth": depth,
+        "file_kb": file_kb,
+        "import_density": import_density,
+        "syntax_error_ratio": syntax_error_ratio,
+        "venv_mb": venv_mb,
+        "seed": seed,
+        "script_metadata": script_metadata,
+        "python_files": written_files,
+        "python_bytes": written_bytes,
+        "venv_files": venv_files,
+    }
+
+
+def add_arguments(parser: argparse.ArgumentParser):
+    """Add the generator settings to a command line parser."""
+    parser.add_argument("--files", type=int, default=500, help="Number of Python files")
+    parser.add_argument("--depth", type=int, default=3, help="Maximum package nesting depth")
+    parser.add_argument("--file-kb", type=float, default=4.0, help="Average file size in KB")
+    parser.add_argument("--import-density", type=float, default=0.1, help="Fraction of statements that are imports")
+    parser.add_argument("--syntax-error-ratio", type=float, default=0.0, help="Fraction of files that do not parse")
+    parser.add_argument("--venv-mb", type=float, default=10.0, help="Size of the fake venv in MB")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument("--script-metadata", action="store_true",
+                        help="Start main.py with a PEP 723 script block (analysis then reads only main.py)")
+
+
+def settings_from_args(args: argparse.Namespace) -> Dict:
+    return {
+        "files": args.files,
+        "depth": args.depth,
+        "file_kb": args.file_kb,
+        "import_density": args.import_density,
+        "syntax_error_ratio": args.syntax_error_ratio,
+        "venv_mb": args.venv_mb,
+        "seed": args.seed,
+        "script_metadata": args.script_metadata,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic project for benchmarking")
+    parser.add_argument("root", type=Path, help="Directory to create")
+    add_arguments(parser)
+    args = parser.parse_args()
+    print(json.dumps(generate_project(args.root, **settings_from_args(args)), indent=2))
+
+
+if __name__ == "__main__":
+    main()
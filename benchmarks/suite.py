@@ -0,0 +1,251 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Benchmark the scan, analysis, script metadata and packaging stages on a
+generated project, store the results as JSON and compare two result files.
+
+    python -m benchmarks.suite run --files 2000 --venv-mb 50 --output base.json
+    ... change something ...
+    python -m benchmarks.suite run --files 2000 --venv-mb 50 --output new.json
+    python -m benchmarks.suite compare base.json new.json --threshold 10
+
+compare exits with status 1 if any benchmark got slower than the threshold,
+so it can gate a CI job. Everything runs offline on generated data.
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+from benchmarks.project_generator import THIRD_PARTY, add_arguments, generate_project, script_block, settings_from_args
+from dependency_analyzer import DependencyAnalyzer
+from import_cache import ImportCache
+from project_walker import ProjectWalker
+
+RESULTS_VERSION = 1
+
+# Target used for packaging benchmarks; only its name ends up in the archive
+PACKAGE_TARGET = ("Windows 10 (64-bit)", "3.11.11")
+
+
+def bench_scan(project: Path, work: Path, jobs: int) -> Callable[[], None]:
+    return lambda: ProjectWalker(project).find_python_files()
+
+
+def _analyze(project: Path, cache_path: Optional[Path], jobs: int) -> Callable[..., None]:
+    python_files = ProjectWalker(project).find_python_files()
+    # Main files may already have been read while looking for a script block
+    main_files = {project / name for name in ("main.py", "__main__.py", "app.py")}
+    expected = len(python_files) - len(main_files.intersection(python_files))
+
+    def run(check_parsed: bool = False):
+        cache = ImportCache(cache_path, project) if cache_path else None
+        try:
+            analyzer = DependencyAnalyzer(cache, jobs=jobs)
+            analyzer.analyze_project(project, python_files)
+        finally:
+            if cache is not None:
+                cache.close()
+        # A run that skips files, e.g. by stopping at a script block, would measure nothing
+        if check_parsed and analyzer.parsed_files < expected:
+            raise RuntimeError(f"The analysis parsed {analyzer.parsed_files} of {len(python_files)} files; "
+                               f"generate the project without --script-metadata")
+    return run
+
+
+def bench_analyze_cold(project: Path, work: Path, jobs: int) -> Callable[[], None]:
+    run = _analyze(project, None, jobs)
+    return lambda: run(check_parsed=True)
+
+
+def bench_analyze_warm(project: Path, work: Path, jobs: int) -> Callable[[], None]:
+    cache_path = work / "import_cache.sqlite"
+    run = _analyze(project, cache_path, jobs)
+    run(check_parsed=True)  # Fill the cache; timed runs then answer every file from it
+    return run
+
+
+def bench_script_metadata(project: Path, work: Path, jobs: int) -> Callable[[], None]:
+    python_files = ProjectWalker(project).find_python_files()
+    # One file with a script block, so the block parser runs too
+    script = work / "script.py"
+    script.write_text(script_block(THIRD_PARTY[:4]) + "print('script')\n")
+    python_files.append(script)
+
+    def run():
+        # A fresh analyzer each run, since analyzers remember the files they have read
+        analyzer = DependencyAnalyzer()
+        return [analyzer.extract_script_dependencies(path) for path in python_files]
+    return run
+
+
+def _package(project: Path, work: Path, jobs: int, staging: bool) -> Callable[[], None]:
+    from main import AutoPythonToolkit
+
+    previous = Path.cwd()
+    os.chdir(project)
+    try:
+        toolkit = AutoPythonToolkit(lang="en", use_cache=False, jobs=jobs, staging=staging,
+                                    dedupe=False, incremental=False)
+    finally:
+        os.chdir(previous)
+
+    def run():
+        shutil.rmtree(toolkit.output_dir, ignore_errors=True)
+        with open(os.devnull, "w") as log:
+            if not toolkit.package_project(*PACKAGE_TARGET, project / "venv", log):
+                raise RuntimeError("Packaging failed")
+    return run
+
+
+def bench_package(project: Path, work: Path, jobs: int) -> Callable[[], None]:
+    return _package(project, work, jobs, staging=False)
+
+
+def bench_package_staged(project: Path, work: Path, jobs: int) -> Callable[[], None]:
+    return _package(project, work, jobs, staging=True)
+
+
+# name: factory returning the function to time; setup happens in the factory
+BENCHMARKS: Dict[str, Callable[[Path, Path, int], Callable[[], None]]] = {
+    "scan": bench_scan,
+    "analyze_cold": bench_analyze_cold,
+    "analyze_warm": bench_analyze_warm,
+    "script_metadata": bench_script_metadata,
+    "package": bench_package,
+    "package_staged": bench_package_staged,
+}
+
+
+def time_runs(func: Callable[[], None], repeat: int) -> Dict:
+    runs = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        runs.append(time.perf_counter() - start)
+    return {
+        "min_s": round(min(runs), 6),
+        "median_s": round(statistics.median(runs), 6),
+        "runs_s": [round(r, 6) for r in runs],
+    }
+
+
+def run_suite(settings: Dict, names: List[str], repeat: int, jobs: int) -> Dict:
+    """Generate a project with the given settings and time the named benchmarks on it."""
+    with tempfile.TemporaryDirectory(prefix="apt-bench-") as tmp:
+        project = Path(tmp) / "project"
+        print(f"Generating project: {json.dumps(settings)}", flush=True)
+        summary = generate_project(project, **settings)
+        results = {}
+        for name in names:
+            work = Path(tmp) / f"work-{name}"
+            work.mkdir()
+            func = BENCHMARKS[name](project, work, jobs)
+            results[name] = time_runs(func, repeat)
+            print(f"  {name:<16} median {results[name]['median_s']:.3f}s  "
+                  f"min {results[name]['min_s']:.3f}s", flush=True)
+
+    return {
+        "version": RESULTS_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "environment": {
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "jobs": jobs,
+        },
+        "project": summary,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(base: Dict, new: Dict, threshold: float, min_delta: float = 0.0) -> List[str]:
+    """
+    Compare the median times of two result files.
+
+    Args:
+        base: Results to compare against
+        new: Results of the change
+        threshold: Slowdown in percent that counts as a regression
+        min_delta: Slowdowns of fewer seconds than this are ignored as noise
+
+    Returns:
+        The names of the benchmarks that got slower by more than the threshold
+    """
+    if base.get("project") != new.get("project"):
+        print("Warning: the results were measured on different generated projects")
+    if base.get("environment") != new.get("environment"):
+        print("Warning: the results were measured in different environments")
+
+    regressions = []
+    print(f"{'benchmark':<16} {'base (s)':>10} {'new (s)':>10} {'change':>8}")
+    for name in sorted(set(base["results"]) | set(new["results"])):
+        if name not in base["results"] or name not in new["results"]:
+            print(f"{name:<16} {'only in ' + ('new' if name in new['results'] else 'base'):>30}")
+            continue
+        old_time = base["results"][name]["median_s"]
+        new_time = new["results"][name]["median_s"]
+        change = (new_time - old_time) / old_time * 100 if old_time else 0.0
+        flag = ""
+        if change > threshold and new_time - old_time >= min_delta:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        elif change < -threshold and old_time - new_time >= min_delta:
+            flag = "  faster"
+        print(f"{name:<16} {old_time:>10.3f} {new_time:>10.3f} {change:>+7.1f}%{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the toolkit on generated projects")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Run benchmarks and store the results as JSON")
+    add_arguments(run_parser)
+    run_parser.add_argument("--only", help=f"Comma separated benchmarks to run ({', '.join(BENCHMARKS)})")
+    run_parser.add_argument("--repeat", type=int, default=3, help="Timed runs per benchmark")
+    run_parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="Worker processes and threads")
+    run_parser.add_argument("--output", type=Path, help="Result file (default: print to stdout)")
+
+    compare_parser = commands.add_parser("compare", help="Compare two result files")
+    compare_parser.add_argument("base", type=Path)
+    compare_parser.add_argument("new", type=Path)
+    compare_parser.add_argument("--threshold", type=float, default=10.0,
+                                help="Slowdown in percent that counts as a regression (default: 10)")
+    compare_parser.add_argument("--min-delta", type=float, default=0.01, metavar="SECONDS",
+                                help="Ignore changes smaller than this many seconds (default: 0.01)")
+    args = parser.parse_args()
+
+    if args.command == "compare":
+        base = json.loads(args.base.read_text(encoding="utf-8"))
+        new = json.loads(args.new.read_text(encoding="utf-8"))
+        regressions = compare(base, new, args.threshold, args.min_delta)
+        if regressions:
+            print(f"{len(regressions)} regressions beyond {args.threshold:g}%: {', '.join(regressions)}")
+        sys.exit(1 if regressions else 0)
+
+    names = args.only.split(",") if args.only else list(BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        parser.error(f"Unknown benchmarks: {', '.join(unknown)}")
+    results = run_suite(settings_from_args(args), names, args.repeat, args.jobs)
+    text = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(text + "\n", encoding="utf-8")
+        print(f"Results written to {args.output}")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
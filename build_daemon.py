@@ -0,0 +1,373 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hmac
+import json
+import os
+import queue
+import secrets
+import sys
+import threading
+import time
+import traceback
+import urllib.error
+import urllib.request
+from contextlib import redirect_stderr, redirect_stdout
+from functools import partial
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlparse
+
+from i18n import get_translator
+
+DEFAULT_DAEMON_PORT = 8765
+
+# The daemon writes a random token here; only clients that can read it may submit builds
+TOKEN_DIR = Path.home() / ".auto-python-toolkit"
+TOKEN_HEADER = "X-Build-Token"
+
+# Finished jobs kept for clients that poll late
+MAX_FINISHED_JOBS = 200
+
+# Options that take a value and are only meant for the client
+_CLIENT_OPTIONS = {"--daemon"}
+_CLIENT_FLAGS = {"--submit"}
+
+
+def token_path(port: int) -> Path:
+    return TOKEN_DIR / f"daemon-{port}.token"
+
+
+class Job:
+    """A build submitted to the daemon; its output is kept for the client to poll."""
+
+    def __init__(self, job_id: str, cwd: str, argv: List[str]):
+        self.id = job_id
+        self.cwd = cwd
+        self.argv = argv
+        self.status = "queued"
+        self.exit_code: Optional[int] = None
+        self.finished: Optional[float] = None
+        self._output: List[str] = []
+        self._size = 0
+        self._lock = threading.Lock()
+
+    # File interface, so the job can replace sys.stdout and sys.stderr
+    def write(self, text: str) -> int:
+        with self._lock:
+            self._output.append(text)
+            self._size += len(text)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def read(self, offset: int) -> Tuple[str, int]:
+        """Return the output after offset and the offset to continue from."""
+        with self._lock:
+            text = "".join(self._output)
+            self._output = [text]
+        return text[offset:], len(text)
+
+    def to_dict(self, offset: Optional[int] = None) -> Dict[str, Any]:
+        data = {"id": self.id, "cwd": self.cwd, "argv": self.argv,
+                "status": self.status, "exit_code": self.exit_code}
+        if offset is not None:
+            data["output"], data["offset"] = self.read(offset)
+        return data
+
+
+class BuildDaemon:
+    """
+    Runs builds submitted over HTTP on 127.0.0.1 and keeps one warm toolkit
+    per project and option set between them: the scanned file list, the
+    open import cache and distribution index, the analyzers with their
+    stdlib and mapping tables, and the result of the uv check.
+
+    All builds and warm-ups run on one worker thread, in submission order,
+    because they change the working directory and sys.stdout and because
+    SQLite connections must stay on the thread that opened them. A watcher
+    thread polls the projects it has built for changed files and queues a
+    warm-up, so the next build finds the new imports already parsed.
+    """
+
+    def __init__(self, port: int = DEFAULT_DAEMON_PORT, watch_interval: float = 2.0,
+                 lang: Optional[str] = None):
+        """
+        Args:
+            port: Port to listen on, on 127.0.0.1 only
+            watch_interval: Seconds between checks of the built projects for changes
+            lang: Language of the daemon's own messages
+        """
+        self.port = port
+        self.watch_interval = watch_interval
+        self.lang = lang
+        self._ = get_translator(lang).get
+        self.jobs: Dict[str, Job] = {}
+        self.toolkits: Dict[Tuple[str, str], Any] = {}
+        # File stats of each warm project when it was last analyzed
+        self._snapshots: Dict[Tuple[str, str], Dict[Path, Tuple[int, int]]] = {}
+        self._pending_warm_ups: set = set()
+        self._queue: "queue.Queue[Optional[Callable[[], None]]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._job_count = 0
+        self.token = secrets.token_hex(32)
+        self.server = ThreadingHTTPServer(("127.0.0.1", port), _Handler)
+        self.server.daemon = self
+
+    def submit(self, cwd: str, argv: List[str]) -> Job:
+        with self._lock:
+            self._job_count += 1
+            job = Job(f"{self._job_count}-{secrets.token_hex(4)}", cwd, argv)
+            self.jobs[job.id] = job
+            finished = [j for j in self.jobs.values() if j.finished is not None]
+            for old in sorted(finished, key=lambda j: j.finished)[:-MAX_FINISHED_JOBS]:
+                del self.jobs[old.id]
+        self._queue.put(partial(self._run_job, job))
+        return job
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            jobs = list(self.jobs.values())
+        counts: Dict[str, int] = {}
+        for job in jobs:
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"pid": os.getpid(), "jobs": counts, "queued": self._queue.qsize(),
+                "projects": sorted({cwd for cwd, _ in self.toolkits})}
+
+    def _run_job(self, job: Job):
+        job.status = "running"
+        previous = os.getcwd()
+        with redirect_stdout(job), redirect_stderr(job):
+            try:
+                os.chdir(job.cwd)
+                job.exit_code = self._build(job)
+            except SystemExit as e:
+                # parser.error() and sys.exit() inside the build end the job, not the daemon
+                if isinstance(e.code, int) or e.code is None:
+                    job.exit_code = e.code or 0
+                else:
+                    print(e.code)
+                    job.exit_code = 1
+            except Exception:
+                traceback.print_exc()
+                job.exit_code = 1
+            finally:
+                os.chdir(previous)
+        job.status = "done" if job.exit_code == 0 else "failed"
+        job.finished = time.time()
+
+    def _build(self, job: Job) -> int:
+        from main import AutoPythonToolkit, build_parser, needs_terminal, run_command, toolkit_options
+
+        parser = build_parser()
+        args = parser.parse_args(job.argv)
+        if args.serve is not None or needs_terminal(args):
+            print(self._("daemon_needs_targets"))
+            return 2
+        options, hooks = toolkit_options(parser, args)
+        key = (job.cwd, repr(sorted(options.items())))
+        toolkit = self.toolkits.get(key)
+        if toolkit is None:
+            toolkit = AutoPythonToolkit(**options)
+            toolkit.keep_warm()
+            self.toolkits[key] = toolkit
+        else:
+            toolkit.start_build()
+        for hook in hooks:
+            toolkit.metrics.add_hook(hook)
+        try:
+            return run_command(toolkit, parser, args)
+        finally:
+            self._snapshots[key] = toolkit.walker.file_stats()
+
+    def _warm_up(self, key: Tuple[str, str]):
+        self._pending_warm_ups.discard(key)
+        toolkit = self.toolkits.get(key)
+        if toolkit is None:
+            return
+        previous = os.getcwd()
+        with open(os.devnull, "w") as devnull, redirect_stdout(devnull), redirect_stderr(devnull):
+            try:
+                os.chdir(key[0])
+                toolkit.warm_up()
+            except Exception:
+                # The next build reports the problem, if it persists
+                pass
+            finally:
+                os.chdir(previous)
+        self._snapshots[key] = toolkit.walker.file_stats()
+
+    def _work(self):
+        while True:
+            task = self._queue.get()
+            if task is None:
+                break
+            task()
+        for toolkit in self.toolkits.values():
+            toolkit.close()
+
+    def _watch(self):
+        while not self._stopping.wait(self.watch_interval):
+            for key, toolkit in list(self.toolkits.items()):
+                if key in self._pending_warm_ups or key not in self._snapshots:
+                    continue
+                walker = toolkit.walker
+                if walker.changed() or walker.changed_files(self._snapshots[key]):
+                    self._pending_warm_ups.add(key)
+                    self._queue.put(partial(self._warm_up, key))
+
+    def _write_token(self):
+        path = token_path(self.port)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w") as f:
+            f.write(self.token)
+
+    def serve_forever(self):
+        """Serve until interrupted or until a client posts /shutdown."""
+        self._write_token()
+        worker = threading.Thread(target=self._work, name="build-worker")
+        watcher = threading.Thread(target=self._watch, name="build-watcher", daemon=True)
+        worker.start()
+        watcher.start()
+        print(self._("daemon_listening", f"http://127.0.0.1:{self.port}", os.getpid()), flush=True)
+        try:
+            self.server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._stopping.set()
+            self._queue.put(None)
+            worker.join()
+            self.server.server_close()
+            try:
+                token_path(self.port).unlink()
+            except OSError:
+                pass
+            print(self._("daemon_stopped"), flush=True)
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server_version = "AutoPythonToolkit"
+
+    def log_message(self, format, *args):
+        # sys.stderr belongs to the running build
+        pass
+
+    @property
+    def daemon(self) -> BuildDaemon:
+        return self.server.daemon
+
+    def _reply(self, status: int, data: Dict[str, Any]):
+        body = json.dumps(data).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _authorized(self) -> bool:
+        if hmac.compare_digest(self.headers.get(TOKEN_HEADER, ""), self.daemon.token):
+            return True
+        self._reply(403, {"error": "invalid token"})
+        return False
+
+    def do_GET(self):
+        if not self._authorized():
+            return
+        url = urlparse(self.path)
+        if url.path == "/status":
+            self._reply(200, self.daemon.status())
+            return
+        if url.path.startswith("/jobs/"):
+            job = self.daemon.jobs.get(url.path[len("/jobs/"):])
+            if job is None:
+                self._reply(404, {"error": "unknown job"})
+                return
+            offset = int(parse_qs(url.query).get("offset", ["0"])[0])
+            self._reply(200, job.to_dict(offset))
+            return
+        self._reply(404, {"error": "not found"})
+
+    def do_POST(self):
+        if not self._authorized():
+            return
+        if self.path == "/shutdown":
+            self._reply(200, {"status": "stopping"})
+            threading.Thread(target=self.server.shutdown).start()
+            return
+        if self.path != "/jobs":
+            self._reply(404, {"error": "not found"})
+            return
+        try:
+            request = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+            cwd, argv = request["cwd"], request["argv"]
+            if not os.path.isdir(cwd) or not all(isinstance(arg, str) for arg in argv):
+                raise ValueError(cwd)
+        except (ValueError, KeyError, TypeError):
+            self._reply(400, {"error": "expected {\"cwd\": directory, \"argv\": [arguments]}"})
+            return
+        self._reply(202, self.daemon.submit(cwd, argv).to_dict())
+
+
+def client_argv(argv: List[str]) -> List[str]:
+    """Return the arguments of a --submit call without the client-only options."""
+    result = []
+    skip = False
+    for arg in argv:
+        if skip:
+            skip = False
+        elif arg in _CLIENT_FLAGS:
+            continue
+        elif arg in _CLIENT_OPTIONS:
+            skip = True
+        elif arg.split("=", 1)[0] not in _CLIENT_OPTIONS:
+            result.append(arg)
+    return result
+
+
+def _request(url: str, token: str, data: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    body = json.dumps(data).encode("utf-8") if data is not None else None
+    request = urllib.request.Request(url, data=body, headers={TOKEN_HEADER: token,
+                                                              "Content-Type": "application/json"})
+    with urllib.request.urlopen(request, timeout=30) as response:
+        return json.loads(response.read())
+
+
+def submit_build(daemon_url: str, argv: List[str], translator, poll_interval: float = 0.2) -> int:
+    """
+    Submit a build to a running daemon, print its output as it arrives and
+    return its exit status.
+
+    Args:
+        daemon_url: Address of the daemon, e.g. http://127.0.0.1:8765
+        argv: Command line arguments of the build
+        translator: Translator for the client's own messages
+        poll_interval: Seconds between polls for more output
+
+    Returns:
+        The build's exit status, or 1 if the daemon could not be reached
+    """
+    _ = translator.get
+    url = daemon_url.rstrip("/")
+    port = urlparse(url).port or DEFAULT_DAEMON_PORT
+    try:
+        token = token_path(port).read_text().strip()
+        job = _request(f"{url}/jobs", token, {"cwd": os.getcwd(), "argv": argv})
+        print(_("daemon_job_submitted", job["id"], url), flush=True)
+        offset = 0
+        while True:
+            state = _request(f"{url}/jobs/{job['id']}?offset={offset}", token)
+            if state["output"]:
+                sys.stdout.write(state["output"])
+                sys.stdout.flush()
+            offset = state["offset"]
+            if state["status"] in ("done", "failed"):
+                return state["exit_code"]
+            time.sleep(poll_interval)
+    except (OSError, ValueError, KeyError) as e:
+        print(_("daemon_unreachable", url, e), file=sys.stderr)
+        return 1
@@ -0,0 +1,215 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import cProfile
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+METRICS_VERSION = 1
+
+# Phases a build goes through, in order; --profile accepts these names
+PHASES = ("check_uv", "scan", "analyze", "venv", "wheelhouse", "resolve", "install",
+          "runtime", "precompile", "stage", "archive", "delta")
+
+# A hook is called with an event name ("phase" or "build") and its data
+Hook = Callable[[str, Dict[str, Any]], None]
+
+
+class Phase:
+    """
+    Measurements of one phase. Code inside BuildMetrics.phase() adds the
+    byte and file counts it knows about; times are filled in on exit.
+    """
+
+    def __init__(self, name: str, target: Optional[str] = None):
+        self.name = name
+        self.target = target
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.child_cpu = 0.0
+        self.bytes_read = 0
+        self.bytes_written = 0
+        self.files = 0
+        self.extra: Dict[str, Any] = {}
+        self.ok = True
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = {
+            "name": self.name,
+            "target": self.target,
+            "ok": self.ok,
+            "wall_s": round(self.wall, 6),
+            "cpu_s": round(self.cpu, 6),
+            "child_cpu_s": round(self.child_cpu, 6),
+            "bytes_read": self.bytes_read,
+            "bytes_written": self.bytes_written,
+            "files": self.files,
+        }
+        data.update(self.extra)
+        return data
+
+
+class BuildMetrics:
+    """
+    Collects per-phase timings of a build and optionally profiles phases.
+
+    Wall time is measured with perf_counter, CPU time of the calling thread
+    with thread_time, and CPU time of finished subprocesses (uv) from
+    os.times(). Subprocess CPU is counted per process, so in batch builds
+    phases running at the same time see each other's subprocesses.
+
+    Hooks receive each finished phase and, from finish(), the whole report,
+    so a build system can collect the numbers without parsing output.
+    """
+
+    def __init__(self, profile: Iterable[str] = (), profile_dir: Optional[Path] = None):
+        """
+        Args:
+            profile: Names of the phases to run under cProfile, or "all"
+            profile_dir: Where the .prof files are written
+        """
+        self.profile = set(profile)
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.phases: List[Phase] = []
+        self.hooks: List[Hook] = []
+        self.started = datetime.now(timezone.utc)
+        self._start = time.perf_counter()
+        self._lock = threading.Lock()
+        # cProfile cannot profile two threads' phases at once
+        self._profile_lock = threading.Lock()
+        self._profile_count = 0
+
+    def add_hook(self, hook: Hook):
+        self.hooks.append(hook)
+
+    def _emit(self, event: str, data: Dict[str, Any]):
+        for hook in self.hooks:
+            try:
+                hook(event, data)
+            except Exception as e:
+                # A broken metrics hook must not fail the build
+                print(f"metrics hook {getattr(hook, '__name__', hook)!r} failed: {e}", file=sys.stderr)
+
+    def _profiled(self, name: str) -> bool:
+        return "all" in self.profile or name in self.profile
+
+    def _profile_path(self, phase: Phase) -> Path:
+        with self._lock:
+            self._profile_count += 1
+            count = self._profile_count
+        label = f"-{phase.target}" if phase.target else ""
+        name = f"{count:02d}-{phase.name}{label}.prof"
+        return self.profile_dir / "".join(c if c.isalnum() or c in "-_." else "-" for c in name)
+
+    @contextmanager
+    def phase(self, name: str, target: Optional[str] = None) -> Iterator[Phase]:
+        """Measure the enclosed block as one phase, profiling it if requested."""
+        phase = Phase(name, target)
+        profiler = None
+        if self._profiled(name) and self.profile_dir and self._profile_lock.acquire(blocking=False):
+            profiler = cProfile.Profile()
+        children = os.times()
+        cpu = time.thread_time()
+        start = time.perf_counter()
+        if profiler:
+            profiler.enable()
+        try:
+            yield phase
+        except BaseException:
+            phase.ok = False
+            raise
+        finally:
+            if profiler:
+                profiler.disable()
+            phase.wall = time.perf_counter() - start
+            phase.cpu = time.thread_time() - cpu
+            now = os.times()
+            phase.child_cpu = (now.children_user - children.children_user
+                               + now.children_system - children.children_system)
+            if profiler:
+                try:
+                    path = self._profile_path(phase)
+                    path.parent.mkdir(parents=True, exist_ok=True)
+                    profiler.dump_stats(str(path))
+                    phase.extra["profile"] = str(path)
+                finally:
+                    self._profile_lock.release()
+            with self._lock:
+                self.phases.append(phase)
+            self._emit("phase", phase.to_dict())
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Return all measurements so far.
+
+        Returns:
+            {"version", "started", "wall_s", "phases": [phase, ...],
+             "totals": {phase name: summed wall_s, cpu_s, bytes and files}}
+        """
+        with self._lock:
+            phases = [phase.to_dict() for phase in self.phases]
+        totals: Dict[str, Dict[str, Any]] = {}
+        for data in phases:
+            total = totals.setdefault(data["name"], {"count": 0, "wall_s": 0.0, "cpu_s": 0.0,
+                                                     "child_cpu_s": 0.0, "bytes_read": 0,
+                                                     "bytes_written": 0, "files": 0})
+            total["count"] += 1
+            for key in ("wall_s", "cpu_s", "child_cpu_s"):
+                total[key] = round(total[key] + data[key], 6)
+            for key in ("bytes_read", "bytes_written", "files"):
+                total[key] += data[key]
+        return {
+            "version": METRICS_VERSION,
+            "started": self.started.isoformat(),
+            "wall_s": round(time.perf_counter() - self._start, 6),
+            "phases": phases,
+            "totals": totals,
+        }
+
+    def finish(self) -> Dict[str, Any]:
+        """Return the final report and pass it to the hooks."""
+        report = self.report()
+        self._emit("build", report)
+        return report
+
+    @staticmethod
+    def write_json(report: Dict[str, Any], path: Optional[Path]):
+        """Write a report to a file, or to stdout if path is None."""
+        text = json.dumps(report, indent=2, default=str)
+        if path is None:
+            print(text)
+            return
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text + "\n", encoding="utf-8")
+
+
+def load_hook(spec: str) -> Hook:
+    """
+    Import a hook given as "module:function", e.g. "ci_metrics:collect",
+    looking in the current directory as well as on sys.path.
+
+    Raises:
+        ValueError: If the spec is malformed or does not name a callable
+    """
+    module_name, _, attr = spec.partition(":")
+    if not module_name or not attr:
+        raise ValueError(f"Invalid hook {spec!r}, expected MODULE:FUNCTION")
+    # Hook modules usually live in the project being built
+    if os.getcwd() not in sys.path:
+        sys.path.insert(0, os.getcwd())
+    try:
+        hook = getattr(importlib.import_module(module_name), attr)
+    except (ImportError, AttributeError) as e:
+        raise ValueError(f"Cannot load hook {spec!r}: {e}") from e
+    if not callable(hook):
+        raise ValueError(f"Hook {spec!r} is not callable")
+    return hook
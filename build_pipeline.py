@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import asyncio
+import concurrent.futures
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, TextIO, Tuple
+
+
+class BuildPipeline:
+    """
+    Builds targets as an asyncio pipeline that overlaps the slow uv steps
+    with the toolkit's own work, instead of running one step after another.
+
+    Creating the venv does not depend on the dependencies, so it starts
+    right away, and uv downloads the interpreter while the project is being
+    scanned and analyzed. Once the dependencies are known, the project
+    files are written into the package while they are being installed; the
+    venv follows when the install has finished. With --precompile the
+    bytecode is compiled by the venv's interpreter, so packaging waits for
+    the install as before.
+
+    The blocking steps run in worker threads and uv writes its output
+    straight to the console or the target's log as it runs. Warm toolkits
+    (build daemon) analyze on the calling thread instead, since their
+    SQLite caches can only be used from the thread that opened them.
+    """
+
+    def __init__(self, toolkit, max_parallel: int = 1):
+        """
+        Args:
+            toolkit: The AutoPythonToolkit whose steps are run
+            max_parallel: Maximum number of targets built at the same time
+        """
+        self.toolkit = toolkit
+        self.max_parallel = max_parallel
+        self._ = toolkit._
+
+    async def _analyze(self, versions: List[str], batch: bool) -> Dict[str, List[str]]:
+        toolkit = self.toolkit
+
+        def analyze():
+            python_files = toolkit.find_python_files()
+            print(self._("found_files", len(python_files)), flush=True)
+            dependencies = {}
+            for py_version in versions:
+                dependencies[py_version] = toolkit.analyze_dependencies(python_files, py_version)
+                deps_str = ", ".join(dependencies[py_version]) or self._("no_deps")
+                if batch:
+                    print(self._("detected_deps_for", py_version, deps_str), flush=True)
+                else:
+                    print(self._("detected_deps", deps_str), flush=True)
+            return dependencies
+
+        if toolkit.warm:
+            return analyze()
+        return await asyncio.to_thread(analyze)
+
+    async def _build(self, target_os: str, py_version: str, analysis: "asyncio.Task",
+                     venv_path: Path, log: Optional[TextIO], batch: bool) -> str:
+        """
+        Build one target once the analysis task delivers its dependencies.
+
+        Returns:
+            "status_ok", "status_setup_failed" or "status_packaging_failed"
+        """
+        toolkit = self.toolkit
+        toolkit._print(self._("setup_venv", py_version), log)
+        prepared = await asyncio.to_thread(toolkit.prepare_venv, target_os, py_version, venv_path, log)
+        dependencies = (await analysis)[py_version]
+        if prepared is None:
+            return "status_setup_failed"
+
+        # Set when the venv is installed: True if it can be packaged
+        installed: "concurrent.futures.Future[bool]" = concurrent.futures.Future()
+
+        def venv_ready():
+            if not installed.result():
+                raise RuntimeError(self._("failed_setup"))
+
+        packaging = asyncio.create_task(asyncio.to_thread(
+            toolkit.package_project, target_os, py_version, venv_path, log, venv_ready))
+        ok = False
+        try:
+            ok = await asyncio.to_thread(toolkit.install_dependencies, target_os, py_version,
+                                         dependencies, venv_path, prepared, log)
+            if ok and batch and toolkit.dedupe:
+                ok = await asyncio.to_thread(toolkit.dedupe_venv, venv_path, log)
+        finally:
+            installed.set_result(ok)
+        packaged = await packaging
+        if not ok:
+            return "status_setup_failed"
+        return "status_ok" if packaged else "status_packaging_failed"
+
+    async def _build_logged(self, target_os: str, py_version: str, analysis: "asyncio.Task",
+                            slots: asyncio.Semaphore) -> Dict:
+        """Build one target of a batch into its own venv, logging to its own file."""
+        toolkit = self.toolkit
+        async with slots:
+            key = toolkit.windows_versions[target_os]["key"]
+            log_path = toolkit.output_dir / "logs" / f"{key}-py{py_version}.log"
+            log_path.parent.mkdir(parents=True, exist_ok=True)
+            archive = toolkit.output_dir / f"{toolkit.output_name_for(target_os, py_version)}.zip"
+
+            print(self._("batch_target_started", key, py_version, log_path), flush=True)
+            start = time.perf_counter()
+            with open(log_path, "w", encoding="utf-8") as log:
+                status = await self._build(target_os, py_version, analysis,
+                                           toolkit.venv_path_for(target_os, py_version), log, batch=True)
+            elapsed = time.perf_counter() - start
+            print(self._("batch_target_finished", key, py_version, self._(status), elapsed), flush=True)
+
+        return {
+            "target": key,
+            "python": py_version,
+            "status": status,
+            "seconds": elapsed,
+            "output": archive if status == "status_ok" else None,
+            "log": log_path,
+        }
+
+    async def _build_batch(self, targets: List[Tuple[str, str]]) -> List[Dict]:
+        analysis = asyncio.create_task(self._analyze(sorted({v for _, v in targets}), batch=True))
+        slots = asyncio.Semaphore(self.max_parallel)
+        builds = [self._build_logged(target_os, py_version, analysis, slots)
+                  for target_os, py_version in targets]
+        return list(await asyncio.gather(*builds))
+
+    async def _build_single(self, target_os: str, py_version: str) -> str:
+        analysis = asyncio.create_task(self._analyze([py_version], batch=False))
+        return await self._build(target_os, py_version, analysis,
+                                 self.toolkit.project_dir / "venv", None, batch=False)
+
+    def build_batch(self, targets: List[Tuple[str, str]]) -> List[Dict]:
+        """
+        Build several targets, each into its own venv and log like
+        AutoPythonToolkit.build_target().
+
+        Returns:
+            The summary dicts of the targets, in order
+        """
+        return asyncio.run(self._build_batch(targets))
+
+    def build(self, target_os: str, py_version: str) -> str:
+        """
+        Build one target into the project's venv, reporting to the console.
+
+        Returns:
+            "status_ok", "status_setup_failed" or "status_packaging_failed"
+        """
+        return asyncio.run(self._build_single(target_os, py_version))
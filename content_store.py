@@ -0,0 +1,211 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import os
+import shutil
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+# ioctl that asks the filesystem for a copy-on-write clone (btrfs, XFS)
+FICLONE = 0x40049409
+
+# Temporary objects younger than this may still be written by a running ingest()
+TMP_MAX_AGE = 3600
+
+
+class ContentStore:
+    """
+    Content-addressed file store used to dedupe identical files across the
+    staging trees and venvs of several target builds.
+
+    Objects live under objects/<first two hex digits>/<sha256>. Files are
+    placed into trees as reflinks where the filesystem supports them and as
+    hardlinks otherwise, so disk use grows with the number of distinct files
+    rather than with files x targets. A file that is only linked from the
+    store itself (link count 1) is garbage.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.objects = self.root / "objects"
+        self.objects.mkdir(parents=True, exist_ok=True)
+        self._reflink_ok = fcntl is not None and sys.platform.startswith("linux")
+        self._lock = threading.Lock()
+        self.linked_files = 0
+        self.linked_bytes = 0
+
+    @staticmethod
+    def hash_file(path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def object_path(self, digest: str) -> Path:
+        return self.objects / digest[:2] / digest
+
+    def ingest(self, src: Path) -> str:
+        """Add a file to the store if its content is not there yet and return its digest."""
+        digest = self.hash_file(src)
+        obj = self.object_path(digest)
+        if not obj.exists():
+            obj.parent.mkdir(exist_ok=True)
+            tmp = obj.with_name(f"{digest}.{os.getpid()}.{threading.get_ident()}.tmp")
+            shutil.copy2(src, tmp)
+            os.replace(tmp, obj)
+        return digest
+
+    def _reflink(self, src: Path, dst: Path) -> bool:
+        if not self._reflink_ok:
+            return False
+        try:
+            with open(src, "rb") as s, open(dst, "wb") as d:
+                fcntl.ioctl(d.fileno(), FICLONE, s.fileno())
+            shutil.copystat(src, dst)
+            return True
+        except OSError:
+            # Not supported here; stop trying for the rest of the run
+            self._reflink_ok = False
+            try:
+                os.remove(dst)
+            except OSError:
+                pass
+            return False
+
+    def place(self, digest: str, dst: Path):
+        """Materialize a stored object at dst, replacing whatever is there."""
+        obj = self.object_path(digest)
+        tmp = dst.with_name(f".{dst.name}.{threading.get_ident()}.link")
+        if not self._reflink(obj, tmp):
+            try:
+                os.link(obj, tmp)
+            except OSError:
+                # Different filesystem or no hardlink support
+                shutil.copy2(obj, tmp)
+        os.replace(tmp, dst)
+        with self._lock:
+            self.linked_files += 1
+            self.linked_bytes += obj.stat().st_size
+
+    def link_tree(self, src_dir: Path, dst_dir: Path, exclude: Iterable[str] = ()):
+        """
+        Recreate src_dir at dst_dir with every file placed from the store,
+        like shutil.copytree but without writing duplicate content.
+
+        Args:
+            src_dir: Directory to copy
+            dst_dir: Destination, created if missing
+            exclude: Names of top-level entries of src_dir to leave out
+        """
+        src_dir, dst_dir = Path(src_dir), Path(dst_dir)
+        exclude = set(exclude)
+        for root, dirs, files in os.walk(src_dir):
+            rel = Path(root).relative_to(src_dir)
+            if rel == Path("."):
+                dirs[:] = [d for d in dirs if d not in exclude]
+                files = [f for f in files if f not in exclude]
+            target = dst_dir / rel
+            target.mkdir(parents=True, exist_ok=True)
+            for name in files:
+                src = Path(root) / name
+                if src.is_symlink() and not src.exists():
+                    continue
+                self.place(self.ingest(src), target / name)
+
+    def dedupe_tree(self, tree: Path):
+        """
+        Replace the files of an existing tree (such as a freshly installed venv)
+        with links into the store. Files that already are the store object for
+        their content, deduped by an earlier run, are left alone; other
+        hardlinked files, such as those uv links from its own cache, are not.
+        """
+        for root, _, files in os.walk(tree):
+            for name in files:
+                path = Path(root) / name
+                try:
+                    st = path.lstat()
+                except OSError:
+                    continue
+                if not path.is_file() or path.is_symlink() or st.st_size == 0:
+                    continue
+                digest = self.ingest(path)
+                try:
+                    obj = self.object_path(digest).stat()
+                except OSError:
+                    obj = None
+                if obj is not None and (obj.st_dev, obj.st_ino) == (st.st_dev, st.st_ino):
+                    continue
+                self.place(digest, path)
+
+    def report(self) -> Dict[str, int]:
+        """
+        Summarize the store.
+
+        Returns:
+            A dict with the number of objects, their total size, the number
+            of hardlinked references and the bytes those references would
+            occupy as plain copies
+        """
+        objects = stored = references = referenced = 0
+        for path in self.objects.glob("*/*"):
+            if path.name.endswith(".tmp"):
+                continue
+            st = path.stat()
+            objects += 1
+            stored += st.st_size
+            references += st.st_nlink - 1
+            referenced += st.st_size * (st.st_nlink - 1)
+        return {
+            "objects": objects,
+            "stored_bytes": stored,
+            "references": references,
+            "referenced_bytes": referenced,
+            "saved_bytes": max(0, referenced - stored),
+        }
+
+    def gc(self) -> Dict[str, int]:
+        """
+        Delete objects no tree links to any more, along with temporary files
+        left over from interrupted runs.
+
+        Returns:
+            A dict with the number of removed objects and bytes freed
+        """
+        removed = freed = 0
+        for path in self.objects.glob("*/*"):
+            try:
+                st = path.stat()
+                if path.name.endswith(".tmp"):
+                    # Possibly still being written by an ingest() of another build;
+                    # copy2() gives it the source's mtime, so go by ctime too
+                    if max(st.st_mtime, st.st_ctime) > time.time() - TMP_MAX_AGE:
+                        continue
+                elif st.st_nlink != 1:
+                    continue
+                path.unlink()
+            except FileNotFoundError:
+                # Renamed into place or removed by another process meanwhile
+                continue
+            removed += 1
+            freed += st.st_size
+        return {"removed": removed, "freed_bytes": freed}
+
+
+def format_size(num_bytes: float) -> str:
+    """Format a byte count for humans, e.g. 1.5 GB."""
+    if abs(num_bytes) < 1024:
+        return f"{int(num_bytes)} B"
+    for unit in ("KB", "MB", "GB"):
+        num_bytes /= 1024
+        if abs(num_bytes) < 1024 or unit == "GB":
+            return f"{num_bytes:.1f} {unit}"
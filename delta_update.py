@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import zipfile
+from pathlib import Path
+from typing import Dict, Optional
+
+from archive_writer import ArchiveWriter, load_manifest
+from apply_update import UPDATE_MANIFEST
+
+UPDATE_VERSION = 1
+
+
+def _relative(arcname: str) -> str:
+    """Strip the top-level package directory from an archive name."""
+    return arcname.split("/", 1)[1] if "/" in arcname else arcname
+
+
+def archive_digests(zip_path: Path, manifest_path: Optional[Path] = None) -> Dict[str, str]:
+    """
+    Return the sha256 of every file in a package, keyed by its path inside the package.
+
+    Args:
+        zip_path: Package archive
+        manifest_path: Manifest written by ArchiveWriter for this archive.
+            Used instead of decompressing the archive when it is still valid.
+    """
+    manifest = load_manifest(manifest_path, zip_path) if manifest_path else None
+    if manifest is not None:
+        return {_relative(name): entry["sha256"] for name, entry in manifest["files"].items()}
+
+    digests = {}
+    with zipfile.ZipFile(zip_path) as zf:
+        for info in zf.infolist():
+            if info.is_dir():
+                continue
+            h = hashlib.sha256()
+            with zf.open(info) as f:
+                for chunk in iter(lambda: f.read(1024 * 1024), b""):
+                    h.update(chunk)
+            digests[_relative(info.filename)] = h.hexdigest()
+    return digests
+
+
+def _apply_update_bat() -> str:
+    """Return apply_update.bat, which runs apply_update.py with the package's own Python if it can."""
+    return (
+        "@echo off\r\n"
+        "setlocal\r\n"
+        "set \"TARGET=%~1\"\r\n"
+        "if \"%TARGET%\"==\"\" set \"TARGET=%CD%\"\r\n"
+        "set \"PY=%TARGET%\\venv\\Scripts\\python.exe\"\r\n"
+        "if not exist \"%PY%\" set \"PY=python\"\r\n"
+        "\"%PY%\" \"%~dp0apply_update.py\" \"%TARGET%\" %2\r\n"
+        "pause\r\n"
+    )
+
+
+def build_delta(base_zip: Path, new_zip: Path, delta_zip: Path,
+                new_manifest: Optional[Path] = None, **writer_args) -> Dict[str, int]:
+    """
+    Build an update package that turns an install of base_zip into one of new_zip.
+
+    The update holds only added and changed files, a list of deleted files,
+    the hashes needed to check the install before and after patching, and
+    the apply_update script.
+
+    Args:
+        base_zip: Package the offline site currently has installed
+        new_zip: Newly built package
+        delta_zip: Update archive to create
+        new_manifest: ArchiveWriter manifest of new_zip, to avoid rehashing it
+        writer_args: Compression settings passed on to ArchiveWriter
+
+    Returns:
+        A dict with the number of added, changed and deleted files
+    """
+    base = archive_digests(base_zip)
+    new = archive_digests(new_zip, new_manifest)
+    added = sorted(rel for rel in new if rel not in base)
+    changed = sorted(rel for rel in new if rel in base and base[rel] != new[rel])
+    deleted = sorted(rel for rel in base if rel not in new)
+
+    update = {
+        "version": UPDATE_VERSION,
+        "from": Path(base_zip).name,
+        "to": Path(new_zip).name,
+        "files": {rel: new[rel] for rel in added + changed},
+        "base": {rel: base[rel] for rel in changed + deleted},
+        "deleted": deleted,
+    }
+
+    top = Path(delta_zip).stem
+    script = Path(__file__).with_name("apply_update.py").read_bytes()
+    with ArchiveWriter(delta_zip, **writer_args) as archive, zipfile.ZipFile(new_zip) as zf:
+        names = {_relative(info.filename): info.filename for info in zf.infolist() if not info.is_dir()}
+        for rel in added + changed:
+            archive.add_bytes(f"{top}/files/{rel}", zf.read(names[rel]))
+        archive.add_bytes(f"{top}/{UPDATE_MANIFEST}",
+                          json.dumps(update, indent=2, sort_keys=True).encode("utf-8"))
+        archive.add_bytes(f"{top}/apply_update.py", script)
+        archive.add_bytes(f"{top}/apply_update.bat", _apply_update_bat().encode("utf-8"))
+
+    return {"added": len(added), "changed": len(changed), "deleted": len(deleted)}
@@ -2,11 +2,26 @@
 # -*- coding: utf-8 -*-
 
 import ast
+import hashlib
+import itertools
 import os
 import sys
 import re
+import time
+import tokenize
+import tomllib
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Set, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+from distribution_index import DistributionIndex
+from import_cache import RACY_WINDOW_NS, ImportCache
+from import_graph import ImportGraph, local_module_names
+from import_scanner import (ImportStatement, decode_source, regex_import_statements, scan_import_statements,
+                            scan_mapped_imports, top_level_imports)
+from project_walker import ProjectWalker
+from stdlib_tables import removed_module_packages, stdlib_modules
 
 
 class ImportVisitor(ast.NodeVisitor):
@@ -14,28 +29,150 @@ class ImportVisitor(ast.NodeVisitor):
     
     def __init__(self):
         self.imports = set()
+        # (module, relative import level, imported names), in source order
+        self.statements = []
         
     def visit_Import(self, node):
         for name in node.names:
             self.imports.add(name.name.split('.')[0])
+            self.statements.append((name.name, 0, ()))
         self.generic_visit(node)
         
     def visit_ImportFrom(self, node):
-        if node.module is not None:
+        # Relative imports always refer to the project's own modules
+        if node.module is not None and not node.level:
             self.imports.add(node.module.split('.')[0])
+        self.statements.append((node.module or "", node.level, tuple(name.name for name in node.names)))
         self.generic_visit(node)
 
 
+# Below this many files to parse, process pool startup costs more than it saves
+PARALLEL_MIN_FILES = 256
+
+# Files and bytes per batch handed to a worker, to amortize inter-process overhead
+BATCH_FILES = 64
+BATCH_BYTES = 8 * 1024 * 1024
+
+# Files larger than this are scanned for imports through a memory map instead
+# of being parsed; generated modules can be tens of megabytes
+DEFAULT_LARGE_FILE_SIZE = 4 * 1024 * 1024
+
+# Measured peak memory of parsing a file, as a multiple of its size. The
+# tokenizer streams; a syntax tree is far larger than the source.
+PARSE_MEMORY_FACTOR = {"fast": 5, "ast": 150}
+
+# Peak memory of scanning a mapped file: one window, whatever the file size
+MAPPED_SCAN_MEMORY = 16 * 1024 * 1024
+
+# "fast" scans tokens only and falls back to "ast" when tokenizing fails
+IMPORT_ENGINES = ("fast", "ast")
+
+# (path, import statements, script metadata, diagnostics, size, mtime_ns, sha256 or None)
+FileResult = Tuple[str, List[ImportStatement], Optional[Dict[str, Any]], List[str], int, int, Optional[str]]
+
+# Reference expression for PEP 723 inline metadata blocks
+SCRIPT_BLOCK_RE = re.compile(r"(?m)^# /// (?P<type>[a-zA-Z0-9-]+)$\s(?P<content>(^#(| .*)$\s)+)^# ///$")
+
+
+class SourceAnalysis:
+    """
+    Everything the analyzer takes from one file, extracted from a single
+    read of its bytes.
+    
+    Attributes:
+        statements: The file's import statements as (module, relative
+            import level, imported names), for following local imports
+        imports: Top-level names of the modules the file imports absolutely
+        script: The PEP 723 "script" table (dependencies, requires-python,
+            tool settings), or None if the file has no block
+        diagnostics: Problems met on the way, e.g. a syntax error that made
+            the analyzer fall back to regular expressions
+    """
+    
+    __slots__ = ("statements", "imports", "script", "diagnostics")
+    
+    def __init__(self, statements: List[ImportStatement], script: Optional[Dict[str, Any]] = None,
+                 diagnostics: Optional[List[str]] = None):
+        self.statements = statements
+        self.imports = top_level_imports(statements)
+        self.script = script
+        self.diagnostics = diagnostics or []
+    
+    @property
+    def script_dependencies(self) -> List[str]:
+        """Names of the packages the script block depends on, without version specifiers."""
+        if not self.script:
+            return []
+        deps = []
+        for requirement in self.script.get("dependencies", []):
+            package = re.split(r'[<>=!~;@]', str(requirement))[0].strip()
+            if package:
+                deps.append(package)
+        return deps
+    
+    @property
+    def requires_python(self) -> Optional[str]:
+        return self.script.get("requires-python") if self.script else None
+
+
 class DependencyAnalyzer:
     """
     Advanced dependency analyzer for Python projects.
     Scans Python files to detect imports and maps them to PyPI packages.
     """
     
-    def __init__(self):
+    def __init__(self, cache: Optional[ImportCache] = None, jobs: int = 1,
+                 import_engine: str = "fast",
+                 distribution_index: Optional[DistributionIndex] = None,
+                 target_python: Optional[str] = None,
+                 large_file_size: int = DEFAULT_LARGE_FILE_SIZE,
+                 memory_limit: Optional[int] = None):
+        """
+        Args:
+            cache: Optional persistent cache of per-file results; files whose
+                size, mtime and content hash are unchanged are not parsed again
+            jobs: Number of worker processes used to parse files
+            import_engine: "fast" to extract imports from tokens, or "ast"
+                to build a full syntax tree for every file
+            distribution_index: Index of import names to distributions,
+                consulted for imports not in import_to_package_map
+            target_python: Python version the project is packaged for, which
+                decides what counts as standard library (default: this interpreter's)
+            large_file_size: Files larger than this many bytes are only scanned
+                for import lines through a memory map, not parsed
+            memory_limit: Bound in bytes on the estimated memory of the files
+                being parsed at once. Files that would exceed it on their own
+                are scanned like large files, and per-file results are only
+                kept for files with a script block, so memory stays flat
+                however many files there are.
+        """
+        if import_engine not in IMPORT_ENGINES:
+            raise ValueError(f"Unknown import engine: {import_engine}")
+        self.cache = cache
+        self.jobs = max(1, jobs)
+        self.import_engine = import_engine
+        self.distribution_index = distribution_index
+        self.target_python = target_python or "{}.{}".format(*sys.version_info[:2])
+        self.memory_limit = memory_limit
+        self.large_file_size = large_file_size
+        if memory_limit is not None:
+            self.large_file_size = min(large_file_size, memory_limit // PARSE_MEMORY_FACTOR[import_engine])
         self.standard_libs = self._get_standard_libraries()
+        self.removed_module_packages = removed_module_packages(self.target_python)
+        # Local files reachable from the entry points of the last analysis, if any
+        self.reachable_files: Optional[Set[Path]] = None
+        # Files parsed (not answered from the cache) by the last analysis, and their size
+        self.parsed_files = 0
+        self.parsed_bytes = 0
+        # Files of the last analysis scanned through a memory map instead of parsed
+        self.mapped_files = 0
+        # Per-file results of this analyzer: path -> (size, mtime_ns, analysis)
+        self._sources: Dict[Path, Tuple[int, int, SourceAnalysis]] = {}
+        # Problems found in the files parsed by this analyzer
+        self.diagnostics: Dict[Path, List[str]] = {}
         self.import_to_package_map = {
-            # Common mappings of import names to package names
+            # Common mappings of import names to package names. These take
+            # precedence over the distribution index.
             'numpy': 'numpy',
             'pandas': 'pandas',
             'requests': 'requests',
@@ -68,28 +205,8 @@ class DependencyAnalyzer:
         }
     
     def _get_standard_libraries(self) -> Set[str]:
-        """Get a list of standard library modules."""
-        standard_libs = set(sys.builtin_module_names)
-        
-        # Add common standard library modules
-        std_lib_modules = {
-            'abc', 'argparse', 'array', 'ast', 'asyncio', 'base64', 'bisect', 
-            'calendar', 'collections', 'concurrent', 'contextlib', 'copy', 
-            'csv', 'ctypes', 'datetime', 'decimal', 'difflib', 'enum', 
-            'filecmp', 'fnmatch', 'fractions', 'functools', 'glob', 'gzip', 
-            'hashlib', 'heapq', 'hmac', 'html', 'http', 'importlib', 'inspect',
-            'io', 'ipaddress', 'itertools', 'json', 'logging', 'math', 
-            'mimetypes', 'multiprocessing', 'netrc', 'operator', 'os', 
-            'pathlib', 'pickle', 'platform', 'pprint', 'queue', 
-            'random', 're', 'shutil', 'signal', 'socket', 'sqlite3', 
-            'statistics', 'string', 'struct', 'subprocess', 'sys', 'tempfile', 
-            'textwrap', 'threading', 'time', 'timeit', 'traceback', 'types', 
-            'typing', 'unicodedata', 'unittest', 'urllib', 'uuid', 'warnings',
-            'weakref', 'xml', 'zipfile', 'zlib', 'configparser'
-        }
-        
-        standard_libs.update(std_lib_modules)
-        return standard_libs
+        """Get the standard library modules of the target Python version."""
+        return set(stdlib_modules(self.target_python))
     
     def parse_requirements_file(self, file_path: Path) -> List[str]:
         """Parse a requirements.txt file to extract package names."""
@@ -132,77 +249,263 @@ class DependencyAnalyzer:
         """
         if not file_path.exists():
             return []
+        return self.analyze_file(file_path).script_dependencies
+    
+    def script_metadata(self, file_path: Path) -> Optional[Dict[str, Any]]:
+        """Return the PEP 723 script table of a file, or None if it has none."""
+        if not file_path.exists():
+            return None
+        return self.analyze_file(file_path).script
+    
+    @staticmethod
+    def _parse_script_block(content: str) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """
+        Parse the PEP 723 script block of file content as TOML.
         
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
-        
-        # Look for the script dependency pattern
-        pattern = r"# /// script\s*\n(.*?)# ///"
-        match = re.search(pattern, content, re.DOTALL)
+        Returns:
+            (script table or None, diagnostics)
+        """
+        if "# /// script" not in content:
+            return None, []
+        content = content.replace("\r\n", "\n")
+        blocks = [m for m in SCRIPT_BLOCK_RE.finditer(content) if m.group("type") == "script"]
+        if len(blocks) > 1:
+            return None, ["multiple script blocks, all ignored"]
+        if not blocks:
+            script, problem = None, "unterminated script block"
+        else:
+            toml = "".join(line[2:] if line.startswith("# ") else line[1:]
+                           for line in blocks[0].group("content").splitlines(keepends=True))
+            try:
+                return tomllib.loads(toml), []
+            except tomllib.TOMLDecodeError as e:
+                script, problem = None, f"script block is not valid TOML: {e}"
+        # Still honour the dependencies of blocks that earlier versions accepted
+        legacy = DependencyAnalyzer._parse_legacy_script_dependencies(content)
+        if legacy:
+            script = {"dependencies": legacy}
+        return script, [problem]
+    
+    @staticmethod
+    def _parse_legacy_script_dependencies(content: str) -> List[str]:
+        """Leniently pick the dependencies out of a script block that is not valid TOML."""
+        match = re.search(r"# /// script\s*\n(.*?)# ///", content, re.DOTALL)
         if not match:
             return []
-        
-        # Extract the dependencies list
-        dep_section = match.group(1)
-        dep_pattern = r"# dependencies\s*=\s*\[(.*?)\]"
-        dep_match = re.search(dep_pattern, dep_section, re.DOTALL)
+        dep_match = re.search(r"# dependencies\s*=\s*\[(.*?)\]", match.group(1), re.DOTALL)
         if not dep_match:
             return []
-        
-        # Parse the dependencies
-        deps_str = dep_match.group(1)
-        deps = []
-        for line in deps_str.split('\n'):
-            # Extract package name from each line
-            line = line.strip()
-            if not line or line.startswith('#'):
-                continue
-                
-            # Remove quotes and commas
-            line = line.strip('"\'').strip(',').strip()
-            if line:
-                # Strip version specifiers
-                package = re.split(r'[<>=!~;@]', line)[0].strip()
-                deps.append(package)
-        
-        return deps
+        return re.findall(r"[\"']([^\"']+)[\"']", dep_match.group(1))
     
     def get_imports_from_file(self, file_path: Path) -> Set[str]:
-        """Extract all imports from a Python file using AST."""
+        """Extract all imports from a Python file using the configured engine."""
+        return self.analyze_file(file_path).imports
+    
+    @staticmethod
+    def _extract_imports(content: str, engine: str) -> Set[str]:
+        """Extract imports from file content, falling back from tokens to AST to regex."""
+        return top_level_imports(DependencyAnalyzer._extract_statements(content, engine)[0])
+    
+    @staticmethod
+    def _extract_statements(content: str, engine: str) -> Tuple[List[ImportStatement], List[str]]:
+        """Extract import statements and the problems met on the way from file content."""
+        if engine == "fast":
+            try:
+                return scan_import_statements(content), []
+            except (tokenize.TokenError, SyntaxError):
+                pass
+        
         try:
-            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                tree = ast.parse(f.read())
-                visitor = ImportVisitor()
-                visitor.visit(tree)
-                return visitor.imports
-        except (SyntaxError, UnicodeDecodeError):
+            visitor = ImportVisitor()
+            visitor.visit(ast.parse(content))
+            return visitor.statements, []
+        except SyntaxError as e:
             # Fallback to regex-based extraction for files with syntax errors
-            return self._extract_imports_with_regex(file_path)
+            problem = f"syntax error at line {e.lineno}: {e.msg}; imports found by regular expression"
+        except ValueError as e:
+            problem = f"cannot parse ({e}); imports found by regular expression"
+        return regex_import_statements(content), [problem]
     
-    def _extract_imports_with_regex(self, file_path: Path) -> Set[str]:
-        """Extract imports using regex as a fallback."""
-        imports = set()
-        import_patterns = [
-            r'^\s*import\s+([a-zA-Z0-9_.]+)',
-            r'^\s*from\s+([a-zA-Z0-9_.]+)\s+import'
-        ]
+    @staticmethod
+    def analyze_source(data: bytes, engine: str) -> SourceAnalysis:
+        """Extract imports, the script block and diagnostics from the bytes of a file in one pass."""
+        content, _, problem = decode_source(data)
+        statements, import_problems = DependencyAnalyzer._extract_statements(content, engine)
+        script, script_problems = DependencyAnalyzer._parse_script_block(content)
+        return SourceAnalysis(statements, script, ([problem] if problem else []) + import_problems + script_problems)
+    
+    def _remember(self, file_path: Path, size: int, mtime_ns: int, analysis: SourceAnalysis):
+        # A file changed again within the same mtime tick would look unchanged
+        if (mtime_ns < time.time_ns() - RACY_WINDOW_NS
+                and (self.memory_limit is None or analysis.script is not None)):
+            self._sources[file_path] = (size, mtime_ns, analysis)
+        if analysis.diagnostics:
+            self.diagnostics[file_path] = analysis.diagnostics
+        else:
+            self.diagnostics.pop(file_path, None)
+    
+    def _known(self, file_path: Path, st: os.stat_result) -> Optional[SourceAnalysis]:
+        """Return the result of an earlier extraction if the file has not changed since."""
+        entry = self._sources.get(file_path)
+        if entry is not None and entry[:2] == (st.st_size, st.st_mtime_ns):
+            return entry[2]
+        return None
+    
+    def analyze_file(self, file_path: Path) -> SourceAnalysis:
+        """
+        Return what a file imports and declares, reading it at most once:
+        results are kept for the lifetime of the analyzer and, with a
+        cache, across runs.
+        """
+        st = os.stat(file_path)
+        analysis = self._known(file_path, st)
+        if analysis is not None:
+            return analysis
         
-        with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            content = f.read()
+        content = None
+        if self.cache is not None:
+            result, st, content = self.cache.lookup(file_path, self.large_file_size)
+            if result is not None:
+                analysis = SourceAnalysis(*result)
+                self._remember(file_path, st.st_size, st.st_mtime_ns, analysis)
+                return analysis
+        
+        if content is None:
+            result = _analyze_path(str(file_path), self.cache is not None, self.import_engine,
+                                   self.large_file_size)
+            if result is None:
+                raise FileNotFoundError(file_path)
+            self._merge_results(set(), [[result]])
+            return SourceAnalysis(result[1], result[2], result[3])
+        analysis = self.analyze_source(content, self.import_engine)
+        self._remember(file_path, st.st_size, st.st_mtime_ns, analysis)
+        self.cache.store(file_path, st.st_size, st.st_mtime_ns, ImportCache.hash_bytes(content),
+                         analysis.statements, analysis.script, analysis.diagnostics)
+        return analysis
+    
+    def _pending_batches(self, python_files: Iterable[Path],
+                         all_imports: Set[str]) -> Iterator[Tuple[List[str], int]]:
+        """
+        Resolve files this analyzer has seen and cache hits into all_imports,
+        and yield the rest in batches to parse, with the estimated peak
+        memory of parsing each batch. Files are consumed one at a time.
+        """
+        factor = PARSE_MEMORY_FACTOR[self.import_engine]
+        batch, batch_bytes, cost = [], 0, 0
+        for py_file in python_files:
+            try:
+                st = os.stat(py_file)
+            except OSError:
+                # Deleted since the scan; nothing to contribute
+                continue
+            analysis = self._known(py_file, st)
+            if analysis is None and self.cache is not None:
+                result, st, _ = self.cache.lookup(py_file, self.large_file_size)
+                if result is not None:
+                    analysis = SourceAnalysis(*result)
+                    self._remember(py_file, st.st_size, st.st_mtime_ns, analysis)
+            if analysis is not None:
+                all_imports.update(analysis.imports)
+                continue
             
-            for pattern in import_patterns:
-                for match in re.finditer(pattern, content, re.MULTILINE):
-                    module = match.group(1).split('.')[0]
-                    imports.add(module)
+            self.parsed_files += 1
+            self.parsed_bytes += st.st_size
+            # Workers parse one file at a time, so a batch costs as much as its largest file
+            if st.st_size > self.large_file_size:
+                self.mapped_files += 1
+                cost = max(cost, MAPPED_SCAN_MEMORY)
+            else:
+                cost = max(cost, st.st_size * factor)
+            batch.append(str(py_file))
+            batch_bytes += st.st_size
+            if len(batch) >= BATCH_FILES or batch_bytes >= BATCH_BYTES:
+                yield batch, cost
+                batch, batch_bytes, cost = [], 0, 0
+        if batch:
+            yield batch, cost
+    
+    def _collect_imports(self, python_files: Iterable[Path]) -> Set[str]:
+        """
+        Collect the imports of all files. Files this analyzer has seen and
+        cache hits are resolved in this process; the remaining files are
+        parsed in a process pool when there are enough of them to be worth it.
+        Files are streamed through in batches rather than read up front.
+        """
+        all_imports = set()
+        self.parsed_files = self.parsed_bytes = self.mapped_files = 0
+        with_digest = self.cache is not None
+        batches = self._pending_batches(python_files, all_imports)
+        
+        # Look ahead far enough to tell whether a process pool pays off
+        head, head_files = [], 0
+        if self.jobs > 1:
+            for batch in batches:
+                head.append(batch)
+                head_files += len(batch[0])
+                if head_files >= PARALLEL_MIN_FILES:
+                    break
+        batches = itertools.chain(head, batches)
         
-        return imports
+        if head_files < PARALLEL_MIN_FILES:
+            for paths, _ in batches:
+                self._merge_results(all_imports, [_parse_files(paths, with_digest, self.import_engine,
+                                                               self.large_file_size)])
+            return all_imports
+        
+        limit = self.memory_limit if self.memory_limit is not None else float("inf")
+        in_flight = deque()
+        used = 0
+        with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+            for paths, cost in batches:
+                # Merge in submission order, so results are deterministic; a
+                # few batches per worker keeps them busy when sizes are uneven
+                while in_flight and (len(in_flight) >= self.jobs * 4 or used + cost > limit):
+                    future, done = in_flight.popleft()
+                    self._merge_results(all_imports, [future.result()])
+                    used -= done
+                in_flight.append((executor.submit(_parse_files, paths, with_digest, self.import_engine,
+                                                  self.large_file_size), cost))
+                used += cost
+            for future, _ in in_flight:
+                self._merge_results(all_imports, [future.result()])
+        
+        return all_imports
+    
+    def _merge_results(self, all_imports: Set[str], batches) -> None:
+        """Merge worker results into all_imports and record them in the cache."""
+        for batch in batches:
+            for path, statements, script, diagnostics, size, mtime_ns, digest in batch:
+                analysis = SourceAnalysis(statements, script, diagnostics)
+                all_imports.update(analysis.imports)
+                self._remember(Path(path), size, mtime_ns, analysis)
+                if digest is not None:
+                    self.cache.store(Path(path), size, mtime_ns, digest, statements, script, diagnostics)
     
-    def analyze_project(self, project_path: Path) -> List[str]:
+    def analyze_project(self, project_path: Path,
+                        python_files: Optional[List[Path]] = None,
+                        entry_points: Optional[List[Path]] = None) -> List[str]:
         """
         Analyze a Python project directory and return a list of 
         required PyPI packages.
+        
+        Args:
+            project_path: The project root directory
+            python_files: Files to analyze, as found by ProjectWalker.
+                If omitted, the project is walked with the default excludes.
+            entry_points: If given, only imports reachable from these files
+                through the project's own modules are considered, and the
+                reachable files are left in reachable_files
         """
-        python_files = list(project_path.glob('**/*.py'))
+        if python_files is None:
+            python_files = ProjectWalker(project_path).find_python_files()
+        
+        if self.cache is not None:
+            self.cache.evict_missing(python_files)
+        
+        reachable_imports = None
+        if entry_points is not None:
+            graph = ImportGraph(project_path, python_files, lambda path: self.analyze_file(path).statements)
+            self.reachable_files, reachable_imports = graph.reachable(entry_points)
         
         # Check for script dependencies in main files
         script_deps = []
@@ -236,20 +539,65 @@ class DependencyAnalyzer:
             return explicit_requirements
         
         # Otherwise, analyze imports
-        all_imports = set()
-        for py_file in python_files:
-            all_imports.update(self.get_imports_from_file(py_file))
+        if reachable_imports is not None:
+            all_imports = reachable_imports
+        else:
+            all_imports = self._collect_imports(python_files)
         
-        # Filter out standard library imports
-        external_imports = all_imports - self.standard_libs
+        # Filter out standard library imports and the project's own modules
+        external_imports = all_imports - self.standard_libs - local_module_names(project_path, python_files)
         
         # Map imports to package names
         packages = []
         for import_name in external_imports:
-            package_name = self.import_to_package_map.get(import_name, import_name)
-            packages.append(package_name)
+            packages.append(self.package_for_import(import_name))
         
         return sorted(list(set(packages)))
+    
+    def package_for_import(self, import_name: str) -> str:
+        """
+        Map an import name to the PyPI package that provides it, using the
+        overrides, then the replacements for removed stdlib modules, then the
+        distribution index, then the import name itself.
+        """
+        package_name = self.import_to_package_map.get(import_name)
+        if package_name is None:
+            # Modules dropped from the standard library of the target version
+            package_name = self.removed_module_packages.get(import_name)
+        if package_name is None and self.distribution_index is not None:
+            package_name = self.distribution_index.lookup(import_name)
+        return package_name or import_name
+
+
+def _analyze_path(path: str, with_digest: bool, engine: str, large_file_size: int) -> Optional[FileResult]:
+    """Read and analyze one file, or scan it through a memory map if it is large."""
+    try:
+        st = os.stat(path)
+        if st.st_size > large_file_size:
+            hasher = hashlib.sha256() if with_digest else None
+            analysis = SourceAnalysis(scan_mapped_imports(path, hasher))
+            digest = hasher.hexdigest() if hasher is not None else None
+        else:
+            with open(path, 'rb') as f:
+                content = f.read()
+            analysis = DependencyAnalyzer.analyze_source(content, engine)
+            digest = ImportCache.hash_bytes(content) if with_digest else None
+    except OSError:
+        # Deleted since the scan; nothing to contribute
+        return None
+    return (path, analysis.statements, analysis.script, analysis.diagnostics,
+            st.st_size, st.st_mtime_ns, digest)
+
+
+def _parse_files(paths: List[str], with_digest: bool, engine: str,
+                 large_file_size: int = DEFAULT_LARGE_FILE_SIZE) -> List[FileResult]:
+    """Process pool worker: parse a batch of files and return compact results."""
+    results = []
+    for path in paths:
+        result = _analyze_path(path, with_digest, engine, large_file_size)
+        if result is not None:
+            results.append(result)
+    return results
 
 
 if __name__ == "__main__":
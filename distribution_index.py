@@ -0,0 +1,180 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import sqlite3
+import zipfile
+from email.parser import HeaderParser
+from pathlib import Path
+from typing import Iterable, List, Optional, Set
+
+from wheelhouse import normalize_name
+
+# Suffixes of files that make a top-level module importable
+_MODULE_SUFFIXES = (".py", ".pyc", ".pyd", ".so")
+
+# Top-level RECORD entries that are never import names
+_NOT_MODULES = {"__pycache__", "..", "bin", "Scripts", "include", "share"}
+
+
+def _top_level_from_record(record: str) -> Set[str]:
+    """Derive top-level import names from the file list in a RECORD file."""
+    names = set()
+    for line in record.splitlines():
+        path = line.split(",", 1)[0].strip()
+        if not path:
+            continue
+        top, sep, _ = path.partition("/")
+        if top.endswith((".dist-info", ".data", ".egg-info")) or top in _NOT_MODULES:
+            continue
+        if not sep:
+            # A module file, e.g. six.py or _cffi_backend.cpython-311-x86_64-linux-gnu.so
+            if not top.endswith(_MODULE_SUFFIXES):
+                continue
+            top = top.split(".", 1)[0]
+        if top.isidentifier():
+            names.add(top)
+    return names
+
+
+def _distribution_name(metadata: Optional[str], dist_info_name: str) -> str:
+    """Return the project name from METADATA/PKG-INFO, or from the dist-info directory name."""
+    if metadata:
+        name = HeaderParser().parsestr(metadata).get("Name")
+        if name:
+            return name.strip()
+    return dist_info_name.rsplit(".", 1)[0].split("-", 1)[0]
+
+
+def _import_names(top_level: Optional[str], record: Optional[str]) -> Set[str]:
+    if top_level:
+        names = {line.strip().replace("/", ".").split(".", 1)[0] for line in top_level.splitlines()}
+        names = {name for name in names if name.isidentifier()}
+        if names:
+            return names
+    return _top_level_from_record(record or "")
+
+
+class DistributionIndex:
+    """
+    On-disk index from import names to the distributions that provide them,
+    built from the top_level.txt and RECORD files of wheels and installed
+    packages.
+
+    Lookups go through the SQLite primary key, so the analyzer only reads
+    the entries it asks for rather than loading the whole index.
+    """
+
+    SCHEMA_VERSION = "1"
+
+    def __init__(self, db_path: Path, rebuild: bool = False):
+        """
+        Args:
+            db_path: Location of the SQLite database
+            rebuild: If True, discard all existing entries
+        """
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if rebuild or row is None or row[0] != self.SCHEMA_VERSION:
+            self.conn.execute("DROP TABLE IF EXISTS provides")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS provides ("
+            " import_name TEXT, distribution TEXT, PRIMARY KEY (import_name, distribution))"
+            " WITHOUT ROWID"
+        )
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (self.SCHEMA_VERSION,))
+        self.conn.commit()
+
+    def lookup(self, import_name: str) -> Optional[str]:
+        """
+        Return the distribution that provides an import name.
+
+        Returns:
+            The distribution name, or None if the name is unknown or shared by
+            several distributions (namespace packages such as "google")
+        """
+        rows = [row[0] for row in self.conn.execute(
+            "SELECT distribution FROM provides WHERE import_name = ?", (import_name,))]
+        if len(rows) == 1:
+            return rows[0]
+        for distribution in rows:
+            if normalize_name(distribution) == normalize_name(import_name):
+                return distribution
+        return None
+
+    def add(self, distribution: str, import_names: Iterable[str]):
+        self.conn.executemany("INSERT OR IGNORE INTO provides VALUES (?, ?)",
+                              [(name, distribution) for name in import_names])
+
+    def add_wheel(self, wheel_path: Path) -> Optional[str]:
+        """Index a wheel file and return its distribution name."""
+        try:
+            with zipfile.ZipFile(wheel_path) as zf:
+                names = zf.namelist()
+                dist_info = next((n.split("/", 1)[0] for n in names
+                                  if n.split("/", 1)[0].endswith(".dist-info")), None)
+                if dist_info is None:
+                    return None
+
+                def read(name: str) -> Optional[str]:
+                    member = f"{dist_info}/{name}"
+                    return zf.read(member).decode("utf-8", errors="ignore") if member in names else None
+
+                distribution = _distribution_name(read("METADATA"), dist_info)
+                self.add(distribution, _import_names(read("top_level.txt"), read("RECORD")))
+                return distribution
+        except (OSError, zipfile.BadZipFile):
+            return None
+
+    def add_site_packages(self, site_packages: Path) -> List[str]:
+        """Index every distribution installed in a site-packages directory."""
+        added = []
+        for meta_dir in sorted(list(site_packages.glob("*.dist-info")) + list(site_packages.glob("*.egg-info"))):
+            if not meta_dir.is_dir():
+                continue
+
+            def read(name: str) -> Optional[str]:
+                try:
+                    return (meta_dir / name).read_text(encoding="utf-8", errors="ignore")
+                except OSError:
+                    return None
+
+            distribution = _distribution_name(read("METADATA") or read("PKG-INFO"), meta_dir.name)
+            self.add(distribution, _import_names(read("top_level.txt"), read("RECORD")))
+            added.append(distribution)
+        return added
+
+    def add_sources(self, sources: Iterable[Path]) -> int:
+        """
+        Index wheels and site-packages directories.
+
+        Args:
+            sources: Wheel files, directories containing wheels (searched
+                recursively, such as a wheelhouse) and site-packages directories
+
+        Returns:
+            Number of distributions indexed
+        """
+        count = 0
+        for source in sources:
+            source = Path(source)
+            if source.is_file() and source.suffix == ".whl":
+                count += self.add_wheel(source) is not None
+            elif source.is_dir():
+                installed = self.add_site_packages(source)
+                count += len(installed)
+                if not installed:
+                    for wheel in sorted(source.rglob("*.whl")):
+                        count += self.add_wheel(wheel) is not None
+        self.conn.commit()
+        return count
+
+    def __len__(self) -> int:
+        return self.conn.execute("SELECT COUNT(DISTINCT import_name) FROM provides").fetchone()[0]
+
+    def close(self):
+        self.conn.commit()
+        self.conn.close()
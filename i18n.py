@@ -25,17 +25,79 @@ EN_TRANSLATIONS = {
     "using_default_python": "Using default Python version for {}",
     "found_files": "Found {} Python files in the project",
     "detected_deps": "Detected dependencies: {}",
+    "detected_deps_for": "Detected dependencies for Python {}: {}",
+    "reachable_summary": "Entry points {}: {} of {} Python files reachable",
+    "no_entry_points": "No entry point found ({}), analyzing all files",
+    "parse_diagnostics": "{} files could not be analyzed cleanly, e.g. {}: {}",
     "no_deps": "None",
     "setup_venv": "Setting up virtual environment with Python {}...",
     "installing_deps": "Installing dependencies: {}",
+    "removing_deps": "Removing dependencies: {}",
+    "venv_reused": "Dependencies unchanged, reusing the virtual environment at {}",
+    "deps_up_to_date": "Installed dependencies are up to date",
+    "cross_layout": "Cross-building for {} ({}): assembling the environment from wheels, without a host venv",
+    "cross_wheel_missing": "No wheel of {} for Python {} ({}) in {}",
+    "runtime_downloading": "Downloading the Python {} runtime ({}) from {}...",
+    "runtime_bundled": "Bundling the Python {} runtime from {}",
+    "runtime_ok": "Runtime {}: OK ({})",
+    "runtime_broken": "Runtime {}: {} problems, e.g. {}",
+    "runtime_none": "No runtimes cached in {}",
     "packaging_project": "Packaging project for {}...",
     "packaging_success": "Project packaged successfully: {}",
+    "dist_index_built": "Indexed {} distributions providing {} import names into {}",
+    "delta_success": "Update package created: {} ({} added, {} changed, {} deleted; {} instead of {})",
+    "delta_base_missing": "Previous build not found: {}",
+    "delta_base_overwritten": "--delta-from must point to a copy of the previous build, {} is overwritten by this one",
+    "slim_applied": "Slimming the venv ({}): leaving out {} files, {}",
+    "slim_report_title": "Slimming report for {} (rules: {}), nothing is removed",
+    "slim_col_rule": "Rule",
+    "slim_col_package": "Package",
+    "slim_col_files": "Files",
+    "slim_col_size": "Size",
+    "slim_report_total": "Total: {} of {} files, {} of {} ({:.1f}%)",
+    "precompile_done": "Precompiled {} files for {} (hash-based bytecode)",
+    "precompile_failed": "Could not compile {} files; they will be compiled on first run",
+    "precompile_unavailable": "No Python {} interpreter available to compile bytecode with; packaging without precompiled bytecode",
+    "bundle_done": "Bundled {} pure-Python packages ({} files, {}) into venv/site-packages.zip",
+    "timings_written": "Timings written to {}",
+    "daemon_listening": "Build daemon listening on {} (pid {}); submit builds with --submit",
+    "daemon_stopped": "Build daemon stopped",
+    "daemon_needs_targets": "The daemon cannot show menus; pass --targets or a maintenance command",
+    "daemon_job_submitted": "Build {} submitted to {}",
+    "daemon_unreachable": "Cannot reach the build daemon at {}: {}",
+    "packaging_reused": "Reused {} of {} files ({}) unchanged from the previous package",
     "packaging_error": "Error packaging project: {}",
     "setup_error": "Error setting up virtual environment: {}",
     "failed_setup": "Failed to set up virtual environment.",
     "failed_packaging": "Failed to package project.",
     "done": "Done! Your project is now ready for offline use.",
-    "output_location": "You can find the packaged project at: {}"
+    "output_location": "You can find the packaged project at: {}",
+    "unknown_target": "Unknown target '{}'. Valid targets: {}",
+    "unsupported_target_python": "Python {} is not available for {}",
+    "batch_targets": "Building {} targets, up to {} at a time: {}",
+    "batch_target_started": "[{}:{}] Started, log: {}",
+    "batch_target_finished": "[{}:{}] {} in {:.1f}s",
+    "batch_summary_title": "=== Build Summary ===",
+    "batch_col_target": "Target",
+    "batch_col_python": "Python",
+    "batch_col_status": "Status",
+    "batch_col_time": "Time",
+    "batch_col_output": "Output / Log",
+    "batch_failed": "{} of {} targets failed. See the logs for details.",
+    "status_ok": "OK",
+    "status_setup_failed": "Environment setup failed",
+    "status_packaging_failed": "Packaging failed",
+    "store_error": "Error linking files from the content store: {}",
+    "store_report": "Content store: {} objects, {} stored, {} linked references, {} saved",
+    "store_gc": "Content store cleanup: removed {} objects, freed {}",
+    "wheelhouse_populating": "Downloading wheels for Python {} ({}) into the wheelhouse...",
+    "wheelhouse_added": "Added {} new wheels to {}",
+    "wheelhouse_error": "Error populating the wheelhouse: {}",
+    "wheelhouse_platform_mismatch": "Wheels for {} cannot be installed into a venv of this {} host; use --cross-build to build this target here",
+    "wheelhouse_needs_targets": "--wheelhouse-populate requires --targets",
+    "wheelhouse_pruned": "Removed {} wheels from the wheelhouse, freed {}",
+    "wheelhouse_exported": "Wheelhouse exported to {}",
+    "wheelhouse_serving": "Serving the wheelhouse at {} (index: /<tag>/simple/). Press Ctrl+C to stop."
 }
 
 # 中文翻译
@@ -55,17 +117,79 @@ ZH_CN_TRANSLATIONS = {
     "using_default_python": "使用{}的默认Python版本",
     "found_files": "在项目中找到{}个Python文件",
     "detected_deps": "检测到的依赖项：{}",
+    "detected_deps_for": "Python {}检测到的依赖项：{}",
+    "reachable_summary": "入口 {}：{1}/{2}个Python文件可达",
+    "no_entry_points": "未找到入口文件（{}），将分析所有文件",
+    "parse_diagnostics": "{}个文件未能完整分析，例如{}：{}",
     "no_deps": "无",
     "setup_venv": "正在使用Python {}设置虚拟环境...",
     "installing_deps": "安装依赖项：{}",
+    "removing_deps": "移除依赖项：{}",
+    "venv_reused": "依赖项未变化，复用位于{}的虚拟环境",
+    "deps_up_to_date": "已安装的依赖项均为最新",
+    "cross_layout": "交叉构建{}（{}）：直接从wheel组装环境，不创建本机虚拟环境",
+    "cross_wheel_missing": "{3}中没有适用于Python {1}（{2}）的{0}的wheel",
+    "runtime_downloading": "正在从{2}下载Python {0}运行时（{1}）...",
+    "runtime_bundled": "从{1}打包Python {0}运行时",
+    "runtime_ok": "运行时{}：正常（{}）",
+    "runtime_broken": "运行时{}：发现{}个问题，例如{}",
+    "runtime_none": "{}中没有缓存的运行时",
     "packaging_project": "正在为{}打包项目...",
     "packaging_success": "项目打包成功：{}",
+    "dist_index_built": "已索引{}个发行包，共{}个导入名，保存到{}",
+    "delta_success": "更新包已创建：{}（新增{}个、修改{}个、删除{}个文件；{}，完整包为{}）",
+    "delta_base_missing": "未找到之前的构建：{}",
+    "delta_base_overwritten": "--delta-from 必须指向之前构建的副本，{}会被本次构建覆盖",
+    "slim_applied": "精简虚拟环境（{}）：排除{}个文件，{}",
+    "slim_report_title": "{}的精简报告（规则：{}），不会删除任何文件",
+    "slim_col_rule": "规则",
+    "slim_col_package": "包",
+    "slim_col_files": "文件数",
+    "slim_col_size": "大小",
+    "slim_report_total": "合计：{1}个文件中的{0}个，{3}中的{2}（{4:.1f}%）",
+    "precompile_done": "已为{1}预编译{0}个文件（基于哈希的字节码）",
+    "precompile_failed": "有{}个文件无法编译，将在首次运行时编译",
+    "precompile_unavailable": "没有可用于编译字节码的Python {}解释器，将不预编译字节码进行打包",
+    "bundle_done": "已将{}个纯Python包（{}个文件，{}）打包到venv/site-packages.zip",
+    "timings_written": "耗时统计已写入{}",
+    "daemon_listening": "构建守护进程正在监听{}（pid {}）；使用--submit提交构建",
+    "daemon_stopped": "构建守护进程已停止",
+    "daemon_needs_targets": "守护进程无法显示菜单；请传入--targets或维护命令",
+    "daemon_job_submitted": "构建{}已提交到{}",
+    "daemon_unreachable": "无法连接构建守护进程{}：{}",
+    "packaging_reused": "从上一次的包中复用了{1}个文件中未变化的{0}个（{2}）",
     "packaging_error": "打包项目时出错：{}",
     "setup_error": "设置虚拟环境时出错：{}",
     "failed_setup": "无法设置虚拟环境。",
     "failed_packaging": "无法打包项目。",
     "done": "完成！您的项目现已准备好离线使用。",
-    "output_location": "您可以在以下位置找到打包的项目：{}"
+    "output_location": "您可以在以下位置找到打包的项目：{}",
+    "unknown_target": "未知目标'{}'。可用目标：{}",
+    "unsupported_target_python": "{1}不支持Python {0}",
+    "batch_targets": "正在构建{}个目标，最多同时构建{}个：{}",
+    "batch_target_started": "[{}:{}] 已开始，日志：{}",
+    "batch_target_finished": "[{}:{}] {}，用时{:.1f}秒",
+    "batch_summary_title": "=== 构建汇总 ===",
+    "batch_col_target": "目标",
+    "batch_col_python": "Python",
+    "batch_col_status": "状态",
+    "batch_col_time": "用时",
+    "batch_col_output": "输出 / 日志",
+    "batch_failed": "{}个目标（共{}个）构建失败。详情请查看日志。",
+    "status_ok": "成功",
+    "status_setup_failed": "环境设置失败",
+    "status_packaging_failed": "打包失败",
+    "store_error": "从内容存储链接文件时出错：{}",
+    "store_report": "内容存储：{}个对象，占用{}，{}个链接引用，节省{}",
+    "store_gc": "内容存储清理：删除{}个对象，释放{}",
+    "wheelhouse_populating": "正在为Python {}（{}）下载wheel到本地仓库...",
+    "wheelhouse_added": "已向{1}添加{0}个新wheel",
+    "wheelhouse_error": "填充本地wheel仓库时出错：{}",
+    "wheelhouse_platform_mismatch": "{}的wheel无法安装到本机（{}）的虚拟环境中；请使用 --cross-build 在本机构建此目标",
+    "wheelhouse_needs_targets": "--wheelhouse-populate 需要同时指定 --targets",
+    "wheelhouse_pruned": "已从本地wheel仓库删除{}个wheel，释放{}",
+    "wheelhouse_exported": "本地wheel仓库已导出到{}",
+    "wheelhouse_serving": "正在{}提供本地wheel仓库（索引：/<tag>/simple/）。按Ctrl+C停止。"
 }
 
 # 翻译映射
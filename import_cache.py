@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from import_scanner import ImportStatement
+
+# Per-project directory for the toolkit's own caches, excluded from scans and packages
+CACHE_DIR_NAME = ".auto-python-toolkit"
+
+# Files modified this close to the time they were cached may have changed again
+# within the same mtime tick, so their content hash is always re-checked
+RACY_WINDOW_NS = 2_000_000_000
+
+
+class ImportCache:
+    """
+    Persistent on-disk cache of per-file import analysis results.
+    Entries are keyed by path and validated against size, mtime and a
+    SHA-256 of the content, so unchanged files are never parsed twice.
+    """
+
+    SCHEMA_VERSION = "4"
+
+    def __init__(self, db_path: Path, root: Path, rebuild: bool = False, engine: str = ""):
+        """
+        Args:
+            db_path: Location of the SQLite database
+            root: Project root; paths are stored relative to it so the cache
+                survives the checkout moving
+            rebuild: If True, discard all existing entries
+            engine: Import engine that produced the entries; switching
+                engines discards them, since results on invalid files differ
+        """
+        self.db_path = Path(db_path)
+        self.root = Path(root)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path))
+        self.conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+
+        version = f"{self.SCHEMA_VERSION}:{engine}"
+        row = self.conn.execute("SELECT value FROM meta WHERE key = 'schema'").fetchone()
+        if rebuild or row is None or row[0] != version:
+            self.conn.execute("DROP TABLE IF EXISTS files")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            " path TEXT PRIMARY KEY, size INTEGER, mtime_ns INTEGER, cached_ns INTEGER,"
+            " sha256 TEXT, statements TEXT, script TEXT, diagnostics TEXT)"
+        )
+        self.conn.execute("INSERT OR REPLACE INTO meta VALUES ('schema', ?)", (version,))
+        self.conn.commit()
+
+        # Load everything up front: one query is far cheaper than one per file
+        self._rows = {
+            row[0]: row[1:]
+            for row in self.conn.execute(
+                "SELECT path, size, mtime_ns, cached_ns, sha256, statements, script, diagnostics FROM files"
+            )
+        }
+        self._pending = {}
+        self.hits = 0
+        self.misses = 0
+
+    def _key(self, file_path: Path) -> str:
+        try:
+            return Path(file_path).relative_to(self.root).as_posix()
+        except ValueError:
+            return Path(file_path).as_posix()
+
+    @staticmethod
+    def hash_bytes(data: bytes) -> str:
+        return hashlib.sha256(data).hexdigest()
+
+    @staticmethod
+    def hash_file(file_path: Path, block_size: int = 1024 * 1024) -> str:
+        hasher = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                hasher.update(block)
+        return hasher.hexdigest()
+
+    def lookup(self, file_path: Path, large_file_size: Optional[int] = None
+               ) -> Tuple[Optional[Tuple[List[ImportStatement], Optional[Dict[str, Any]], List[str]]],
+                          os.stat_result, Optional[bytes]]:
+        """
+        Look up the cached analysis of a file.
+
+        Args:
+            file_path: File to look up
+            large_file_size: Files larger than this are hashed in blocks
+                instead of being read into memory (default: no limit)
+
+        Returns:
+            A tuple of (result, stat, content). result is (import
+            statements, script table, diagnostics) on a hit and None on a miss. content holds the
+            file bytes if they had to be read to verify the hash, so callers
+            can avoid a second read.
+        """
+        st = os.stat(file_path)
+        key = self._key(file_path)
+        row = self._pending.get(key) or self._rows.get(key)
+        if row is None:
+            self.misses += 1
+            return None, st, None
+
+        size, mtime_ns, cached_ns, digest, statements, script, diagnostics = row
+        if size == st.st_size and mtime_ns == st.st_mtime_ns and st.st_mtime_ns < cached_ns - RACY_WINDOW_NS:
+            self.hits += 1
+            return self._decode(statements, script, diagnostics), st, None
+
+        if size != st.st_size:
+            self.misses += 1
+            return None, st, None
+
+        # Stat changed (touch, checkout): fall back to comparing content hashes
+        if large_file_size is not None and st.st_size > large_file_size:
+            content = None
+            current = self.hash_file(file_path)
+        else:
+            with open(file_path, "rb") as f:
+                content = f.read()
+            current = self.hash_bytes(content)
+        if digest == current:
+            self.hits += 1
+            self._pending[key] = (st.st_size, st.st_mtime_ns, time.time_ns(), digest, statements, script, diagnostics)
+            return self._decode(statements, script, diagnostics), st, content
+
+        self.misses += 1
+        return None, st, content
+
+    @staticmethod
+    def _decode(statements: str, script: str, diagnostics: str
+                ) -> Tuple[List[ImportStatement], Optional[Dict[str, Any]], List[str]]:
+        return ([(module, level, tuple(names)) for module, level, names in json.loads(statements)],
+                json.loads(script), json.loads(diagnostics))
+
+    def store(self, file_path: Path, size: int, mtime_ns: int, digest: str, statements: List[ImportStatement],
+              script: Optional[Dict[str, Any]] = None, diagnostics: Optional[List[str]] = None):
+        """Record the analysis result for a file whose content hashes to digest."""
+        self._pending[self._key(file_path)] = (
+            size, mtime_ns, time.time_ns(), digest, json.dumps(statements),
+            # TOML dates have no JSON form; script blocks hardly ever use them
+            json.dumps(script, default=str), json.dumps(diagnostics or []),
+        )
+
+    def evict_missing(self, live_files: Iterable[Path]):
+        """Drop entries for files that no longer exist or are no longer scanned."""
+        live = {self._key(p) for p in live_files}
+        stale = [key for key in self._rows if key not in live]
+        for key in stale:
+            del self._rows[key]
+        self._pending = {k: v for k, v in self._pending.items() if k in live}
+        if stale:
+            self.conn.executemany("DELETE FROM files WHERE path = ?", [(k,) for k in stale])
+
+    def flush(self):
+        """Write pending entries to disk."""
+        if self._pending:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(key,) + row for key, row in self._pending.items()],
+            )
+            self._rows.update(self._pending)
+            self._pending = {}
+        self.conn.commit()
+
+    def close(self):
+        self.flush()
+        self.conn.close()
@@ -0,0 +1,121 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from collections import deque
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from import_scanner import ImportStatement
+
+# Files treated as entry points when none are configured
+DEFAULT_ENTRY_POINTS = ("main.py", "app.py", "__main__.py")
+
+def _module_name(path: Path, root: Path) -> Optional[str]:
+    """Return the dotted module name of a file relative to an import root."""
+    try:
+        parts = list(path.relative_to(root).with_suffix("").parts)
+    except ValueError:
+        return None
+    if parts and parts[-1] == "__init__":
+        parts.pop()
+    if not parts or not all(part.isidentifier() for part in parts):
+        return None
+    return ".".join(parts)
+
+
+def local_module_names(project_path: Path, python_files: Iterable[Path]) -> Set[str]:
+    """Return the top-level names under which the project's own modules are importable."""
+    roots = [project_path / "src", project_path]
+    names = set()
+    for path in python_files:
+        for root in roots:
+            name = _module_name(path, root)
+            if name:
+                names.add(name.split(".")[0])
+                break
+    return names
+
+
+class ImportGraph:
+    """
+    Import graph of a project's own modules.
+
+    Imports are resolved against the project root, a src/ directory if there
+    is one and the directories of the entry points, as Python would put them
+    on sys.path. Walking the graph from the entry points gives the local
+    files they can load and the third-party modules those files import.
+    Imports made dynamically (importlib.import_module, __import__) cannot
+    be seen.
+    """
+
+    def __init__(self, project_path: Path, python_files: Iterable[Path],
+                 statements_of: Callable[[Path], List[ImportStatement]]):
+        """
+        Args:
+            project_path: The project root directory
+            python_files: The project's Python files
+            statements_of: Returns the import statements of a file, e.g.
+                from DependencyAnalyzer.analyze_file, so files are analyzed
+                by the configured engine and answered from its caches
+        """
+        self.project_path = Path(project_path)
+        self.python_files = [Path(p) for p in python_files]
+        self.statements_of = statements_of
+
+    def _module_map(self, entry_points: List[Path]) -> Dict[str, Path]:
+        roots = [p.parent for p in entry_points] + [self.project_path / "src", self.project_path]
+        modules = {}
+        # Earlier roots win, as on sys.path
+        for root in reversed(roots):
+            for path in self.python_files:
+                name = _module_name(path, root)
+                if name:
+                    modules[name] = path
+        return modules
+
+    @staticmethod
+    def _candidates(module: str, level: int, names: Tuple[str, ...], package: str) -> List[str]:
+        """Return the module names an import statement may load, parents first."""
+        if level:
+            parts = package.split(".") if package else []
+            if level - 1 > len(parts):
+                return []
+            base = parts[:len(parts) - (level - 1)]
+            module = ".".join(base + ([module] if module else []))
+        if not module:
+            return []
+        parts = module.split(".")
+        candidates = [".".join(parts[:i]) for i in range(1, len(parts) + 1)]
+        candidates.extend(f"{module}.{name}" for name in names if name != "*")
+        return candidates
+
+    def reachable(self, entry_points: List[Path]) -> Tuple[Set[Path], Set[str]]:
+        """
+        Walk the graph from the entry points.
+
+        Returns:
+            (local files reachable from the entry points,
+             top-level names of the non-local modules they import)
+        """
+        entry_points = [Path(p) for p in entry_points]
+        modules = self._module_map(entry_points)
+        paths = {path: name for name, path in modules.items()}
+        seen = set(entry_points)
+        queue = deque(entry_points)
+        external = set()
+
+        while queue:
+            path = queue.popleft()
+            name = paths.get(path, "")
+            package = name if path.name == "__init__.py" else name.rpartition(".")[0]
+            for module, level, names in self.statements_of(path):
+                candidates = self._candidates(module, level, names, package)
+                local = [modules[c] for c in candidates if c in modules]
+                if not local and not level and candidates:
+                    external.add(candidates[0])
+                for target in local:
+                    if target not in seen:
+                        seen.add(target)
+                        queue.append(target)
+
+        return seen, external
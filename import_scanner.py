@@ -0,0 +1,243 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import io
+import mmap
+import os
+import re
+import tokenize
+from typing import List, Optional, Set, Tuple
+
+# (module, relative import level, imported names)
+ImportStatement = Tuple[str, int, Tuple[str, ...]]
+
+# Tokens after which a new simple statement can begin. ':' covers compound
+# statement bodies on the same line, e.g. "if TYPE_CHECKING: import x".
+_STATEMENT_BREAKS = {tokenize.NEWLINE, tokenize.INDENT, tokenize.DEDENT}
+_STATEMENT_BREAK_OPS = {";", ":"}
+
+# Tokens that carry no meaning for statement structure
+_SKIPPED = {tokenize.COMMENT, tokenize.NL, tokenize.ENCODING}
+
+# Import statements at the start of a line, triple quotes and comments, for
+# scanning files too large to tokenize. From-imports capture the leading dots,
+# the module and the imported names, parenthesized or continued with backslashes.
+_IMPORT_LINE_RE = re.compile(
+    rb"^[ \t]*(?:import[ \t]+([A-Za-z_][\w. \t,]*)"
+    rb"|from[ \t]+(\.*)[ \t]*([A-Za-z_][\w.]*)?[ \t]*import\b[ \t]*(\([^)]*\)|(?:[\w \t,*]|\\\r?\n)*))"
+    rb"|(\"{3}|'{3})|#[^\n]*",
+    re.MULTILINE)
+_IMPORT_LINE_TEXT_RE = re.compile(_IMPORT_LINE_RE.pattern.decode("ascii"), re.MULTILINE)
+
+# Bytes of a mapped file scanned at a time; pages behind the window are released
+MAP_WINDOW = 16 * 1024 * 1024
+
+
+def decode_source(data: bytes) -> Tuple[str, str, Optional[str]]:
+    """
+    Decode Python source the way the interpreter does: by its byte order
+    mark or coding cookie, UTF-8 otherwise. Undecodable bytes are replaced
+    rather than failing the analysis.
+
+    Returns:
+        (text, encoding used, problem found or None)
+    """
+    problem = None
+    try:
+        encoding, _ = tokenize.detect_encoding(io.BytesIO(data).readline)
+    except SyntaxError as e:
+        # Unknown encoding in the coding cookie, or a cookie contradicting the BOM
+        encoding, problem = "utf-8", str(e)
+    text = data.decode(encoding, errors="replace")
+    if problem is None and "\ufffd" in text and "\ufffd".encode(encoding, errors="ignore") not in data:
+        problem = f"invalid {encoding} bytes replaced"
+    return text, encoding, problem
+
+
+def scan_imports(source: str) -> Set[str]:
+    """
+    Extract the top-level module names imported by Python source code,
+    using the tokenizer instead of building a full AST.
+
+    The result matches ImportVisitor for any file that parses: imports are
+    collected wherever they appear, including function bodies, conditional
+    blocks, try/except ImportError fallbacks and TYPE_CHECKING guards.
+    Relative imports are skipped.
+
+    Raises:
+        tokenize.TokenError, SyntaxError: If the source cannot be tokenized;
+            callers should fall back to the AST engine.
+    """
+    return top_level_imports(scan_import_statements(source))
+
+
+def scan_import_statements(source: str) -> List[ImportStatement]:
+    """
+    Extract every import statement of Python source code from its tokens,
+    with full module paths, relative import levels and imported names.
+    Statements are found wherever scan_imports finds them.
+
+    Raises:
+        tokenize.TokenError, SyntaxError: If the source cannot be tokenized
+    """
+    # Most of the cost is tokenizing; skip it when there is nothing to find
+    if "import" not in source:
+        return []
+
+    statements = []
+    at_start = True
+    # None outside import statements, "import" within "import a.b as c, d",
+    # "from" before the "import" of a from-import, "names" after it
+    state = None
+    module, level, names = [], 0, []
+    prev = None
+
+    def finish():
+        if state == "import" and module:
+            statements.append((".".join(module), 0, ()))
+        elif state == "names":
+            statements.append((".".join(module), level, tuple(names)))
+
+    for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+        tok_type = tok.type
+        if tok_type in _SKIPPED:
+            continue
+        if tok_type in _STATEMENT_BREAKS or (tok_type == tokenize.OP and tok.string in _STATEMENT_BREAK_OPS):
+            finish()
+            at_start = True
+            state = None
+            prev = None
+            continue
+
+        string = tok.string
+        if tok_type == tokenize.NAME and at_start and string in ("import", "from"):
+            state = string
+            module, level, names = [], 0, []
+        elif state == "import":
+            if tok_type == tokenize.NAME and prev in ("import", ",", "."):
+                module.append(string)
+            elif string in ("as", ","):
+                finish()
+                module = []
+        elif state == "from":
+            if string in (".", "...") and not module:
+                level += len(string)
+            elif string == "import":
+                state = "names"
+            elif tok_type == tokenize.NAME:
+                module.append(string)
+        elif state == "names":
+            if string == "*" or (tok_type == tokenize.NAME and prev in ("import", ",", "(")):
+                names.append(string)
+        at_start = False
+        prev = string
+
+    finish()
+    return statements
+
+
+def top_level_imports(statements: List[ImportStatement]) -> Set[str]:
+    """Return the top-level names of the modules imported by absolute import statements."""
+    # Relative imports always refer to the project's own modules
+    return {module.split(".")[0] for module, level, _ in statements if not level}
+
+
+def regex_import_statements(source: str) -> List[ImportStatement]:
+    """
+    Find the import statements of source code that does not tokenize or
+    parse, line by line and with the limits of scan_mapped_imports.
+    """
+    statements = []
+    pos = 0
+    while True:
+        match = _IMPORT_LINE_TEXT_RE.search(source, pos)
+        if match is None:
+            break
+        pos = match.end()
+        if match.group(5) is not None:
+            close = source.find(match.group(5), pos)
+            if close < 0:
+                break
+            pos = close + 3
+        else:
+            statements.extend(_line_statements(*match.groups()[:4]))
+    return statements
+
+
+def scan_mapped_imports(path: str, hasher=None) -> List[ImportStatement]:
+    """
+    Find the import statements of a file of any size through a memory map,
+    without reading it into memory or tokenizing it. The file is scanned
+    in windows and the pages of each finished window are released again,
+    so memory use stays flat however large the file is.
+
+    Only import statements at the start of a line are recognized, and
+    triple-quoted strings and comments are skipped. This is less exact than
+    scan_imports: imports after ";" or ":" on the same line are missed, and
+    a triple quote inside a one-line string is taken for the start of a
+    multi-line string. Generated modules, which this is meant for, rarely
+    have either.
+
+    Args:
+        path: File to scan
+        hasher: Optional hashlib object that is fed the whole file on the way
+
+    Returns:
+        (module, relative import level, imported names) of each statement,
+        in order of appearance; "import a, b" gives one entry per module
+    """
+    statements = []
+    with open(path, "rb") as f:
+        size = os.fstat(f.fileno()).st_size
+        if size == 0:
+            return statements
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            start = 0
+            # Closing quote of the multi-line string being skipped, if any
+            quote = None
+            while start < size:
+                # Windows end at a line break so no statement is cut in two
+                end = size if start + MAP_WINDOW >= size else mm.rfind(b"\n", start, start + MAP_WINDOW) + 1
+                if end <= start:
+                    end = min(size, start + MAP_WINDOW)
+                pos = start
+                while pos < end:
+                    if quote is not None:
+                        close = mm.find(quote, pos, end)
+                        if close < 0:
+                            break
+                        pos, quote = close + 3, None
+                        continue
+                    match = _IMPORT_LINE_RE.search(mm, pos, end)
+                    if match is None:
+                        break
+                    pos = match.end()
+                    if match.group(5) is not None:
+                        quote = match.group(5)
+                    elif match.group(1) is not None or match.group(2) is not None:
+                        statements.extend(_line_statements(
+                            *(group.decode("latin-1") if group is not None else None
+                              for group in match.groups()[:4])))
+                if hasher is not None:
+                    hasher.update(memoryview(mm)[start:end])
+                if hasattr(mm, "madvise") and hasattr(mmap, "MADV_DONTNEED"):
+                    released = start - start % mmap.PAGESIZE
+                    mm.madvise(mmap.MADV_DONTNEED, released, end - released)
+                start = end
+    return statements
+
+
+def _line_statements(imported: Optional[str], dots: Optional[str], module: Optional[str],
+                     names: Optional[str]) -> List[ImportStatement]:
+    """Turn the groups of an _IMPORT_LINE_RE match into import statements."""
+    if imported is not None:
+        return [(name, 0, ()) for name in _first_words(imported)]
+    if not dots and not module:
+        return []
+    names = re.sub(r"#[^\n]*|\\\r?\n", " ", names).strip().strip("()")
+    return [(module or "", len(dots), tuple(_first_words(names)))]
+
+
+def _first_words(names: str) -> List[str]:
+    """Return the names of a comma-separated import list, without their aliases."""
+    return [part.split()[0] for part in names.split(",") if part.split()]
@@ -19,14 +19,34 @@ import sys
 import platform
 import subprocess
 import shutil
+import site
 import argparse
+import hashlib
 from pathlib import Path
 import json
 import re
 import locale
-from typing import Dict, List, Tuple, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Set, TextIO, Tuple, Optional
 
-from dependency_analyzer import DependencyAnalyzer
+from build_daemon import DEFAULT_DAEMON_PORT, BuildDaemon, client_argv, submit_build
+from build_pipeline import BuildPipeline
+from build_metrics import PHASES, BuildMetrics, load_hook
+from archive_writer import COMPRESSION_METHODS, ArchiveWriter, check_level
+from delta_update import build_delta
+from distribution_index import DistributionIndex
+from content_store import ContentStore, format_size
+from dependency_analyzer import DEFAULT_LARGE_FILE_SIZE, IMPORT_ENGINES, DependencyAnalyzer
+from import_cache import CACHE_DIR_NAME, ImportCache
+from import_graph import DEFAULT_ENTRY_POINTS
+from project_walker import CachedProjectWalker, ProjectWalker
+from precompile import BytecodeCompiler, FastStartLayout, target_interpreter
+from venv_slimmer import VenvSlimmer, prune_copy
+from venv_lock import VenvLock, diff_pins, parse_pins, same_pins
+from wheelhouse import Wheelhouse, host_platform
+from wheel_installer import UV_PLATFORMS, WheelInstaller, find_wheel
+from runtime_cache import RUNTIME_ARCHES, RUNTIME_DIR, RuntimeCache
 from i18n import get_translator
 
 
@@ -36,45 +56,119 @@ class AutoPythonToolkit:
     Uses uv to download Python, analyze dependencies, and package everything together.
     """
     
-    def __init__(self, lang: str = None):
+    def __init__(self, lang: str = None, excludes: Optional[List[str]] = None,
+                 use_gitignore: bool = True, use_cache: bool = True,
+                 rebuild_cache: bool = False, jobs: Optional[int] = None,
+                 import_engine: str = "fast", staging: bool = False,
+                 compression: str = "deflate", compression_level: Optional[int] = None,
+                 dedupe: bool = True, wheelhouse: Optional[Path] = None,
+                 offline: bool = False, recreate_venv: bool = False,
+                 incremental: bool = True, delta_from: Optional[Path] = None,
+                 entry_points: Optional[List[Path]] = None, prune_unreachable: bool = False,
+                 slim: Optional[str] = None, precompile: bool = False,
+                 zip_site_packages: bool = False, profile: Optional[List[str]] = None,
+                 profile_dir: Optional[Path] = None, pipeline: bool = False,
+                 large_file_size: int = DEFAULT_LARGE_FILE_SIZE, memory_limit: Optional[int] = None,
+                 cross_build: bool = False, bundle_runtime: bool = False,
+                 runtime_cache: Optional[Path] = None, runtime_mirror: Optional[str] = None):
         self.project_dir = Path.cwd()
         self.output_dir = self.project_dir / "output"
+        self.cache_dir = self.project_dir / CACHE_DIR_NAME
+        self.dist_index_path = self.cache_dir / "distribution_index.sqlite"
+        self.use_cache = use_cache
+        self.rebuild_cache = rebuild_cache
+        self.jobs = jobs or os.cpu_count() or 1
+        self.import_engine = import_engine
+        self.large_file_size = large_file_size
+        self.memory_limit = memory_limit
+        self.staging = staging
+        self.compression = compression
+        self.compression_level = compression_level
+        self.dedupe = dedupe
+        self._store = None
+        # Offline installs and cross-builds need somewhere to install from
+        if (offline or cross_build) and wheelhouse is None:
+            wheelhouse = self.cache_dir / "wheelhouse"
+        self.wheelhouse = Wheelhouse(wheelhouse) if wheelhouse else None
+        self.offline = offline
+        # Assemble Windows venvs from wheels instead of with uv venv/uv pip on this host
+        self.cross_build = cross_build
+        # Ship an embeddable Python next to the venv, taken from a cache shared between builds
+        self.bundle_runtime = bundle_runtime
+        self.runtimes = RuntimeCache(runtime_cache, runtime_mirror)
+        self.recreate_venv = recreate_venv
+        self.incremental = incremental
+        self.delta_from = delta_from
+        # None analyzes every file; a list (empty for the defaults) follows the
+        # imports of the entry points only
+        self.entry_points = entry_points
+        self.prune_unreachable = prune_unreachable
+        self.reachable_files: Optional[Set[Path]] = None
+        self.slimmer = VenvSlimmer.from_spec(slim) if slim else None
+        # The zip bundle is only fast with bytecode, since zipimport cannot write any
+        self.precompile = precompile or zip_site_packages
+        self.zip_site_packages = zip_site_packages
+        self.pipeline = pipeline
+        self._uv_version = None
+        self._metrics_args = (profile or (), profile_dir or self.output_dir / "profiles")
+        self.metrics = BuildMetrics(*self._metrics_args)
+        self.walker = ProjectWalker(self.project_dir, excludes, use_gitignore)
+        self._walker_args = (excludes, use_gitignore)
+        # State kept between builds once keep_warm() is called (build daemon)
+        self.warm = False
+        self._uv_ok = False
+        self._caches: Optional[Tuple[Optional[ImportCache], Optional[DistributionIndex]]] = None
+        self._analyzers: Dict[Optional[str], DependencyAnalyzer] = {}
         self.translator = get_translator(lang)
         self._ = self.translator.get  # 简化访问翻译的方法
         
         # 支持的Windows版本及其Python版本限制
         self.windows_versions = {
             "Windows 7 (64-bit)": {
+                "key": "win7-64",
+                "platform": "win_amd64",
                 "min_py": "3.7", 
                 "max_py": "3.7.9",
                 "versions": ["3.7.9"]
             },
             "Windows 10 (32-bit)": {
+                "key": "win10-32",
+                "platform": "win32",
                 "min_py": "3.7", 
                 "max_py": "3.11.11",
                 "versions": ["3.7.9", "3.8.20", "3.9.21", "3.10.16", "3.11.11"]
             },
             "Windows 10 (64-bit)": {
+                "key": "win10-64",
+                "platform": "win_amd64",
                 "min_py": "3.7", 
                 "max_py": "3.13.2",
                 "versions": ["3.7.9", "3.8.20", "3.9.21", "3.10.16", "3.11.11", "3.12.9", "3.13.2"]
             },
             "Windows 11 (64-bit)": {
+                "key": "win11-64",
+                "platform": "win_amd64",
                 "min_py": "3.7", 
                 "max_py": "3.14.0a6",
                 "versions": ["3.7.9", "3.8.20", "3.9.21", "3.10.16", "3.11.11", "3.12.9", "3.13.2", "3.14.0a6"]
             },
             "Windows Server 2016 (64-bit)": {
+                "key": "server2016-64",
+                "platform": "win_amd64",
                 "min_py": "3.7", 
                 "max_py": "3.11.11",
                 "versions": ["3.7.9", "3.8.20", "3.9.21", "3.10.16", "3.11.11"]
             },
             "Windows Server 2019 (64-bit)": {
+                "key": "server2019-64",
+                "platform": "win_amd64",
                 "min_py": "3.7", 
                 "max_py": "3.13.2",
                 "versions": ["3.7.9", "3.8.20", "3.9.21", "3.10.16", "3.11.11", "3.12.9", "3.13.2"]
             },
             "Windows Server 2022 (64-bit)": {
+                "key": "server2022-64",
+                "platform": "win_amd64",
                 "min_py": "3.7", 
                 "max_py": "3.14.0a6",
                 "versions": ["3.7.9", "3.8.20", "3.9.21", "3.10.16", "3.11.11", "3.12.9", "3.13.2", "3.14.0a6"]
@@ -83,11 +177,16 @@ class AutoPythonToolkit:
         
     def check_uv_installed(self) -> bool:
         """Check if uv is installed and available."""
-        try:
-            subprocess.run(["uv", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        if self.warm and self._uv_ok:
             return True
-        except (subprocess.SubprocessError, FileNotFoundError):
-            return False
+        with self.metrics.phase("check_uv") as phase:
+            try:
+                subprocess.run(["uv", "--version"], check=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                self._uv_ok = True
+                return True
+            except (subprocess.SubprocessError, FileNotFoundError):
+                phase.ok = False
+                return False
     
     def display_os_menu(self) -> str:
         """Display a menu for OS selection and return the selected OS."""
@@ -140,18 +239,227 @@ class AutoPythonToolkit:
                 print(self._("invalid_choice"))
     
     def find_python_files(self) -> List[Path]:
-        """Find all Python files in the project directory."""
-        return list(self.project_dir.glob("**/*.py"))
+        """Find all Python files in the project directory, skipping excluded paths."""
+        with self.metrics.phase("scan") as phase:
+            python_files = self.walker.find_python_files()
+            phase.files = len(python_files)
+        return python_files
     
-    def analyze_dependencies(self) -> List[str]:
+    def analyze_dependencies(self, python_files: Optional[List[Path]] = None,
+                             py_version: Optional[str] = None) -> List[str]:
         """
         Analyze Python files to detect import statements and identify dependencies
         using the advanced DependencyAnalyzer.
+        
+        Args:
+            python_files: Files found by find_python_files, so the project
+                is only walked once per run
+            py_version: Target Python version, whose standard library is
+                excluded from the dependencies
+        """
+        if python_files is None:
+            python_files = self.find_python_files()
+        
+        analyzer = self._analyzer_for(py_version)
+        try:
+            entry_points = self.entry_point_files()
+            with self.metrics.phase("analyze", py_version) as phase:
+                dependencies = analyzer.analyze_project(self.project_dir, python_files, entry_points)
+                phase.files = len(python_files)
+                phase.bytes_read = analyzer.parsed_bytes
+                phase.extra["parsed_files"] = analyzer.parsed_files
+                phase.extra["mapped_files"] = analyzer.mapped_files
+                phase.extra["dependencies"] = len(dependencies)
+                phase.extra["diagnostics"] = len(analyzer.diagnostics)
+            if analyzer.diagnostics:
+                path, problems = next(iter(analyzer.diagnostics.items()))
+                print(self._("parse_diagnostics", len(analyzer.diagnostics),
+                             path.relative_to(self.project_dir).as_posix(), problems[0]))
+            if entry_points is not None:
+                self.reachable_files = analyzer.reachable_files
+                names = ", ".join(p.relative_to(self.project_dir).as_posix() for p in entry_points)
+                print(self._("reachable_summary", names, len(self.reachable_files), len(python_files)))
+            return dependencies
+        finally:
+            if not self.warm:
+                self._close_caches(analyzer.cache, analyzer.distribution_index)
+                # The analyzer stays usable for what it has already read
+                analyzer.cache = analyzer.distribution_index = None
+            elif analyzer.cache is not None:
+                analyzer.cache.flush()
+    
+    def _open_caches(self) -> Tuple[Optional[ImportCache], Optional[DistributionIndex]]:
+        """Open the import cache and the distribution index, if enabled and built."""
+        if self._caches is not None:
+            return self._caches
+        cache = None
+        if self.use_cache:
+            cache = ImportCache(self.cache_dir / "import_cache.sqlite", self.project_dir,
+                                rebuild=self.rebuild_cache, engine=self.import_engine)
+        index = None
+        if self.dist_index_path.exists():
+            index = DistributionIndex(self.dist_index_path)
+        if self.warm:
+            self._caches = (cache, index)
+        return cache, index
+    
+    @staticmethod
+    def _close_caches(cache: Optional[ImportCache], index: Optional[DistributionIndex]):
+        if cache is not None:
+            cache.close()
+        if index is not None:
+            index.close()
+    
+    def _analyzer_for(self, py_version: Optional[str]) -> DependencyAnalyzer:
+        """
+        Return an analyzer for a target Python version. The last one used for
+        each version is kept so later steps reuse what it has read; when warm,
+        it also analyzes the next build.
+        """
+        analyzer = self._analyzers.get(py_version) if self.warm else None
+        if analyzer is None:
+            cache, index = self._open_caches()
+            analyzer = DependencyAnalyzer(cache, jobs=self.jobs, import_engine=self.import_engine,
+                                          distribution_index=index, target_python=py_version,
+                                          large_file_size=self.large_file_size,
+                                          memory_limit=self.memory_limit)
+            self._analyzers[py_version] = analyzer
+        return analyzer
+    
+    def keep_warm(self):
+        """
+        Keep the file list, the import cache, the distribution index and the
+        analyzers in memory between builds, for the build daemon. The caches
+        are flushed to disk after every analysis instead of being closed.
         """
-        analyzer = DependencyAnalyzer()
-        return analyzer.analyze_project(self.project_dir)
+        self.warm = True
+        self.walker = CachedProjectWalker(self.project_dir, *self._walker_args)
     
-    def setup_virtual_env(self, target_os: str, py_version: str, dependencies: List[str]) -> bool:
+    def start_build(self):
+        """Reset the per-build state of a warm toolkit before it builds again."""
+        self.metrics = BuildMetrics(*self._metrics_args)
+        self.reachable_files = None
+    
+    def warm_up(self) -> int:
+        """
+        Analyze files that changed since the last build, so the next build
+        finds them in the cache.
+        
+        Returns:
+            Number of files scanned
+        """
+        if not self._analyzers:
+            return 0
+        python_files = self.walker.find_python_files()
+        analyzer = next(iter(self._analyzers.values()))
+        analyzer.analyze_project(self.project_dir, python_files)
+        if analyzer.cache is not None:
+            analyzer.cache.flush()
+        return len(python_files)
+    
+    def close(self):
+        """Close the caches kept open by keep_warm()."""
+        if self._caches is not None:
+            self._close_caches(*self._caches)
+            self._caches = None
+        self._analyzers = {}
+    
+    def print_slim_report(self, venv_path: Path):
+        """Show what the slimming rules would leave out of a venv, per rule and per package."""
+        report = self.slimmer.report(venv_path)
+        total, removed = report["total"]["venv"], report["total"]["removed"]
+        print(self._("slim_report_title", venv_path, ", ".join(self.slimmer.rules)))
+        for title, counter in ((self._("slim_col_rule"), report["rules"]),
+                               (self._("slim_col_package"), report["packages"])):
+            rows = sorted(counter.items(), key=lambda item: -item[1][1])
+            width = max([len(title)] + [len(name) for name, _ in rows])
+            print(f"\n  {title.ljust(width)}  {self._('slim_col_files'):>8}  {self._('slim_col_size'):>10}")
+            for name, (files, size) in rows:
+                print(f"  {name.ljust(width)}  {files:>8}  {format_size(size):>10}")
+        share = removed[1] / total[1] * 100 if total[1] else 0.0
+        print("\n" + self._("slim_report_total", removed[0], total[0], format_size(removed[1]),
+                             format_size(total[1]), share))
+    
+    def entry_point_files(self) -> Optional[List[Path]]:
+        """
+        Return the entry points to analyze from, or None to analyze every file.
+        Without explicit entry points, main.py, app.py and __main__.py are used.
+        """
+        if self.entry_points is None:
+            return None
+        candidates = self.entry_points or [Path(name) for name in DEFAULT_ENTRY_POINTS]
+        found = [self.project_dir / p for p in candidates if (self.project_dir / p).is_file()]
+        if not found:
+            print(self._("no_entry_points", ", ".join(str(p) for p in candidates)))
+            return None
+        return found
+    
+    def unreachable_files(self) -> Set[Path]:
+        """Return the project's Python files no entry point can import, for --prune-unreachable."""
+        if not self.prune_unreachable or self.reachable_files is None:
+            return set()
+        return set(self.find_python_files()) - self.reachable_files
+    
+    def build_distribution_index(self, sources: List[Path]) -> int:
+        """
+        Rebuild the import name to distribution index from wheels and
+        site-packages directories.
+        
+        Args:
+            sources: Wheels, wheel directories and site-packages directories.
+                If empty, the wheelhouse, the project venv and the host
+                interpreter's site-packages are used.
+            
+        Returns:
+            Number of distributions indexed
+        """
+        if not sources:
+            sources = [self.cache_dir / "wheelhouse"]
+            sources += sorted((self.project_dir / "venv").glob("[Ll]ib/**/site-packages"))
+            sources += [Path(p) for p in site.getsitepackages() + [site.getusersitepackages()]]
+        index = DistributionIndex(self.dist_index_path, rebuild=True)
+        try:
+            count = index.add_sources(p for p in sources if p.exists())
+            print(self._("dist_index_built", count, len(index), self.dist_index_path))
+            return count
+        finally:
+            index.close()
+    
+    @property
+    def store(self) -> ContentStore:
+        """Content-addressed store shared by all target builds of this project."""
+        if self._store is None:
+            self._store = ContentStore(self.cache_dir / "store")
+        return self._store
+    
+    def venv_path_for(self, target_os: str, py_version: str) -> Path:
+        """Return the per-target virtual environment used by batch builds."""
+        key = self.windows_versions[target_os]["key"]
+        return self.output_dir / "venvs" / f"{key}-py{py_version}"
+    
+    def _print(self, message: str, log: Optional[TextIO] = None):
+        """Print a message to the console, or to a per-target log in batch builds."""
+        print(message, file=log or sys.stdout, flush=True)
+    
+    def resolve_final_dependencies(self, dependencies: List[str], py_version: Optional[str] = None) -> List[str]:
+        """
+        Return the dependencies to install: those declared in the script block
+        of main.py if there is one, otherwise the detected dependencies.
+        """
+        # Get script dependencies if available
+        script_deps = []
+        main_py = self.project_dir / "main.py"
+        
+        if main_py.exists():
+            # The analyzer that analyzed the project has main.py already
+            analyzer = self._analyzers.get(py_version) or DependencyAnalyzer()
+            script_deps = analyzer.extract_script_dependencies(main_py)
+            
+        # Use script dependencies if available, otherwise use detected dependencies
+        return script_deps if script_deps else dependencies
+    
+    def setup_virtual_env(self, target_os: str, py_version: str, dependencies: List[str],
+                          venv_path: Optional[Path] = None, log: Optional[TextIO] = None) -> bool:
         """
         Set up a virtual environment with uv for the specified OS
         and install the required dependencies.
@@ -160,111 +468,798 @@ class AutoPythonToolkit:
             target_os: The target operating system
             py_version: The Python version to use
             dependencies: List of dependencies to install
+            venv_path: Where to create the environment (default: venv/ in the project)
+            log: If given, progress and uv output are written here instead of the console
             
         Returns:
             True if successful, False otherwise
         """
-        venv_path = self.project_dir / "venv"
+        venv_path = venv_path or self.project_dir / "venv"
         
-        print(self._("setup_venv", py_version))
+        self._print(self._("setup_venv", py_version), log)
         
-        # Get script dependencies if available
-        script_deps = []
-        main_py = self.project_dir / "main.py"
+        prepared = self.prepare_venv(target_os, py_version, venv_path, log)
+        if prepared is None:
+            return False
+        return self.install_dependencies(target_os, py_version, dependencies, venv_path, prepared, log)
+    
+    def _venv_inputs(self, target_os: str, py_version: str, requirements: List[str]) -> Dict:
+        """Return what a venv's fingerprint is computed from."""
+        target = self.windows_versions[target_os]
+        inputs = {
+            "python": py_version,
+            "target": target["key"],
+            "platform": target["platform"],
+            "requirements": sorted(requirements),
+            "uv": self.uv_version(),
+        }
+        if self.cross_build:
+            inputs["layout"] = "cross"
+        return inputs
+    
+    def prepare_venv(self, target_os: str, py_version: str, venv_path: Path,
+                     log: Optional[TextIO] = None) -> Optional[Tuple[Optional[Dict], bool]]:
+        """
+        Keep the venv if it can be brought up to date in place, otherwise
+        create it anew. This does not depend on the dependencies, so it can
+        run while the project is still being analyzed.
         
-        if main_py.exists():
-            analyzer = DependencyAnalyzer()
-            script_deps = analyzer.extract_script_dependencies(main_py)
+        Returns:
+            (previous lock, whether the venv is updated in place), or None if
+            the venv could not be created
+        """
+        output = {"stdout": log, "stderr": subprocess.STDOUT} if log else {}
+        label = f"{self.windows_versions[target_os]['key']}:{py_version}"
+        lock = VenvLock(self.venv_lock_path(venv_path))
+        
+        try:
+            previous = None if self.recreate_venv else lock.load()
+            can_update = ((venv_path / "pyvenv.cfg").exists()
+                          and VenvLock.can_update(previous, self._venv_inputs(target_os, py_version, [])))
             
-        # Use script dependencies if available, otherwise use detected dependencies
-        final_dependencies = script_deps if script_deps else dependencies
+            if not can_update:
+                lock.remove()
+                if venv_path.exists():
+                    shutil.rmtree(venv_path)
+                with self.metrics.phase("venv", label):
+                    if self.cross_build:
+                        target = self.windows_versions[target_os]
+                        self._print(self._("cross_layout", target["key"], target["platform"]), log)
+                        WheelInstaller(venv_path).create_layout(py_version)
+                    else:
+                        # Create virtual environment using uv
+                        subprocess.run(
+                            ["uv", "venv", str(venv_path), f"--python={py_version}"],
+                            check=True, **output
+                        )
+            elif self.cross_build:
+                # Reused layouts get the current site hook too
+                WheelInstaller(venv_path).write_site_hook()
+            return previous, can_update
+        except (subprocess.SubprocessError, OSError) as e:
+            self._print(self._("setup_error", str(e)), log)
+            return None
+    
+    def install_dependencies(self, target_os: str, py_version: str, dependencies: List[str],
+                             venv_path: Path, prepared: Tuple[Optional[Dict], bool],
+                             log: Optional[TextIO] = None) -> bool:
+        """
+        Bring a venv from prepare_venv() up to date with the dependencies.
+        
+        Returns:
+            True if successful, False otherwise
+        """
+        final_dependencies = self.resolve_final_dependencies(dependencies, py_version)
+        output = {"stdout": log, "stderr": subprocess.STDOUT} if log else {}
+        target = self.windows_versions[target_os]
+        label = f"{target['key']}:{py_version}"
+        lock = VenvLock(self.venv_lock_path(venv_path))
+        previous, can_update = prepared
         
-        # Create virtual environment using uv
         try:
-            subprocess.run(
-                ["uv", "venv", str(venv_path), f"--python={py_version}"],
-                check=True
-            )
+            inputs = self._venv_inputs(target_os, py_version, final_dependencies)
+            
+            # Nothing changed since the last build: keep the environment as it is
+            if (can_update and previous["fingerprint"] == VenvLock.fingerprint(inputs)
+                    and same_pins(self._installed_packages(venv_path, log), previous["resolved"])):
+                self._print(self._("venv_reused", venv_path), log)
+                self._write_requirements(final_dependencies, venv_path)
+                return True
             
-            # Install dependencies
-            if final_dependencies:
-                print(self._("installing_deps", ", ".join(final_dependencies)))
-                subprocess.run(
-                    ["uv", "pip", "install"] + final_dependencies,
-                    check=True
-                )
+            install_args = []
+            if self.wheelhouse and final_dependencies:
+                if not self.cross_build and target["platform"] != host_platform():
+                    # uv would install target wheels into a venv for this host's platform
+                    raise ValueError(self._("wheelhouse_platform_mismatch", target["platform"], host_platform()))
+                if not self.offline:
+                    self._print(self._("wheelhouse_populating", py_version, target["platform"]), log)
+                    with self.metrics.phase("wheelhouse", label) as phase:
+                        added = self.wheelhouse.populate(py_version, target["platform"], final_dependencies, log)
+                        phase.files = len(added)
+                # Install only from the wheelhouse, so the build needs no network
+                install_args = ["--offline", "--no-index", "--find-links",
+                                str(self.wheelhouse.files_dir(py_version, target["platform"]))]
             
-            # Generate requirements.txt file for reproducibility
-            if final_dependencies:
-                with open(self.project_dir / "requirements.txt", "w") as f:
-                    for dep in final_dependencies:
-                        f.write(f"{dep}\n")
+            # Resolve to exact pins, then apply only the difference to what is installed
+            with self.metrics.phase("resolve", label) as phase:
+                resolved = self._resolve_pins(venv_path, final_dependencies, install_args, log,
+                                              target_os, py_version)
+                to_install, to_remove = diff_pins(self._installed_packages(venv_path, log), resolved)
+                phase.files = len(resolved)
+            with self.metrics.phase("install", label) as phase:
+                phase.files = len(to_install)
+                phase.extra["installed"] = len(to_install)
+                phase.extra["removed"] = len(to_remove)
+                if self.cross_build:
+                    self._install_wheels(target_os, py_version, venv_path, to_install, to_remove, log)
+                else:
+                    if to_remove:
+                        self._print(self._("removing_deps", ", ".join(to_remove)), log)
+                        subprocess.run(
+                            ["uv", "pip", "uninstall", "--python", str(venv_path)] + to_remove,
+                            check=True, **output
+                        )
+                    if to_install:
+                        # Install dependencies into this environment, not whichever one uv would discover
+                        self._print(self._("installing_deps", ", ".join(to_install)), log)
+                        subprocess.run(
+                            ["uv", "pip", "install", "--python", str(venv_path), "--no-deps"]
+                            + install_args + to_install,
+                            check=True, **output
+                        )
+                if can_update and not to_install:
+                    self._print(self._("deps_up_to_date"), log)
+            if self.wheelhouse and final_dependencies:
+                self.wheelhouse.mark_used(py_version, target["platform"], venv_path)
             
+            lock.save(inputs, resolved)
+            self._write_requirements(final_dependencies, venv_path)
             return True
-        except subprocess.SubprocessError as e:
-            print(self._("setup_error", str(e)))
+        except (subprocess.SubprocessError, OSError, ValueError) as e:
+            self._print(self._("setup_error", str(e)), log)
             return False
     
-    def package_project(self, target_os: str, py_version: str) -> bool:
+    def venv_lock_path(self, venv_path: Path) -> Path:
+        """Return where the fingerprint of a venv is kept, outside the venv so it is never packaged."""
+        digest = hashlib.sha1(str(venv_path.resolve()).encode("utf-8")).hexdigest()[:12]
+        return self.cache_dir / "venv-locks" / f"{venv_path.name}-{digest}.json"
+    
+    def uv_version(self) -> str:
+        """Return the version string of the uv executable, queried once per run."""
+        if self._uv_version is None:
+            result = subprocess.run(["uv", "--version"], check=True, capture_output=True, text=True)
+            self._uv_version = result.stdout.strip()
+        return self._uv_version
+    
+    def _installed_packages(self, venv_path: Path, log: Optional[TextIO] = None) -> Dict[str, str]:
+        """Return the pinned packages installed in a venv."""
+        if self.cross_build:
+            return WheelInstaller(venv_path).installed()
+        result = subprocess.run(
+            ["uv", "pip", "freeze", "--python", str(venv_path)],
+            check=True, stdout=subprocess.PIPE, stderr=log, text=True
+        )
+        return parse_pins(result.stdout)
+    
+    def _resolve_pins(self, venv_path: Path, requirements: List[str], install_args: List[str],
+                      log: Optional[TextIO] = None, target_os: Optional[str] = None,
+                      py_version: Optional[str] = None) -> Dict[str, str]:
+        """
+        Resolve requirements and everything they depend on to exact versions
+        for a venv. Cross-builds resolve for the target's Python version and
+        platform instead of the venv's interpreter, and to wheels only.
+        """
+        if not requirements:
+            return {}
+        if self.cross_build:
+            platform = self.windows_versions[target_os]["platform"]
+            python_args = ["--python-version", py_version, "--python-platform", UV_PLATFORMS[platform],
+                           "--only-binary", ":all:"]
+        else:
+            python_args = ["--python", str(venv_path)]
+        result = subprocess.run(
+            ["uv", "pip", "compile", "-", "--quiet", "--no-header", "--no-annotate"]
+            + python_args + install_args,
+            input="\n".join(requirements) + "\n",
+            check=True, stdout=subprocess.PIPE, stderr=log, text=True
+        )
+        pins = parse_pins(result.stdout)
+        if self.cross_build:
+            # Same form as WheelInstaller.installed(), so unchanged pins compare equal
+            pins = {name: f"{name}=={line.split('==', 1)[1].split(';', 1)[0].strip()}"
+                    for name, line in pins.items() if "==" in line}
+        return pins
+    
+    def _install_wheels(self, target_os: str, py_version: str, venv_path: Path,
+                        to_install: List[str], to_remove: List[str], log: Optional[TextIO] = None):
+        """
+        Apply resolved pins to a cross-built venv by unpacking wheels from
+        the wheelhouse, several at a time.
+        
+        Raises:
+            FileNotFoundError: If the wheelhouse has no fitting wheel for a pin
+        """
+        platform = self.windows_versions[target_os]["platform"]
+        files_dir = self.wheelhouse.files_dir(py_version, platform)
+        wheels = []
+        for line in to_install:
+            wheel = find_wheel(files_dir, line, py_version, platform)
+            if wheel is None:
+                raise FileNotFoundError(self._("cross_wheel_missing", line, py_version, platform, files_dir))
+            wheels.append(wheel)
+        
+        installer = WheelInstaller(venv_path)
+        # Upgraded packages are removed first, as pip would, so no stale files remain
+        replaced = [name for name in parse_pins("\n".join(to_install)) if name in installer.installed()]
+        if to_remove:
+            self._print(self._("removing_deps", ", ".join(to_remove)), log)
+        for name in to_remove + replaced:
+            installer.uninstall(name)
+        if wheels:
+            self._print(self._("installing_deps", ", ".join(to_install)), log)
+            with ThreadPoolExecutor(max_workers=min(self.jobs, len(wheels))) as executor:
+                list(executor.map(installer.install, wheels))
+    
+    def _write_requirements(self, dependencies: List[str], venv_path: Path):
+        """
+        Generate requirements.txt in the venv for reproducibility, so it is
+        packaged with it. Each target gets its own: the dependencies differ
+        between Python versions, and a file in the project root would be
+        taken as the project's declared requirements by the next analysis.
+        """
+        if not dependencies:
+            return
+        requirements = venv_path / "requirements.txt"
+        tmp_path = requirements.with_name(f".requirements.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            for dep in dependencies:
+                f.write(f"{dep}\n")
+        os.replace(tmp_path, requirements)
+    
+    def _launcher_script(self, bundle: bool = False) -> str:
+        """Return the content of the run_project.bat launcher."""
+        if self.bundle_runtime:
+            # The runtime ignores PYTHONPATH; its .pth hook adds the venv and the bundle
+            return (
+                "@echo off\r\n"
+                f"set \"PATH=%~dp0{RUNTIME_DIR};%~dp0venv\\Scripts;%PATH%\"\r\n"
+                "echo Python environment is ready!\r\n"
+                "echo You can now run your Python scripts.\r\n"
+                "cmd /k\r\n"
+            )
+        path = ""
+        if bundle:
+            # Put the zipimport bundle ahead of anything else on sys.path
+            path = (
+                "set \"APT_BUNDLE=%~dp0venv\\site-packages.zip\"\r\n"
+                "if defined PYTHONPATH set \"APT_BUNDLE=%APT_BUNDLE%;%PYTHONPATH%\"\r\n"
+                "set \"PYTHONPATH=%APT_BUNDLE%\"\r\n"
+            )
+        return (
+            "@echo off\r\n"
+            + path +
+            "call venv\\Scripts\\activate.bat\r\n"
+            "echo Python environment is ready!\r\n"
+            "echo You can now run your Python scripts.\r\n"
+            "cmd /k\r\n"
+        )
+    
+    def _offline_readme(self, target_os: str, py_version: str) -> str:
+        """Return the content of the OFFLINE_README.md shipped with the package."""
+        return (
+            f"# Offline Python Environment for {target_os} (Python {py_version})\n\n"
+            "This package contains a ready-to-use Python environment "
+            "with all required dependencies for offline development.\n\n"
+            "## How to use\n\n"
+            "1. Extract this package to your desired location\n"
+            "2. Run the `run_project.bat` file to activate the Python environment\n"
+            "3. You can now run your Python scripts in the activated environment\n"
+            + (f"\nPython {py_version} itself is included in {RUNTIME_DIR}/, so nothing needs to be "
+               "installed on this machine.\n" if self.bundle_runtime else
+               f"\nThe environment holds the packages only: Python {py_version} must be installed "
+               "on this machine and on PATH.\n" if self.cross_build else "")
+        )
+    
+    def package_project(self, target_os: str, py_version: str,
+                        venv_path: Optional[Path] = None, log: Optional[TextIO] = None,
+                        venv_ready: Optional[Callable[[], None]] = None) -> bool:
         """
         Package the project with its virtual environment for offline use.
         
+        Project files and the venv are written straight into the zip archive
+        from where they are. With staging enabled, everything is first copied
+        into a directory under output/ and that directory is archived instead.
+        
         Args:
             target_os: The target operating system
             py_version: The Python version used
+            venv_path: The environment to package (default: venv/ in the project)
+            log: If given, progress is written here instead of the console
+            venv_ready: If given, the venv is still being installed: the project
+                files are packaged first, then this is called to wait for the
+                venv. It raises if the venv could not be installed.
             
         Returns:
             True if successful, False otherwise
         """
-        output_name = f"auto-python-{target_os.replace(' ', '-').replace('/', '-')}-py{py_version}"
+        venv_path = venv_path or self.project_dir / "venv"
+        output_name = self.output_name_for(target_os, py_version)
         output_path = self.output_dir / output_name
+        excluded = [".git", "output", "venv", CACHE_DIR_NAME]
+        label = f"{self.windows_versions[target_os]['key']}:{py_version}"
+        
+        self._print(self._("packaging_project", target_os), log)
         
-        print(self._("packaging_project", target_os))
+        def wait_for_venv(phase=None):
+            if venv_ready is not None:
+                start = time.perf_counter()
+                venv_ready()
+                if phase is not None:
+                    phase.extra["venv_wait_s"] = round(time.perf_counter() - start, 6)
+        
+        # Files and bytes slimming leaves out, counted while the venv is packaged
+        slimmed = [0, 0]
         
         try:
-            # Create output directory
-            if output_path.exists():
-                shutil.rmtree(output_path)
-            output_path.mkdir(parents=True, exist_ok=True)
+            # Before anything is written: the base must not be the archive this build replaces
+            delta_base = self._delta_base(Path(f"{output_path}.zip")) if self.delta_from else None
+            runtime_dir = self._runtime_for(target_os, py_version, label, log) if self.bundle_runtime else None
+            if self.precompile:
+                # Bytecode is compiled with the venv's interpreter, so nothing can be packaged before it
+                wait_for_venv()
+                fast = self._fast_start_layout(venv_path, py_version, output_name, excluded, label, log)
+            else:
+                fast = None
+            if self.staging:
+                self._package_staged(output_path, target_os, py_version, excluded, venv_path, log, fast, label,
+                                     None if self.precompile else wait_for_venv, runtime_dir, slimmed)
+            else:
+                with self.metrics.phase("archive", label) as phase:
+                    with self._open_archive(Path(f"{output_path}.zip")) as archive:
+                        archive.add_tree(self.project_dir, output_name, exclude=excluded,
+                                         skip_files=self.unreachable_files(),
+                                         skip=fast.project_skip if fast else None)
+                        if not self.precompile:
+                            wait_for_venv(phase)
+                        slim_skip = self.slimmer.counting_skip(venv_path, slimmed) if self.slimmer else None
+                        archive.add_tree(venv_path, f"{output_name}/venv", skip=self._venv_skip(fast, slim_skip))
+                        if runtime_dir:
+                            archive.add_tree(runtime_dir, f"{output_name}/{RUNTIME_DIR}",
+                                             exclude=self.runtimes.package_exclude(runtime_dir))
+                            for rel, data in self.runtimes.package_files(runtime_dir).items():
+                                archive.add_bytes(f"{output_name}/{RUNTIME_DIR}/{rel}", data)
+                        if fast:
+                            for rel, src in fast.files().items():
+                                archive.add_file(src, f"{output_name}/{rel}")
+                            for rel, data in fast.generated().items():
+                                archive.add_bytes(f"{output_name}/{rel}", data)
+                        archive.add_bytes(f"{output_name}/run_project.bat",
+                                          self._launcher_script(bool(fast and fast.bundled)).encode("utf-8"))
+                        archive.add_bytes(f"{output_name}/OFFLINE_README.md",
+                                          self._offline_readme(target_os, py_version).encode("utf-8"))
+                    self._archive_metrics(phase, archive)
+                self._print_reuse(archive, log)
+            if self.slimmer:
+                self._print(self._("slim_applied", ", ".join(self.slimmer.rules), slimmed[0],
+                                   format_size(slimmed[1])), log)
+            self._print(self._("packaging_success", f"{output_path}.zip"), log)
+            if delta_base:
+                with self.metrics.phase("delta", label) as phase:
+                    self._package_delta(delta_base, Path(f"{output_path}.zip"), log)
+                    phase.bytes_written = Path(f"{output_path}-update.zip").stat().st_size
             
+            return True
+        except Exception as e:
+            self._print(self._("packaging_error", str(e)), log)
+            return False
+    
+    def _runtime_for(self, target_os: str, py_version: str, label: Optional[str] = None,
+                     log: Optional[TextIO] = None) -> Path:
+        """Return the cached embeddable Python for a target, downloading it once if needed."""
+        platform = self.windows_versions[target_os]["platform"]
+        with self.metrics.phase("runtime", label) as phase:
+            def on_download(url: str):
+                self._print(self._("runtime_downloading", py_version, platform, url), log)
+                phase.extra["downloaded"] = True
+            
+            runtime_dir = self.runtimes.ensure(py_version, platform, self.offline, on_download)
+        self._print(self._("runtime_bundled", py_version, runtime_dir), log)
+        return runtime_dir
+    
+    def print_runtime_report(self) -> bool:
+        """
+        Check every cached runtime against its manifest.
+        
+        Returns:
+            True if all of them are intact
+        """
+        runtimes = self.runtimes.cached()
+        if not runtimes:
+            print(self._("runtime_none", self.runtimes.root))
+        ok = True
+        for version, arch, runtime_dir in runtimes:
+            platform = next(tag for tag, name in RUNTIME_ARCHES.items() if name == arch)
+            problems = self.runtimes.verify(version, platform)
+            if problems:
+                ok = False
+                print(self._("runtime_broken", runtime_dir.name, len(problems), problems[0]))
+            else:
+                print(self._("runtime_ok", runtime_dir.name, runtime_dir))
+        return ok
+    
+    def _archive_metrics(self, phase, archive: ArchiveWriter):
+        """Record what an archive phase read and wrote."""
+        phase.files = archive.file_count
+        phase.bytes_read = archive.bytes_in
+        phase.bytes_written = archive.archive_path.stat().st_size
+        phase.extra["reused_files"] = archive.reused_count
+    
+    def _venv_skip(self, fast: Optional[FastStartLayout] = None,
+                   slim_skip: Optional[Callable[[str, bool], bool]] = None):
+        """Combine the filters that leave parts of the venv out of the package."""
+        checks = [check for check in (slim_skip, fast.venv_skip if fast else None) if check]
+        if not checks:
+            return None
+        return lambda rel, is_dir: any(check(rel, is_dir) for check in checks)
+    
+    def _fast_start_layout(self, venv_path: Path, py_version: str, output_name: str,
+                           excluded: List[str], label: Optional[str] = None,
+                           log: Optional[TextIO] = None) -> Optional[FastStartLayout]:
+        """
+        Compile bytecode for the target Python and build the site-packages
+        bundle, if enabled.
+        
+        Returns:
+            The layout to package, or None if precompiling is disabled or
+            there is no interpreter of the target version to compile with
+        """
+        if not self.precompile:
+            return None
+        interpreter = target_interpreter(venv_path, py_version)
+        if interpreter is None:
+            self._print(self._("precompile_unavailable", py_version), log)
+            return None
+        
+        compiler = BytecodeCompiler(interpreter, py_version, self.cache_dir / "bytecode", self.jobs)
+        layout = FastStartLayout(compiler, self.project_dir, venv_path)
+        unreachable = set(self.unreachable_files())
+        
+        def project_skip(rel: str, is_dir: bool) -> bool:
+            return rel in excluded or (not is_dir and self.project_dir / rel in unreachable)
+        
+        bundle_path = None
+        if self.zip_site_packages:
+            bundle_path = self.cache_dir / "bytecode" / f"{output_name}-site-packages.zip"
+        with self.metrics.phase("precompile", label) as phase:
+            layout.prepare(project_skip, self.slimmer.skip if self.slimmer else None, bundle_path)
+            phase.files = len(layout.project_pycs) + len(layout.venv_pycs)
+            phase.bytes_written = layout.bundle_path.stat().st_size if layout.bundle_path else 0
+        
+        self._print(self._("precompile_done", len(layout.project_pycs) + len(layout.venv_pycs),
+                           compiler.tag), log)
+        if compiler.failed:
+            self._print(self._("precompile_failed", len(compiler.failed)), log)
+        if layout.bundled:
+            self._print(self._("bundle_done", len(layout.bundled), layout.bundle_files,
+                               format_size(layout.bundle_path.stat().st_size)), log)
+        return layout
+    
+    def _delta_base(self, archive_path: Path) -> Path:
+        """
+        Return the previous build given with --delta-from for an archive.
+        
+        Raises:
+            FileNotFoundError: If there is no previous build for this target
+            ValueError: If the previous build is the archive itself, which
+                this build would overwrite
+        """
+        base = self.delta_from
+        if base.is_dir():
+            # A directory of earlier builds, as used for batch builds
+            base = base / archive_path.name
+        if not base.is_file():
+            raise FileNotFoundError(self._("delta_base_missing", base))
+        if base.resolve() == archive_path.resolve():
+            raise ValueError(self._("delta_base_overwritten", base))
+        return base
+    
+    def _package_delta(self, base: Path, archive_path: Path, log: Optional[TextIO] = None):
+        """
+        Build an update package holding only what changed since the previous
+        build base, next to the full package.
+        """
+        delta_path = archive_path.with_name(f"{archive_path.stem}-update.zip")
+        result = build_delta(base, archive_path, delta_path,
+                             self.cache_dir / "manifests" / f"{archive_path.name}.json",
+                             compression=self.compression, level=self.compression_level,
+                             workers=self.jobs)
+        self._print(self._("delta_success", delta_path, result["added"], result["changed"],
+                           result["deleted"], format_size(delta_path.stat().st_size),
+                           format_size(archive_path.stat().st_size)), log)
+    
+    def _open_archive(self, archive_path: Path) -> ArchiveWriter:
+        """Create an archive writer with the configured compression settings."""
+        manifest_path = None
+        if self.incremental:
+            manifest_path = self.cache_dir / "manifests" / f"{archive_path.name}.json"
+        return ArchiveWriter(archive_path, self.compression, self.compression_level,
+                             workers=self.jobs, manifest_path=manifest_path)
+    
+    def _package_staged(self, output_path: Path, target_os: str, py_version: str,
+                        excluded: List[str], venv_path: Path, log: Optional[TextIO] = None,
+                        fast: Optional[FastStartLayout] = None, label: Optional[str] = None,
+                        wait_for_venv: Optional[Callable] = None, runtime_dir: Optional[Path] = None,
+                        slimmed: Optional[List[int]] = None):
+        """Copy the project and venv into a staging directory, then archive it."""
+        with self.metrics.phase("stage", label) as phase:
+            self._stage(output_path, target_os, py_version, excluded, venv_path, fast,
+                        wait_for_venv and (lambda: wait_for_venv(phase)), runtime_dir, slimmed)
+        
+        # Create zip archive
+        with self.metrics.phase("archive", label) as phase:
+            with self._open_archive(Path(f"{output_path}.zip")) as archive:
+                archive.add_tree(output_path, output_path.name)
+            self._archive_metrics(phase, archive)
+        self._print_reuse(archive, log)
+    
+    def _stage(self, output_path: Path, target_os: str, py_version: str, excluded: List[str],
+               venv_path: Path, fast: Optional[FastStartLayout] = None,
+               wait_for_venv: Optional[Callable[[], None]] = None, runtime_dir: Optional[Path] = None,
+               slimmed: Optional[List[int]] = None):
+        """
+        Fill the staging directory with the project, the venv, the runtime and
+        the generated files. What slimming removes is added to slimmed.
+        """
+        # Create output directory
+        if output_path.exists():
+            shutil.rmtree(output_path)
+        output_path.mkdir(parents=True, exist_ok=True)
+        
+        if self.dedupe:
+            # Link files from the content store instead of copying them
+            self.store.link_tree(self.project_dir, output_path, exclude=excluded)
+        else:
             # Copy project files
             for item in self.project_dir.iterdir():
-                if item.name not in [".git", "output", "venv"]:
+                if item.name not in excluded:
                     if item.is_dir():
                         shutil.copytree(item, output_path / item.name)
                     else:
                         shutil.copy2(item, output_path)
-            
+        
+        if wait_for_venv is not None:
+            wait_for_venv()
+        if self.dedupe:
+            self.store.link_tree(venv_path, output_path / "venv")
+        else:
             # Copy virtual environment
-            shutil.copytree(self.project_dir / "venv", output_path / "venv")
-            
-            # Create a simple launcher script
-            with open(output_path / "run_project.bat", "w") as f:
-                f.write("@echo off\n")
-                f.write("call venv\\Scripts\\activate.bat\n")
-                f.write("echo Python environment is ready!\n")
-                f.write("echo You can now run your Python scripts.\n")
-                f.write("cmd /k\n")
-            
-            # Create a readme for the packaged project
-            with open(output_path / "OFFLINE_README.md", "w") as f:
-                f.write(f"# Offline Python Environment for {target_os} (Python {py_version})\n\n")
-                f.write("This package contains a ready-to-use Python environment ")
-                f.write("with all required dependencies for offline development.\n\n")
-                f.write("## How to use\n\n")
-                f.write("1. Extract this package to your desired location\n")
-                f.write("2. Run the `run_project.bat` file to activate the Python environment\n")
-                f.write("3. You can now run your Python scripts in the activated environment\n")
+            shutil.copytree(venv_path, output_path / "venv")
+        
+        if self.slimmer:
+            removed = prune_copy(self.slimmer, output_path / "venv")
+            if slimmed is not None:
+                slimmed[0] += removed[0]
+                slimmed[1] += removed[1]
+        
+        if runtime_dir:
+            exclude = self.runtimes.package_exclude(runtime_dir)
+            if self.dedupe:
+                self.store.link_tree(runtime_dir, output_path / RUNTIME_DIR, exclude=exclude)
+            else:
+                shutil.copytree(runtime_dir, output_path / RUNTIME_DIR,
+                                ignore=lambda d, names: [n for n in names if Path(d) == runtime_dir and n in exclude])
+            for rel, data in self.runtimes.package_files(runtime_dir).items():
+                (output_path / RUNTIME_DIR / rel).write_bytes(data)
+        
+        # Leave out source files the entry points never import
+        for path in self.unreachable_files():
+            (output_path / path.relative_to(self.project_dir)).unlink(missing_ok=True)
+        
+        if fast:
+            fast.apply_to_tree(output_path)
+        
+        # Create a simple launcher script
+        with open(output_path / "run_project.bat", "w", newline="") as f:
+            f.write(self._launcher_script(bool(fast and fast.bundled)))
+        
+        # Create a readme for the packaged project
+        with open(output_path / "OFFLINE_README.md", "w", encoding="utf-8") as f:
+            f.write(self._offline_readme(target_os, py_version))
+    
+    def _print_reuse(self, archive: ArchiveWriter, log: Optional[TextIO] = None):
+        """Report how much of an incremental rebuild came from the previous package."""
+        if archive.reused_count:
+            self._print(self._("packaging_reused", archive.reused_count, archive.file_count,
+                               format_size(archive.reused_bytes)), log)
+    
+    def output_name_for(self, target_os: str, py_version: str) -> str:
+        """Return the base name of the package built for a target."""
+        return f"auto-python-{target_os.replace(' ', '-').replace('/', '-')}-py{py_version}"
+    
+    def parse_targets(self, spec: str) -> List[Tuple[str, str]]:
+        """
+        Parse a --targets specification into (OS, Python version) pairs.
+        
+        Args:
+            spec: "all" for every OS at its default Python version, or a comma
+                separated list of KEY[:VERSION] such as "win10-64:3.11.11,win7-64"
             
-            # Create zip archive
-            shutil.make_archive(str(output_path), 'zip', self.output_dir, output_name)
-            print(self._("packaging_success", f"{output_path}.zip"))
+        Returns:
+            List of (target OS, Python version) tuples
             
+        Raises:
+            ValueError: If a target key or Python version is not supported
+        """
+        by_key = {info["key"]: name for name, info in self.windows_versions.items()}
+        if spec.strip() == "all":
+            return [(name, info["max_py"]) for name, info in self.windows_versions.items()]
+        
+        targets = []
+        for item in spec.split(","):
+            key, _, version = item.strip().partition(":")
+            if key not in by_key:
+                raise ValueError(self._("unknown_target", key, ", ".join(by_key)))
+            target_os = by_key[key]
+            version = version or self.windows_versions[target_os]["max_py"]
+            if version not in self.windows_versions[target_os]["versions"]:
+                raise ValueError(self._("unsupported_target_python", version, target_os))
+            if (target_os, version) not in targets:
+                targets.append((target_os, version))
+        return targets
+    
+    def build_target(self, target_os: str, py_version: str, dependencies: List[str]) -> Dict:
+        """
+        Build one target of a batch: create its own venv, install dependencies
+        and package it, writing all output to a per-target log file.
+        
+        Returns:
+            A summary dict with target, python, status, seconds, output and log
+        """
+        key = self.windows_versions[target_os]["key"]
+        log_path = self.output_dir / "logs" / f"{key}-py{py_version}.log"
+        log_path.parent.mkdir(parents=True, exist_ok=True)
+        venv_path = self.venv_path_for(target_os, py_version)
+        archive = self.output_dir / f"{self.output_name_for(target_os, py_version)}.zip"
+        
+        print(self._("batch_target_started", key, py_version, log_path), flush=True)
+        start = time.perf_counter()
+        with open(log_path, "w", encoding="utf-8") as log:
+            if not self.setup_virtual_env(target_os, py_version, dependencies, venv_path, log):
+                status = "status_setup_failed"
+            elif self.dedupe and not self.dedupe_venv(venv_path, log):
+                status = "status_setup_failed"
+            elif not self.package_project(target_os, py_version, venv_path, log):
+                status = "status_packaging_failed"
+            else:
+                status = "status_ok"
+        elapsed = time.perf_counter() - start
+        print(self._("batch_target_finished", key, py_version, self._(status), elapsed), flush=True)
+        
+        return {
+            "target": key,
+            "python": py_version,
+            "status": status,
+            "seconds": elapsed,
+            "output": archive if status == "status_ok" else None,
+            "log": log_path,
+        }
+    
+    def dedupe_venv(self, venv_path: Path, log: Optional[TextIO] = None) -> bool:
+        """Replace the files of a target venv with links into the content store."""
+        try:
+            self.store.dedupe_tree(venv_path)
             return True
-        except Exception as e:
-            print(self._("packaging_error", str(e)))
+        except OSError as e:
+            self._print(self._("store_error", str(e)), log)
             return False
     
+    def print_store_report(self):
+        """Print how much space the content store holds and saves."""
+        report = self.store.report()
+        print(self._("store_report", report["objects"], format_size(report["stored_bytes"]),
+                     report["references"], format_size(report["saved_bytes"])))
+    
+    def gc_store(self):
+        """Remove store objects that no build tree links to any more."""
+        result = self.store.gc()
+        print(self._("store_gc", result["removed"], format_size(result["freed_bytes"])))
+        self.print_store_report()
+    
+    def populate_wheelhouse(self, targets: List[Tuple[str, str]]) -> bool:
+        """
+        Download the project's dependencies into the wheelhouse for each target,
+        so later builds can install them with no network access.
+        """
+        wheelhouse = self.wheelhouse or Wheelhouse(self.cache_dir / "wheelhouse")
+        python_files = self.find_python_files()
+        
+        ok = True
+        for py_version, platform_tag in sorted({(v, self.windows_versions[t]["platform"]) for t, v in targets}):
+            dependencies = self.resolve_final_dependencies(self.analyze_dependencies(python_files, py_version),
+                                                           py_version)
+            if not dependencies:
+                print(self._("no_deps"))
+                continue
+            print(self._("wheelhouse_populating", py_version, platform_tag))
+            try:
+                added = wheelhouse.populate(py_version, platform_tag, dependencies)
+                print(self._("wheelhouse_added", len(added), wheelhouse.tag_dir(py_version, platform_tag)))
+            except (subprocess.SubprocessError, OSError) as e:
+                print(self._("wheelhouse_error", str(e)))
+                ok = False
+        return ok
+    
+    def print_summary(self, results: List[Dict]):
+        """Print a table summarizing the results of a batch build."""
+        headers = [self._("batch_col_target"), self._("batch_col_python"), self._("batch_col_status"),
+                   self._("batch_col_time"), self._("batch_col_output")]
+        rows = [[r["target"], r["python"], self._(r["status"]), f"{r['seconds']:.1f}s",
+                 str(r["output"] or r["log"])] for r in results]
+        widths = [max(len(row[i]) for row in [headers] + rows) for i in range(len(headers))]
+        
+        print(f"\n{self._('batch_summary_title')}")
+        for row in [headers] + rows:
+            print("  ".join(cell.ljust(width) for cell, width in zip(row, widths)).rstrip())
+    
+    def run_batch(self, targets: List[Tuple[str, str]], max_parallel: Optional[int] = None) -> bool:
+        """
+        Build several targets in one run. Dependencies are analyzed once per
+        Python version, then each target is built on a bounded worker pool.
+        
+        Args:
+            targets: (target OS, Python version) pairs from parse_targets
+            max_parallel: Maximum number of targets built at the same time
+            
+        Returns:
+            True if every target was built successfully
+        """
+        print(self._("app_title"))
+        print(self._("app_subtitle"))
+        
+        if not self.check_uv_installed():
+            print(self._("uv_not_installed"))
+            print(self._("uv_install_hint"))
+            return False
+        
+        max_parallel = max(1, min(max_parallel or 4, len(targets)))
+        labels = ", ".join(f"{self.windows_versions[t]['key']}:{v}" for t, v in targets)
+        if self.pipeline:
+            print(self._("batch_targets", len(targets), max_parallel, labels))
+            results = BuildPipeline(self, max_parallel).build_batch(targets)
+        else:
+            results = self._build_sequenced(targets, max_parallel, labels)
+        
+        self.print_summary(results)
+        if self.dedupe:
+            self.print_store_report()
+        failed = sum(1 for r in results if r["status"] != "status_ok")
+        if failed:
+            print(self._("batch_failed", failed, len(results)))
+            return False
+        
+        print(self._("done"))
+        print(self._("output_location", self.output_dir))
+        return True
+    
+    def _build_sequenced(self, targets: List[Tuple[str, str]], max_parallel: int, labels: str) -> List[Dict]:
+        """Analyze all Python versions first, then build the targets on a worker pool."""
+        python_files = self.find_python_files()
+        print(self._("found_files", len(python_files)))
+        
+        # The standard library differs between Python versions, so analyze per version
+        dependencies = {}
+        for py_version in sorted({v for _, v in targets}):
+            dependencies[py_version] = self.analyze_dependencies(python_files, py_version)
+            deps_str = ", ".join(dependencies[py_version]) if dependencies[py_version] else self._("no_deps")
+            print(self._("detected_deps_for", py_version, deps_str))
+        
+        print(self._("batch_targets", len(targets), max_parallel, labels))
+        
+        with ThreadPoolExecutor(max_workers=max_parallel) as executor:
+            futures = [executor.submit(self.build_target, target_os, py_version, dependencies[py_version])
+                       for target_os, py_version in targets]
+            return [future.result() for future in futures]
+    
     def run(self, use_default_python: bool = False):
         """
         Run the main workflow.
@@ -292,11 +1287,20 @@ class AutoPythonToolkit:
         else:
             print(self._("selected_python", python_version))
         
+        if self.pipeline:
+            status = BuildPipeline(self).build(target_os, python_version)
+            if status != "status_ok":
+                print(self._("failed_setup" if status == "status_setup_failed" else "failed_packaging"))
+                return
+            print(self._("done"))
+            print(self._("output_location", self.output_dir))
+            return
+        
         # Find Python files and analyze dependencies
         python_files = self.find_python_files()
         print(self._("found_files", len(python_files)))
         
-        dependencies = self.analyze_dependencies()
+        dependencies = self.analyze_dependencies(python_files, python_version)
         deps_str = ", ".join(dependencies) if dependencies else self._("no_deps")
         print(self._("detected_deps", deps_str))
         
@@ -314,16 +1318,297 @@ class AutoPythonToolkit:
         print(self._("output_location", self.output_dir))
 
 
-def main():
-    # Parse command line arguments
+# Marker for "--wheelhouse" given without a directory
+DEFAULT_WHEELHOUSE = Path(CACHE_DIR_NAME) / "wheelhouse"
+
+
+def run_wheelhouse_command(toolkit: AutoPythonToolkit, parser: argparse.ArgumentParser, args):
+    """Run one of the wheelhouse maintenance commands."""
+    _ = toolkit._
+    wheelhouse = toolkit.wheelhouse or Wheelhouse(toolkit.cache_dir / "wheelhouse")
+    
+    if args.wheelhouse_populate:
+        if not args.targets:
+            parser.error(_("wheelhouse_needs_targets"))
+        try:
+            targets = toolkit.parse_targets(args.targets)
+        except ValueError as e:
+            parser.error(str(e))
+        toolkit.wheelhouse = wheelhouse
+        sys.exit(0 if toolkit.populate_wheelhouse(targets) else 1)
+    
+    if args.wheelhouse_prune:
+        max_bytes = int(args.max_size * 1024 * 1024) if args.max_size is not None else None
+        removed, freed = wheelhouse.prune(max_bytes, args.max_age)
+        print(_("wheelhouse_pruned", removed, format_size(freed)))
+    
+    if args.wheelhouse_export:
+        wheelhouse.export(args.wheelhouse_export)
+        print(_("wheelhouse_exported", args.wheelhouse_export))
+    
+    if args.wheelhouse_serve is not None:
+        server = wheelhouse.serve(port=args.wheelhouse_serve)
+        url = f"http://127.0.0.1:{server.server_address[1]}"
+        print(_("wheelhouse_serving", url))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            server.server_close()
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Create the command line parser, shared by main() and the build daemon."""
     parser = argparse.ArgumentParser(description="Auto Python Toolkit - Create offline Python environments")
     parser.add_argument('--version', action='version', version='Auto Python Toolkit v0.1.0')
     parser.add_argument('--auto', action='store_true', help='Automatically use default Python version')
     parser.add_argument('--lang', choices=['en', 'zh_CN'], help='Set interface language (en/zh_CN)')
+    parser.add_argument('--exclude', action='append', default=[], metavar='PATTERN',
+                        help='Exclude paths matching a .gitignore-style pattern from the scan (repeatable)')
+    parser.add_argument('--no-gitignore', action='store_true', help='Do not honour .gitignore files when scanning')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the persistent import-analysis cache')
+    parser.add_argument('--rebuild-cache', action='store_true', help='Discard the import-analysis cache and rebuild it')
+    parser.add_argument('--jobs', type=int, metavar='N',
+                        help='Number of parallel workers for parsing and compression (default: CPU count)')
+    parser.add_argument('--import-engine', choices=IMPORT_ENGINES, default='fast',
+                        help='How imports are extracted: fast (tokenizer) or ast (full syntax tree)')
+    parser.add_argument('--large-file-size', type=float, default=DEFAULT_LARGE_FILE_SIZE / (1024 * 1024), metavar='MB',
+                        help='Only scan files larger than this for import lines through a memory map '
+                             'instead of parsing them (default: 4)')
+    parser.add_argument('--memory-limit', type=float, metavar='MB',
+                        help='Bound the memory used for parsing files at once, whatever the project size')
+    parser.add_argument('--staging', action='store_true',
+                        help='Copy the project into a staging directory before archiving it')
+    parser.add_argument('--compression', choices=['store', 'deflate', 'lzma', 'zstd'], default='deflate',
+                        help='Archive compression; only store and deflate open in Windows Explorer (default: deflate)')
+    parser.add_argument('--level', type=int, help='Compression level (deflate: 0-9, zstd: 1-22; '
+                                                  'store and lzma take none)')
+    parser.add_argument('--targets', metavar='SPEC',
+                        help='Build several targets in one run: "all" or a list like "win10-64:3.11.11,win7-64:3.7.9"')
+    parser.add_argument('--parallel-targets', type=int, default=4, metavar='N',
+                        help='Maximum number of targets built at the same time (default: 4)')
+    parser.add_argument('--pipeline', action='store_true',
+                        help='Create venvs while the project is analyzed and package project files while '
+                             'dependencies install, instead of one step after another')
+    parser.add_argument('--no-dedupe', action='store_true',
+                        help='Copy files into target venvs and staging trees instead of linking them from the content store')
+    parser.add_argument('--store-report', action='store_true', help='Show content store size and savings, then exit')
+    parser.add_argument('--store-gc', action='store_true', help='Remove unreferenced content store objects, then exit')
+    parser.add_argument('--wheelhouse', nargs='?', const=DEFAULT_WHEELHOUSE, type=Path, metavar='DIR',
+                        help='Install from a local wheelhouse, downloading missing wheels into it first '
+                             '(default DIR: .auto-python-toolkit/wheelhouse); needs a host of the target '
+                             'platform unless --cross-build is given')
+    parser.add_argument('--offline', action='store_true',
+                        help='Install only from the wheelhouse, without any network access')
+    parser.add_argument('--cross-build', action='store_true',
+                        help='Resolve for the target platform and unpack wheels into a Windows venv layout, '
+                             'without creating a venv on this host (works on Linux and macOS)')
+    parser.add_argument('--bundle-runtime', action='store_true',
+                        help='Ship the embeddable Python of the target next to the venv, so the package needs '
+                             'no Python installed; runtimes are downloaded once into a shared cache')
+    parser.add_argument('--runtime-cache', type=Path, metavar='DIR',
+                        help='Where runtimes are cached (default: ~/.auto-python-toolkit/runtimes)')
+    parser.add_argument('--runtime-mirror', metavar='URL',
+                        help='Download runtimes from this mirror of python.org/ftp/python, or a local directory laid out like it')
+    parser.add_argument('--runtime-verify', action='store_true',
+                        help='Check every cached runtime against its manifest, then exit')
+    parser.add_argument('--wheelhouse-populate', action='store_true',
+                        help='Download wheels for the --targets into the wheelhouse, then exit')
+    parser.add_argument('--wheelhouse-prune', action='store_true',
+                        help='Remove least recently used wheels per --max-size/--max-age, then exit')
+    parser.add_argument('--max-size', type=float, metavar='MB', help='Size limit for --wheelhouse-prune')
+    parser.add_argument('--max-age', type=float, metavar='DAYS', help='Remove wheels unused for this long')
+    parser.add_argument('--wheelhouse-export', type=Path, metavar='ZIP', help='Export the wheelhouse to a zip, then exit')
+    parser.add_argument('--wheelhouse-serve', type=int, metavar='PORT',
+                        help='Serve the wheelhouse as a local package index on PORT, until interrupted')
+    parser.add_argument('--recreate-venv', action='store_true',
+                        help='Rebuild virtual environments from scratch instead of reusing them')
+    parser.add_argument('--full-repack', action='store_true',
+                        help='Compress every file again instead of reusing unchanged members of the previous package')
+    parser.add_argument('--delta-from', type=Path, metavar='ZIP_OR_DIR',
+                        help='Also build an update package against this earlier build '
+                             '(or a directory of earlier builds), with an apply_update script')
+    parser.add_argument('--build-dist-index', nargs='*', type=Path, metavar='SOURCE',
+                        help='Index which distributions provide which import names, from wheels, '
+                             'wheel directories or site-packages (default: wheelhouse, venv and '
+                             'host site-packages), then exit')
+    parser.add_argument('--reachable', action='store_true',
+                        help='Only take dependencies from code reachable from the entry points '
+                             '(main.py, app.py, __main__.py unless --entry-point is given)')
+    parser.add_argument('--entry-point', action='append', type=Path, metavar='FILE',
+                        help='Entry point for reachability analysis (repeatable, implies --reachable)')
+    parser.add_argument('--prune-unreachable', action='store_true',
+                        help='Also leave Python files the entry points never import out of the package '
+                             '(implies --reachable)')
+    parser.add_argument('--slim', metavar='RULES',
+                        help='Leave parts of the venv out of the package: a preset (safe, aggressive) '
+                             'and/or rule names, comma separated, e.g. "safe,tests"')
+    parser.add_argument('--slim-report', nargs='?', const=Path('venv'), type=Path, metavar='VENV',
+                        help='Show what --slim (default: safe) would remove from a venv, then exit')
+    parser.add_argument('--precompile', action='store_true',
+                        help='Ship bytecode compiled for the target Python, so the package does not '
+                             'compile anything on first run (checked-hash pycs for the project, which '
+                             'stay editable; unchecked-hash pycs for the venv)')
+    parser.add_argument('--zip-site-packages', action='store_true',
+                        help='Also bundle pure-Python packages into venv/site-packages.zip, '
+                             'imported with zipimport (implies --precompile)')
+    parser.add_argument('--timings', nargs='?', const=Path('output/timings.json'), type=Path, metavar='FILE',
+                        help='Write per-phase wall/CPU time, bytes and file counts as JSON '
+                             '(default: output/timings.json; "-" for stdout)')
+    parser.add_argument('--profile', metavar='PHASES',
+                        help=f'Run phases under cProfile and save .prof files: "all" or a comma '
+                             f'separated list of {", ".join(PHASES)}')
+    parser.add_argument('--profile-dir', type=Path, metavar='DIR',
+                        help='Where --profile writes .prof files (default: output/profiles)')
+    parser.add_argument('--metrics-hook', action='append', default=[], metavar='MODULE:FUNCTION',
+                        help='Call FUNCTION(event, data) from MODULE for every finished phase '
+                             '("phase") and at the end of the build ("build") (repeatable)')
+    parser.add_argument('--serve', nargs='?', const=DEFAULT_DAEMON_PORT, type=int, metavar='PORT',
+                        help=f'Run a build daemon on 127.0.0.1 that keeps scans and caches warm '
+                             f'between builds (default port: {DEFAULT_DAEMON_PORT})')
+    parser.add_argument('--watch-interval', type=float, default=2.0, metavar='SECONDS',
+                        help='How often the daemon checks built projects for changes (default: 2)')
+    parser.add_argument('--submit', action='store_true',
+                        help='Send this build (with all other options) to a running daemon instead of running it here')
+    parser.add_argument('--daemon', default=f'http://127.0.0.1:{DEFAULT_DAEMON_PORT}', metavar='URL',
+                        help='Address of the build daemon used by --submit')
+    return parser
+
+
+def toolkit_options(parser: argparse.ArgumentParser, args) -> Tuple[Dict, List]:
+    """
+    Validate the parsed arguments and turn them into AutoPythonToolkit keyword
+    arguments and metrics hooks. Invalid arguments end in parser.error().
+    """
+    if args.compression not in COMPRESSION_METHODS:
+        parser.error(f"--compression {args.compression} requires Python 3.14 or newer")
+    try:
+        check_level(args.compression, args.level)
+    except ValueError as e:
+        parser.error(str(e))
+    entry_points = None
+    if args.reachable or args.entry_point or args.prune_unreachable:
+        entry_points = args.entry_point or []
+    
+    profile = [name.strip() for name in args.profile.split(",") if name.strip()] if args.profile else []
+    unknown = [name for name in profile if name != "all" and name not in PHASES]
+    if unknown:
+        parser.error(f"Unknown phases for --profile: {', '.join(unknown)} (choose from all, {', '.join(PHASES)})")
+    hooks = []
+    for spec in args.metrics_hook:
+        try:
+            hooks.append(load_hook(spec))
+        except ValueError as e:
+            parser.error(str(e))
+    
+    if args.slim_report and not args.slim:
+        args.slim = "safe"
+    try:
+        VenvSlimmer.from_spec(args.slim or "")
+    except ValueError as e:
+        parser.error(str(e))
+    
+    options = dict(lang=args.lang, excludes=args.exclude,
+                   use_gitignore=not args.no_gitignore,
+                   use_cache=not args.no_cache,
+                   rebuild_cache=args.rebuild_cache,
+                   jobs=args.jobs,
+                   import_engine=args.import_engine,
+                   staging=args.staging,
+                   compression=args.compression,
+                   compression_level=args.level,
+                   dedupe=not args.no_dedupe,
+                   wheelhouse=args.wheelhouse,
+                   offline=args.offline,
+                   cross_build=args.cross_build,
+                   bundle_runtime=args.bundle_runtime,
+                   runtime_cache=args.runtime_cache,
+                   runtime_mirror=args.runtime_mirror,
+                   recreate_venv=args.recreate_venv,
+                   incremental=not args.full_repack,
+                   delta_from=args.delta_from,
+                   entry_points=entry_points,
+                   prune_unreachable=args.prune_unreachable,
+                   slim=args.slim, precompile=args.precompile,
+                   zip_site_packages=args.zip_site_packages,
+                   profile=profile, profile_dir=args.profile_dir,
+                   pipeline=args.pipeline,
+                   large_file_size=int(args.large_file_size * 1024 * 1024),
+                   memory_limit=int(args.memory_limit * 1024 * 1024) if args.memory_limit else None)
+    return options, hooks
+
+
+def needs_terminal(args) -> bool:
+    """Return True if the arguments leave it to the interactive menus what to build."""
+    return not (args.targets or args.store_gc or args.store_report or args.slim_report
+                or args.build_dist_index is not None or args.runtime_verify or args.wheelhouse_populate
+                or args.wheelhouse_prune or args.wheelhouse_export
+                or args.wheelhouse_serve is not None)
+
+
+def run_command(toolkit: AutoPythonToolkit, parser: argparse.ArgumentParser, args) -> int:
+    """
+    Run what the arguments ask for with a configured toolkit.
+    
+    Returns:
+        The exit status
+    """
+    if args.store_gc:
+        toolkit.gc_store()
+        return 0
+    if args.store_report:
+        toolkit.print_store_report()
+        return 0
+    if args.slim_report:
+        toolkit.print_slim_report(args.slim_report)
+        return 0
+    if args.build_dist_index is not None:
+        toolkit.build_distribution_index(args.build_dist_index)
+        return 0
+    if args.runtime_verify:
+        return 0 if toolkit.print_runtime_report() else 1
+    if any([args.wheelhouse_populate, args.wheelhouse_prune, args.wheelhouse_export,
+            args.wheelhouse_serve is not None]):
+        run_wheelhouse_command(toolkit, parser, args)
+        return 0
+    
+    targets = None
+    if args.targets:
+        try:
+            targets = toolkit.parse_targets(args.targets)
+        except ValueError as e:
+            parser.error(str(e))
+    
+    try:
+        if targets:
+            return 0 if toolkit.run_batch(targets, args.parallel_targets) else 1
+        toolkit.run(use_default_python=args.auto)
+        return 0
+    finally:
+        report = toolkit.metrics.finish()
+        if args.timings:
+            to_stdout = str(args.timings) == "-"
+            BuildMetrics.write_json(report, None if to_stdout else args.timings)
+            if not to_stdout:
+                print(toolkit._("timings_written", args.timings))
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
     
-    toolkit = AutoPythonToolkit(lang=args.lang)
-    toolkit.run(use_default_python=args.auto)
+    if args.submit:
+        sys.exit(submit_build(args.daemon, client_argv(sys.argv[1:]), get_translator(args.lang)))
+    if args.serve is not None:
+        BuildDaemon(args.serve, args.watch_interval, args.lang).serve_forever()
+        return
+    
+    options, hooks = toolkit_options(parser, args)
+    toolkit = AutoPythonToolkit(**options)
+    for hook in hooks:
+        toolkit.metrics.add_hook(hook)
+    sys.exit(run_command(toolkit, parser, args))
 
 
 if __name__ == "__main__":
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import py_compile
+import shutil
+import subprocess
+import sys
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Set
+
+# Name of the zipimport bundle, stored at the root of the packaged venv
+BUNDLE_NAME = "site-packages.zip"
+
+# .pth file that puts the bundle on sys.path when the venv's Python is run directly
+BUNDLE_PTH = "_site_packages_zip.pth"
+
+# Files a package may contain and still be imported from a zip archive
+_PURE_SUFFIXES = (".py", ".pyi")
+_PURE_NAMES = {"py.typed"}
+
+# Packages that inspect their own files on disk or modify the installation
+_NEVER_BUNDLE = {"pip", "setuptools", "pkg_resources", "_distutils_hack", "wheel", "sitecustomize"}
+
+# Fixed timestamp for bundle members, so an unchanged bundle is byte-identical
+_ZIP_DATE = (1980, 1, 1, 0, 0, 0)
+
+# Run by the target interpreter: compile (source, pyc, display name) triples
+# read as JSON from stdin, with the name of a PycInvalidationMode, and print
+# the sources that failed to compile
+_COMPILE_SCRIPT = """
+import json, py_compile, sys
+job = json.load(sys.stdin)
+mode = py_compile.PycInvalidationMode[job["mode"]]
+failed = []
+for src, cfile, dfile in job["files"]:
+    try:
+        py_compile.compile(src, cfile=cfile, dfile=dfile, doraise=True, invalidation_mode=mode)
+    except (py_compile.PyCompileError, OSError, ValueError):
+        failed.append(src)
+json.dump(failed, sys.stdout)
+"""
+
+
+def cache_tag(py_version: str) -> str:
+    """Return the bytecode cache tag of a CPython version, e.g. "cpython-311"."""
+    major, minor = py_version.split(".")[:2]
+    return f"cpython-{major}{minor}"
+
+
+def pyc_name(rel_path: str, tag: str) -> str:
+    """Return where Python looks for the bytecode of a source file: pkg/__pycache__/mod.<tag>.pyc."""
+    parent, _, name = rel_path.rpartition("/")
+    pyc = f"__pycache__/{name[:-3]}.{tag}.pyc"
+    return f"{parent}/{pyc}" if parent else pyc
+
+
+def target_interpreter(venv_path: Path, py_version: str) -> Optional[str]:
+    """
+    Find an interpreter that writes bytecode for the target Python version.
+
+    The venv's own Python is used when it runs on this machine; otherwise the
+    Python running the toolkit, if it is the same major.minor version.
+
+    Returns:
+        Path of the interpreter, or None if there is none for this version
+    """
+    wanted = ".".join(py_version.split(".")[:2])
+    candidates = [venv_path / "Scripts" / "python.exe", venv_path / "bin" / "python", Path(sys.executable)]
+    for candidate in candidates:
+        if not candidate.is_file():
+            continue
+        try:
+            result = subprocess.run([str(candidate), "-I", "-c",
+                                     "import sys; print('%d.%d' % sys.version_info[:2])"],
+                                    check=True, capture_output=True, text=True, timeout=60)
+        except (OSError, subprocess.SubprocessError):
+            continue
+        if result.stdout.strip() == wanted:
+            return str(candidate)
+    return None
+
+
+def site_packages_dir(venv_path: Path) -> Optional[Path]:
+    """Return the site-packages directory of a Windows or POSIX venv."""
+    windows = venv_path / "Lib" / "site-packages"
+    if windows.is_dir():
+        return windows
+    return next((p for p in sorted(venv_path.glob("lib/python*/site-packages")) if p.is_dir()), None)
+
+
+def pure_python_entries(site_packages: Path) -> List[str]:
+    """
+    Return the top-level packages and modules of site-packages that can be
+    imported from a zip archive: regular packages (with __init__.py) and
+    modules made only of Python source, without extension modules, data
+    files or .pth hooks.
+    """
+    entries = []
+    for entry in sorted(site_packages.iterdir(), key=lambda p: p.name):
+        name = entry.name
+        if name.split(".")[0] in _NEVER_BUNDLE or name.startswith("__"):
+            continue
+        if entry.is_file():
+            if name.endswith(".py") and name[:-3].isidentifier():
+                entries.append(name)
+            continue
+        if not name.isidentifier() or not (entry / "__init__.py").is_file():
+            continue
+        pure = True
+        for root, dirs, files in os.walk(entry):
+            dirs[:] = [d for d in dirs if d != "__pycache__"]
+            if any(not (f.endswith(_PURE_SUFFIXES) or f in _PURE_NAMES) for f in files):
+                pure = False
+                break
+            if any(not (Path(root) / d / "__init__.py").is_file() for d in dirs):
+                # Namespace subpackages are not found inside zip archives
+                pure = False
+                break
+        if pure:
+            entries.append(name)
+    return entries
+
+
+class BytecodeCompiler:
+    """
+    Compiles source trees to hash-based .pyc files for a target Python.
+
+    Hash-based pycs do not depend on the source file's timestamp, so an
+    extracted package never recompiles on first run, even though extraction
+    gives every file a new mtime. Unchecked-hash pycs are loaded without
+    reading the source at all and suit the venv, which is not edited;
+    checked-hash pycs are validated against the source's hash, so edits to
+    the project on the target still take effect. The pycs are written to a
+    mirror of each tree under the cache directory, never into the tree
+    itself, and only recompiled when the source's mtime changes.
+    """
+
+    def __init__(self, interpreter: str, py_version: str, cache_dir: Path, jobs: Optional[int] = None):
+        """
+        Args:
+            interpreter: Python of the target version that compiles the files
+            py_version: Target Python version
+            cache_dir: Directory holding the compiled mirrors
+            jobs: Number of compiler processes (default: CPU count)
+        """
+        self.interpreter = interpreter
+        self.tag = cache_tag(py_version)
+        self.cache_dir = Path(cache_dir) / self.tag
+        self.jobs = jobs or os.cpu_count() or 1
+        self.failed: List[str] = []
+
+    def _mirror(self, src_root: Path, mode: py_compile.PycInvalidationMode) -> Path:
+        key = f"{Path(src_root).resolve()}\0{mode.name}"
+        return self.cache_dir / hashlib.sha256(key.encode("utf-8")).hexdigest()[:16]
+
+    def compile_tree(self, src_root: Path, skip: Optional[Callable[[str, bool], bool]] = None,
+                     mode: py_compile.PycInvalidationMode = py_compile.PycInvalidationMode.UNCHECKED_HASH
+                     ) -> Dict[str, Path]:
+        """
+        Compile every .py file of a tree.
+
+        Args:
+            src_root: Directory to compile
+            skip: Called with the path relative to src_root (using "/") and
+                whether it is a directory; entries it returns True for are
+                not compiled
+            mode: How the interpreter decides whether a pyc is still valid
+
+        Returns:
+            The compiled pyc of each source file, keyed by the source's path
+            relative to src_root; files that failed to compile are left out
+        """
+        src_root = Path(src_root)
+        mirror = self._mirror(src_root, mode)
+        compiled: Dict[str, Path] = {}
+        stale = []
+        for root, dirs, files in os.walk(src_root):
+            rel_root = os.path.relpath(root, src_root)
+            prefix = "" if rel_root == "." else Path(rel_root).as_posix() + "/"
+            dirs[:] = [d for d in dirs if d != "__pycache__" and not (skip and skip(prefix + d, True))]
+            for name in files:
+                rel = prefix + name
+                if not name.endswith(".py") or (skip and skip(rel, False)):
+                    continue
+                src = Path(root) / name
+                pyc = mirror / pyc_name(rel, self.tag)
+                compiled[rel] = pyc
+                try:
+                    if pyc.stat().st_mtime_ns == src.stat().st_mtime_ns:
+                        continue
+                except OSError:
+                    pass
+                stale.append((rel, src, pyc))
+
+        if stale:
+            for _, _, pyc in stale:
+                pyc.parent.mkdir(parents=True, exist_ok=True)
+            chunks = [stale[i::self.jobs] for i in range(min(self.jobs, len(stale)))]
+            with ThreadPoolExecutor(max_workers=len(chunks)) as executor:
+                failed = set().union(*executor.map(lambda chunk: self._compile_chunk(chunk, mode), chunks))
+            for rel, src, pyc in stale:
+                if str(src) in failed or not pyc.is_file():
+                    compiled.pop(rel, None)
+                    self.failed.append(str(src))
+                    continue
+                # Tie the pyc to the source it was compiled from
+                st = src.stat()
+                os.utime(pyc, ns=(st.st_atime_ns, st.st_mtime_ns))
+        return compiled
+
+    def _compile_chunk(self, chunk, mode: py_compile.PycInvalidationMode) -> Set[str]:
+        jobs = [(str(src), str(pyc), rel) for rel, src, pyc in chunk]
+        result = subprocess.run([self.interpreter, "-I", "-c", _COMPILE_SCRIPT],
+                                input=json.dumps({"mode": mode.name, "files": jobs}),
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            return {src for src, _, _ in jobs}
+        return set(json.loads(result.stdout or "[]"))
+
+
+def build_bundle(bundle_path: Path, site_packages: Path, entries: List[str],
+                 pycs: Dict[str, Path]) -> int:
+    """
+    Write the zipimport bundle of the given site-packages entries.
+
+    Each module is stored uncompressed with its source and, next to it, its
+    pyc (mod.py and mod.pyc), which is where zipimport looks for bytecode.
+    An existing bundle with the same content is left untouched.
+
+    Args:
+        bundle_path: Zip file to create
+        site_packages: The venv's site-packages directory
+        entries: Top-level names to bundle, from pure_python_entries()
+        pycs: Compiled pyc of each source, keyed by path relative to site-packages
+
+    Returns:
+        Number of files in the bundle
+    """
+    members = []
+    for entry in entries:
+        path = site_packages / entry
+        if path.is_file():
+            members.append(entry)
+            continue
+        for root, dirs, files in os.walk(path):
+            dirs[:] = sorted(d for d in dirs if d != "__pycache__")
+            rel_root = Path(root).relative_to(site_packages).as_posix()
+            members.extend(f"{rel_root}/{name}" for name in sorted(files))
+
+    bundle_path = Path(bundle_path)
+    bundle_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = bundle_path.with_name(f".{bundle_path.name}.{os.getpid()}.tmp")
+    count = 0
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_STORED) as zf:
+        for rel in members:
+            names = [(rel, site_packages / rel)]
+            if rel in pycs:
+                names.append((rel[:-3] + ".pyc", pycs[rel]))
+            for arcname, src in names:
+                zinfo = zipfile.ZipInfo(arcname, date_time=_ZIP_DATE)
+                zinfo.external_attr = 0o644 << 16
+                zf.writestr(zinfo, src.read_bytes())
+                count += 1
+
+    if bundle_path.is_file() and _same_content(bundle_path, tmp_path):
+        os.remove(tmp_path)
+    else:
+        os.replace(tmp_path, bundle_path)
+    return count
+
+
+def _same_content(a: Path, b: Path) -> bool:
+    if a.stat().st_size != b.stat().st_size:
+        return False
+    with open(a, "rb") as fa, open(b, "rb") as fb:
+        return all(ca == cb for ca, cb in zip(iter(lambda: fa.read(1024 * 1024), b""),
+                                               iter(lambda: fb.read(1024 * 1024), b"")))
+
+
+def bundle_pth(site_packages_rel: str) -> str:
+    """Return the .pth line pointing from site-packages to the bundle at the venv root."""
+    depth = len(site_packages_rel.strip("/").split("/"))
+    return "/".join([".."] * depth + [BUNDLE_NAME]) + "\n"
+
+
+class FastStartLayout:
+    """
+    Precompiled bytecode, and optionally a zipimport bundle, for one package.
+
+    Built by prepare() from the project and venv as they will be packaged;
+    the packager then leaves out the host's __pycache__ directories and the
+    bundled packages and adds what files() returns instead.
+    """
+
+    def __init__(self, compiler: BytecodeCompiler, project_dir: Path, venv_path: Path):
+        self.compiler = compiler
+        self.project_dir = Path(project_dir)
+        self.venv_path = Path(venv_path)
+        self.project_pycs: Dict[str, Path] = {}
+        self.venv_pycs: Dict[str, Path] = {}
+        self.site_packages_rel: Optional[str] = None
+        self.bundled: Set[str] = set()
+        self.bundle_path: Optional[Path] = None
+        self.bundle_files = 0
+
+    def prepare(self, project_skip: Callable[[str, bool], bool],
+                venv_skip: Optional[Callable[[str, bool], bool]] = None,
+                bundle_path: Optional[Path] = None):
+        """
+        Compile the project and venv, and build the bundle if bundle_path is given.
+
+        The project gets checked-hash pycs, so it can still be edited on the
+        target; the venv and the bundle get unchecked-hash pycs.
+
+        Args:
+            project_skip: Filter for project entries that are not packaged
+            venv_skip: Filter for venv entries that are not packaged
+            bundle_path: Where to build the site-packages bundle
+        """
+        self.project_pycs = self.compiler.compile_tree(self.project_dir, project_skip,
+                                                       py_compile.PycInvalidationMode.CHECKED_HASH)
+        self.venv_pycs = self.compiler.compile_tree(self.venv_path, venv_skip)
+
+        site_packages = site_packages_dir(self.venv_path)
+        if bundle_path is None or site_packages is None:
+            return
+        self.site_packages_rel = site_packages.relative_to(self.venv_path).as_posix()
+        prefix = self.site_packages_rel + "/"
+        entries = [entry for entry in pure_python_entries(site_packages)
+                   if not (venv_skip and venv_skip(prefix + entry, (site_packages / entry).is_dir()))]
+        if not entries:
+            return
+        pycs = {rel[len(prefix):]: pyc for rel, pyc in self.venv_pycs.items() if rel.startswith(prefix)}
+        self.bundle_files = build_bundle(bundle_path, site_packages, entries, pycs)
+        self.bundle_path = Path(bundle_path)
+        self.bundled = {prefix + entry for entry in entries}
+
+    def _is_bundled(self, rel: str) -> bool:
+        return any(rel == entry or rel.startswith(entry + "/") for entry in self.bundled)
+
+    def project_skip(self, rel: str, is_dir: bool) -> bool:
+        """Leave out the host's bytecode caches, which the precompiled pycs replace."""
+        return is_dir and rel.rpartition("/")[2] == "__pycache__"
+
+    def venv_skip(self, rel: str, is_dir: bool) -> bool:
+        """Also leave out the packages that live in the bundle."""
+        return self.project_skip(rel, is_dir) or rel in self.bundled
+
+    def files(self) -> Dict[str, Path]:
+        """
+        Return the files to add to the package, keyed by their path inside it
+        (relative to the package root, with the venv under venv/).
+        """
+        files = {pyc_name(rel, self.compiler.tag): pyc for rel, pyc in self.project_pycs.items()}
+        for rel, pyc in self.venv_pycs.items():
+            if not self._is_bundled(rel):
+                files[f"venv/{pyc_name(rel, self.compiler.tag)}"] = pyc
+        if self.bundle_path is not None:
+            files[f"venv/{BUNDLE_NAME}"] = self.bundle_path
+        return files
+
+    def generated(self) -> Dict[str, bytes]:
+        """Return generated files to add to the package, keyed like files()."""
+        if self.bundle_path is None:
+            return {}
+        return {f"venv/{self.site_packages_rel}/{BUNDLE_PTH}": bundle_pth(self.site_packages_rel).encode("utf-8")}
+
+    def apply_to_tree(self, package_dir: Path):
+        """Turn a staged copy of the package into the fast-start layout. Never call this on the venv itself."""
+        for root, dirs, _ in os.walk(package_dir):
+            for name in [d for d in dirs if d == "__pycache__"]:
+                shutil.rmtree(Path(root) / name)
+                dirs.remove(name)
+        for rel in self.bundled:
+            path = package_dir / "venv" / rel
+            if path.is_dir():
+                shutil.rmtree(path)
+            elif path.exists():
+                path.unlink()
+        for rel, src in self.files().items():
+            dst = package_dir / rel
+            dst.parent.mkdir(parents=True, exist_ok=True)
+            shutil.copy2(src, dst)
+        for rel, data in self.generated().items():
+            (package_dir / rel).write_bytes(data)
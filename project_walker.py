@@ -0,0 +1,239 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+
+# Directories that never contain project code worth scanning. The toolkit's
+# own venv, output and cache directories live at the project root and are
+# anchored there, so packages of the same name deeper down are still scanned.
+DEFAULT_EXCLUDES = [
+    ".git", ".hg", ".svn",
+    "/venv", ".venv",
+    "/output",
+    "/.auto-python-toolkit",
+    "node_modules",
+    "__pycache__",
+    ".tox", ".nox",
+    ".mypy_cache", ".pytest_cache", ".ruff_cache",
+    "*.egg-info",
+]
+
+
+class IgnoreRule:
+    """A single .gitignore-style pattern, anchored at the directory it came from."""
+
+    def __init__(self, pattern: str, base: str = ""):
+        self.base = base
+        self.negate = pattern.startswith("!")
+        if self.negate:
+            pattern = pattern[1:]
+        self.dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        # A slash anywhere but the end anchors the pattern to its base directory
+        self.anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+        self.regex = re.compile(self._translate(pattern))
+
+    @staticmethod
+    def _translate(pattern: str) -> str:
+        """Translate a gitignore glob into a regular expression."""
+        i, n = 0, len(pattern)
+        parts = []
+        while i < n:
+            c = pattern[i]
+            if pattern.startswith("**/", i):
+                parts.append("(?:.*/)?")
+                i += 3
+            elif pattern.startswith("/**", i) and i + 3 == n:
+                parts.append("/.*")
+                i += 3
+            elif pattern.startswith("**", i):
+                parts.append(".*")
+                i += 2
+            elif c == "*":
+                parts.append("[^/]*")
+                i += 1
+            elif c == "?":
+                parts.append("[^/]")
+                i += 1
+            elif c == "[":
+                end = pattern.find("]", i + 1)
+                if end == -1:
+                    parts.append(re.escape(c))
+                    i += 1
+                else:
+                    body = pattern[i + 1:end]
+                    if body.startswith("!"):
+                        body = "^" + body[1:]
+                    parts.append(f"[{body}]")
+                    i = end + 1
+            elif c == "\\" and i + 1 < n:
+                parts.append(re.escape(pattern[i + 1]))
+                i += 2
+            else:
+                parts.append(re.escape(c))
+                i += 1
+        return "".join(parts) + r"\Z"
+
+    def matches(self, rel_path: str, is_dir: bool) -> bool:
+        """Check whether a path relative to the project root matches this rule."""
+        if self.dir_only and not is_dir:
+            return False
+        if self.base:
+            if not rel_path.startswith(self.base + "/"):
+                return False
+            rel_path = rel_path[len(self.base) + 1:]
+        if self.anchored:
+            return self.regex.match(rel_path) is not None
+        return self.regex.match(rel_path.rsplit("/", 1)[-1]) is not None
+
+
+def parse_ignore_file(file_path: Path, base: str = "") -> List[IgnoreRule]:
+    """Parse a .gitignore file into a list of rules."""
+    rules = []
+    try:
+        with open(file_path, "r", encoding="utf-8", errors="ignore") as f:
+            for line in f:
+                line = line.rstrip("\n").rstrip("\r")
+                # Unescaped trailing spaces are not significant
+                if not line.endswith("\\ "):
+                    line = line.rstrip()
+                if not line or line.startswith("#"):
+                    continue
+                rules.append(IgnoreRule(line, base))
+    except OSError:
+        pass
+    return rules
+
+
+class ProjectWalker:
+    """
+    Single-pass project walker built on os.scandir.
+    Excluded directories are pruned before descending into them, so virtual
+    environments, build output and VCS metadata are never visited.
+    """
+
+    def __init__(self, root: Path, excludes: Optional[Iterable[str]] = None,
+                 use_gitignore: bool = True):
+        """
+        Args:
+            root: The project root directory
+            excludes: Extra gitignore-style patterns to exclude, on top of DEFAULT_EXCLUDES
+            use_gitignore: If True, honour .gitignore files found while walking
+        """
+        self.root = Path(root)
+        self.use_gitignore = use_gitignore
+        self.rules = [IgnoreRule(p) for p in DEFAULT_EXCLUDES]
+        self.rules.extend(IgnoreRule(p) for p in (excludes or []))
+
+    def _is_excluded(self, rel_path: str, is_dir: bool, rules: List[IgnoreRule]) -> bool:
+        # Later rules win, as in git
+        excluded = False
+        for rule in rules:
+            if rule.negate == excluded and rule.matches(rel_path, is_dir):
+                excluded = not rule.negate
+        return excluded
+
+    def walk(self, suffixes: Tuple[str, ...] = (".py",)) -> Iterator[Path]:
+        """
+        Yield project files with one of the given suffixes, in a stable order.
+
+        Args:
+            suffixes: File suffixes to yield; an empty tuple yields every file
+        """
+        stack = [(self.root, "", self.rules)]
+        while stack:
+            directory, rel_dir, rules = stack.pop()
+            if self.use_gitignore:
+                gitignore = directory / ".gitignore"
+                if gitignore.is_file():
+                    rules = rules + parse_ignore_file(gitignore, rel_dir)
+
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+            self._visited(directory)
+
+            subdirs = []
+            for entry in entries:
+                rel_path = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                try:
+                    # Never follow directory symlinks, they can loop back into the tree
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    is_file = not is_dir and entry.is_file()
+                except OSError:
+                    continue
+                if self._is_excluded(rel_path, is_dir, rules):
+                    continue
+                if is_dir:
+                    subdirs.append((Path(entry.path), rel_path, rules))
+                elif is_file and (not suffixes or entry.name.endswith(suffixes)):
+                    yield Path(entry.path)
+
+            # Reversed so that the stack pops directories in sorted order
+            stack.extend(reversed(subdirs))
+
+    def _visited(self, directory: Path):
+        """Called for every directory the walk lists."""
+
+    def find_python_files(self) -> List[Path]:
+        """Return all Python files in the project that are not excluded."""
+        return list(self.walk((".py",)))
+
+
+class CachedProjectWalker(ProjectWalker):
+    """
+    Project walker for long-running processes that remembers its last scan.
+
+    A directory's mtime changes whenever an entry is added, removed or
+    renamed in it, so as long as no listed directory and no .gitignore has
+    changed, the previous file list is still right and is returned without
+    walking the tree again. Edits to the files themselves do not affect the
+    list; they are picked up by the import cache's own checks.
+    """
+
+    def __init__(self, root: Path, excludes: Optional[Iterable[str]] = None,
+                 use_gitignore: bool = True):
+        super().__init__(root, excludes, use_gitignore)
+        self._files: Optional[List[Path]] = None
+        self._stats: Dict[Path, Tuple[int, int]] = {}
+        self._scan_stats: Dict[Path, Tuple[int, int]] = {}
+
+    @staticmethod
+    def _stat(path: Path) -> Tuple[int, int]:
+        try:
+            st = os.stat(path)
+            return st.st_size, st.st_mtime_ns
+        except OSError:
+            return -1, -1
+
+    def _visited(self, directory: Path):
+        self._scan_stats[directory] = self._stat(directory)
+        gitignore = directory / ".gitignore"
+        self._scan_stats[gitignore] = self._stat(gitignore)
+
+    def changed(self) -> bool:
+        """Return True if the last file list may be out of date, or if there is none."""
+        stats = self._stats
+        return self._files is None or any(self._stat(path) != stat for path, stat in stats.items())
+
+    def changed_files(self, since: Dict[Path, Tuple[int, int]]) -> List[Path]:
+        """Return the files of the last scan whose size or mtime differs from a snapshot."""
+        return [path for path in (self._files or []) if self._stat(path) != since.get(path)]
+
+    def file_stats(self) -> Dict[Path, Tuple[int, int]]:
+        """Return the size and mtime of every file of the last scan."""
+        return {path: self._stat(path) for path in (self._files or [])}
+
+    def find_python_files(self) -> List[Path]:
+        if self.changed():
+            self._scan_stats = {}
+            files = super().find_python_files()
+            self._files, self._stats = files, self._scan_stats
+        return list(self._files)
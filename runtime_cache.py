@@ -0,0 +1,252 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import re
+import shutil
+import tempfile
+import threading
+import urllib.request
+import zipfile
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Shared by every project on the machine, like the build daemon's tokens
+DEFAULT_RUNTIME_CACHE = Path.home() / ".auto-python-toolkit" / "runtimes"
+
+# Where the embeddable distributions are published; a mirror has the same layout
+DEFAULT_RUNTIME_MIRROR = "https://www.python.org/ftp/python"
+
+# Directory of the bundled interpreter in a package, next to venv/
+RUNTIME_DIR = "runtime"
+
+# .pth file in the runtime that adds the packaged venv's site-packages as a site directory
+RUNTIME_PTH = "_packaged_venv.pth"
+
+MANIFEST_NAME = "manifest.json"
+
+# Embeddable distribution architecture for each wheel platform tag
+RUNTIME_ARCHES = {
+    "win_amd64": "amd64",
+    "win32": "win32",
+}
+
+# Executed by site for the runtime directory: the venv sits next to it
+_PTH_HOOK = ("import os, site, sys; "
+             "site.addsitedir(os.path.join(sys.prefix, os.pardir, 'venv', 'Lib', 'site-packages'))\n")
+
+
+def runtime_url(mirror: str, py_version: str, arch: str) -> str:
+    """Return the URL of an embeddable distribution, e.g. .../3.14.0/python-3.14.0a6-embed-amd64.zip."""
+    release = re.match(r"\d+\.\d+\.\d+", py_version).group(0)
+    return f"{mirror.rstrip('/')}/{release}/python-{py_version}-embed-{arch}.zip"
+
+
+def _sha256(path: Path) -> Tuple[int, str]:
+    h = hashlib.sha256()
+    size = 0
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+            size += len(chunk)
+    return size, h.hexdigest()
+
+
+class RuntimeCache:
+    """
+    Cache of Windows embeddable Python distributions, one per version and
+    architecture, shared by all builds on the machine.
+
+    Each runtime is downloaded once, unpacked into its own directory and
+    described by a manifest with the size and SHA-256 of every file, so a
+    runtime can be checked before it is packaged. Packages get the runtime
+    as runtime/ next to venv/, with the ._pth file changed to run site and
+    a .pth hook that adds the venv's site-packages: the package then runs
+    without any Python installed on the target and without paths from the
+    build machine.
+    """
+
+    def __init__(self, root: Optional[Path] = None, mirror: Optional[str] = None):
+        self.root = Path(root or DEFAULT_RUNTIME_CACHE)
+        self.mirror = mirror or DEFAULT_RUNTIME_MIRROR
+        if "://" not in self.mirror:
+            # A local directory laid out like the mirror
+            self.mirror = Path(self.mirror).resolve().as_uri()
+        self._locks: Dict[str, threading.Lock] = {}
+        self._locks_guard = threading.Lock()
+
+    @staticmethod
+    def key(py_version: str, platform: str) -> str:
+        return f"{py_version}-{RUNTIME_ARCHES[platform]}"
+
+    def runtime_dir(self, py_version: str, platform: str) -> Path:
+        return self.root / self.key(py_version, platform)
+
+    def _lock(self, key: str) -> threading.Lock:
+        with self._locks_guard:
+            return self._locks.setdefault(key, threading.Lock())
+
+    def _manifest(self, runtime_dir: Path) -> Optional[Dict]:
+        try:
+            with open(runtime_dir / MANIFEST_NAME, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def verify(self, py_version: str, platform: str, full: bool = True) -> List[str]:
+        """
+        Check a cached runtime against its manifest.
+
+        Args:
+            full: Hash every file; otherwise only compare sizes
+
+        Returns:
+            The problems found, empty if the runtime is intact
+        """
+        runtime_dir = self.runtime_dir(py_version, platform)
+        manifest = self._manifest(runtime_dir)
+        if manifest is None:
+            return [f"{runtime_dir}: not cached"]
+        problems = []
+        for rel, (size, digest) in sorted(manifest["files"].items()):
+            path = runtime_dir / rel
+            try:
+                if full:
+                    actual = _sha256(path)
+                    if actual != (size, digest):
+                        problems.append(f"{rel}: content changed")
+                elif path.stat().st_size != size:
+                    problems.append(f"{rel}: size changed")
+            except OSError:
+                problems.append(f"{rel}: missing")
+        return problems
+
+    def cached(self) -> List[Tuple[str, str, Path]]:
+        """Return (version, architecture, directory) of every cached runtime."""
+        runtimes = []
+        if self.root.is_dir():
+            for runtime_dir in sorted(self.root.iterdir()):
+                manifest = self._manifest(runtime_dir)
+                if manifest is not None:
+                    runtimes.append((manifest["version"], manifest["arch"], runtime_dir))
+        return runtimes
+
+    def is_cached(self, py_version: str, platform: str) -> bool:
+        """Whether a runtime is cached and passes a size check."""
+        return not self.verify(py_version, platform, full=False)
+
+    def ensure(self, py_version: str, platform: str, offline: bool = False,
+               on_download: Optional[Callable[[str], None]] = None) -> Path:
+        """
+        Return the directory of a runtime, downloading it first if it is not
+        cached or fails a size check. Builds of the same runtime in this
+        process wait for a single download; a download that races one of
+        another process leaves the first intact runtime in place.
+
+        Args:
+            on_download: Called with the URL before a download starts
+
+        Raises:
+            FileNotFoundError: If the runtime is missing, offline is set and
+                the mirror is not a local directory
+            OSError: If the download fails
+        """
+        key = self.key(py_version, platform)
+        runtime_dir = self.runtime_dir(py_version, platform)
+        with self._lock(key):
+            if self.is_cached(py_version, platform):
+                return runtime_dir
+            url = runtime_url(self.mirror, py_version, RUNTIME_ARCHES[platform])
+            # A local mirror needs no network
+            if offline and not url.startswith("file:"):
+                raise FileNotFoundError(f"Python runtime {key} is not cached ({url})")
+            if on_download is not None:
+                on_download(url)
+            self.root.mkdir(parents=True, exist_ok=True)
+            with tempfile.TemporaryDirectory(prefix=f".{key}-", dir=self.root) as tmp:
+                archive = Path(tmp) / "runtime.zip"
+                with urllib.request.urlopen(url, timeout=60) as response, open(archive, "wb") as f:
+                    shutil.copyfileobj(response, f, 1024 * 1024)
+                unpacked = Path(tmp) / key
+                self._unpack(archive, unpacked, py_version, platform, url)
+                self._install(unpacked, py_version, platform, Path(tmp) / "replaced")
+        return runtime_dir
+
+    def _install(self, unpacked: Path, py_version: str, platform: str, aside: Path):
+        """
+        Move a downloaded runtime into the cache. The lock only covers this
+        process: another build on the machine may have put the same runtime
+        there meanwhile and be packaging from it, so an intact runtime is
+        kept and the download dropped instead.
+        """
+        runtime_dir = self.runtime_dir(py_version, platform)
+        for _ in range(3):
+            if self.is_cached(py_version, platform):
+                return
+            if runtime_dir.exists():
+                # Broken: move it out of the way, so it is never deleted in place
+                try:
+                    os.replace(runtime_dir, aside)
+                except OSError:
+                    continue
+                shutil.rmtree(aside, ignore_errors=True)
+            try:
+                os.replace(unpacked, runtime_dir)
+                return
+            except OSError:
+                # Another build finished its download first
+                continue
+        raise OSError(f"Could not install the Python runtime into {runtime_dir}")
+
+    def _unpack(self, archive: Path, dest: Path, py_version: str, platform: str, source: str):
+        """Extract a downloaded distribution and write its manifest."""
+        try:
+            with zipfile.ZipFile(archive) as zf:
+                for name in zf.namelist():
+                    if name.startswith("/") or ".." in name.split("/"):
+                        raise ValueError(f"Unsafe path in runtime archive: {name}")
+                zf.extractall(dest)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Not a Python runtime archive ({e}): {source}") from None
+        if self.pth_name(dest) is None:
+            raise ValueError(f"Not an embeddable Python distribution, no ._pth file: {source}")
+        files = {}
+        for path in sorted(dest.rglob("*")):
+            if path.is_file():
+                files[path.relative_to(dest).as_posix()] = list(_sha256(path))
+        manifest = {
+            "version": py_version,
+            "arch": RUNTIME_ARCHES[platform],
+            "source": source,
+            "archive_sha256": _sha256(archive)[1],
+            "files": files,
+        }
+        with open(dest / MANIFEST_NAME, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+
+    @staticmethod
+    def pth_name(runtime_dir: Path) -> Optional[str]:
+        """Return the name of the ._pth file that fixes the runtime's sys.path."""
+        return next((p.name for p in sorted(Path(runtime_dir).glob("python*._pth"))), None)
+
+    def package_files(self, runtime_dir: Path) -> Dict[str, bytes]:
+        """
+        Return the files that differ from the cached runtime in a package,
+        relative to runtime/: the ._pth file with site enabled, so .pth files
+        are processed, and the hook that adds the venv. Leave these and the
+        manifest out when adding the runtime itself (package_exclude()).
+        """
+        pth_name = self.pth_name(runtime_dir)
+        lines = (runtime_dir / pth_name).read_text(encoding="utf-8").splitlines()
+        lines = [line for line in lines if line.strip() not in ("import site", "#import site")]
+        lines.append("import site")
+        return {
+            pth_name: ("\r\n".join(lines) + "\r\n").encode("utf-8"),
+            RUNTIME_PTH: _PTH_HOOK.encode("utf-8"),
+        }
+
+    def package_exclude(self, runtime_dir: Path) -> List[str]:
+        """Return the top-level files of a cached runtime that are not packaged as they are."""
+        return [MANIFEST_NAME, *self.package_files(runtime_dir)]
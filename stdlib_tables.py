@@ -0,0 +1,151 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+"""
+Standard library module tables for every Python version the toolkit targets.
+
+The tables describe the target interpreter, not the one running the
+toolkit, so an import is only treated as stdlib if it really ships with
+the Python version being packaged. The 3.11 table is sys.stdlib_module_names
+of CPython 3.11; other versions are derived from it through the modules
+each release added and removed.
+
+Run this module under any CPython 3.10+ to compare its table with the
+running interpreter:
+
+    python stdlib_tables.py
+"""
+
+import functools
+import sys
+from typing import Dict, FrozenSet, Tuple
+
+REFERENCE_VERSION = (3, 11)
+
+# sys.stdlib_module_names of CPython 3.11 (all platforms, test modules excluded)
+_REFERENCE_MODULES = frozenset("""
+    __future__ _abc _aix_support _ast _asyncio _bisect _blake2 _bootsubprocess _bz2 _codecs
+    _codecs_cn _codecs_hk _codecs_iso2022 _codecs_jp _codecs_kr _codecs_tw _collections
+    _collections_abc _compat_pickle _compression _contextvars _crypt _csv _ctypes _curses
+    _curses_panel _datetime _dbm _decimal _elementtree _frozen_importlib
+    _frozen_importlib_external _functools _gdbm _hashlib _heapq _imp _io _json _locale _lsprof
+    _lzma _markupbase _md5 _msi _multibytecodec _multiprocessing _opcode _operator _osx_support
+    _overlapped _pickle _posixshmem _posixsubprocess _py_abc _pydecimal _pyio _queue _random
+    _scproxy _sha1 _sha256 _sha3 _sha512 _signal _sitebuiltins _socket _sqlite3 _sre _ssl _stat
+    _statistics _string _strptime _struct _symtable _thread _threading_local _tkinter _tokenize
+    _tracemalloc _typing _uuid _warnings _weakref _weakrefset _winapi _zoneinfo abc aifc
+    antigravity argparse array ast asynchat asyncio asyncore atexit audioop base64 bdb binascii
+    bisect builtins bz2 cProfile calendar cgi cgitb chunk cmath cmd code codecs codeop
+    collections colorsys compileall concurrent configparser contextlib contextvars copy copyreg
+    crypt csv ctypes curses dataclasses datetime dbm decimal difflib dis distutils doctest email
+    encodings ensurepip enum errno faulthandler fcntl filecmp fileinput fnmatch fractions ftplib
+    functools gc genericpath getopt getpass gettext glob graphlib grp gzip hashlib heapq hmac
+    html http idlelib imaplib imghdr imp importlib inspect io ipaddress itertools json keyword
+    lib2to3 linecache locale logging lzma mailbox mailcap marshal math mimetypes mmap
+    modulefinder msilib msvcrt multiprocessing netrc nis nntplib nt ntpath nturl2path numbers
+    opcode operator optparse os ossaudiodev pathlib pdb pickle pickletools pipes pkgutil
+    platform plistlib poplib posix posixpath pprint profile pstats pty pwd py_compile pyclbr
+    pydoc pydoc_data pyexpat queue quopri random re readline reprlib resource rlcompleter runpy
+    sched secrets select selectors shelve shlex shutil signal site smtpd smtplib sndhdr socket
+    socketserver spwd sqlite3 sre_compile sre_constants sre_parse ssl stat statistics string
+    stringprep struct subprocess sunau symtable sys sysconfig syslog tabnanny tarfile telnetlib
+    tempfile termios textwrap this threading time timeit tkinter token tokenize tomllib trace
+    traceback tracemalloc tty turtle turtledemo types typing unicodedata unittest urllib uu uuid
+    venv warnings wave weakref webbrowser winreg winsound wsgiref xdrlib xml xmlrpc zipapp
+    zipfile zipimport zlib zoneinfo
+""".split())
+
+# Top-level modules added and removed by each minor release
+_CHANGES: Dict[Tuple[int, int], Tuple[FrozenSet[str], FrozenSet[str]]] = {
+    (3, 8): (frozenset({"_posixshmem", "_statistics"}),
+             frozenset({"macpath"})),
+    (3, 9): (frozenset({"graphlib", "zoneinfo", "_zoneinfo", "_peg_parser", "_aix_support",
+                        "_bootsubprocess"}),
+             frozenset({"_dummy_thread", "dummy_threading"})),
+    (3, 10): (frozenset({"_typing"}),
+              frozenset({"formatter", "parser", "symbol", "_peg_parser", "_bootlocale"})),
+    (3, 11): (frozenset({"tomllib"}),
+              frozenset({"binhex"})),
+    (3, 12): (frozenset({"_pydatetime", "_pylong", "_sha2", "_wmi"}),
+              frozenset({"distutils", "imp", "asynchat", "asyncore", "smtpd",
+                         "_bootsubprocess", "_sha256", "_sha512"})),
+    (3, 13): (frozenset({"_android_support", "_colorize", "_interpchannels", "_interpqueues",
+                         "_interpreters", "_ios_support", "_opcode_metadata", "_pyrepl",
+                         "_suggestions", "_sysconfig"}),
+              frozenset({"aifc", "audioop", "cgi", "cgitb", "chunk", "crypt", "imghdr", "lib2to3",
+                         "mailcap", "msilib", "nis", "nntplib", "ossaudiodev", "pipes", "sndhdr",
+                         "spwd", "sunau", "telnetlib", "uu", "xdrlib", "_crypt", "_msi"})),
+    (3, 14): (frozenset({"annotationlib", "compression", "_hmac", "_remote_debugging", "_zstd"}),
+              frozenset()),
+}
+
+OLDEST_VERSION = (3, 7)
+NEWEST_VERSION = max(_CHANGES)
+
+# Packages that bring back modules removed from the standard library under
+# the same import name, for projects that still import them
+REMOVED_MODULE_PACKAGES = {
+    "distutils": "setuptools",
+    "asynchat": "pyasynchat",
+    "asyncore": "pyasyncore",
+    "aifc": "standard-aifc",
+    "audioop": "audioop-lts",
+    "cgi": "legacy-cgi",
+    "cgitb": "legacy-cgi",
+    "chunk": "standard-chunk",
+    "imghdr": "standard-imghdr",
+    "mailcap": "standard-mailcap",
+    "nntplib": "standard-nntplib",
+    "pipes": "standard-pipes",
+    "sndhdr": "standard-sndhdr",
+    "sunau": "standard-sunau",
+    "telnetlib": "standard-telnetlib",
+    "uu": "standard-uu",
+    "xdrlib": "standard-xdrlib",
+}
+
+
+def _minor(py_version: str) -> Tuple[int, int]:
+    """Return (major, minor) of a version string, clamped to the versions with tables."""
+    major, minor = (int(part) for part in py_version.split(".")[:2])
+    return min(max((major, minor), OLDEST_VERSION), NEWEST_VERSION)
+
+
+@functools.lru_cache(maxsize=None)
+def _modules_for(minor: Tuple[int, int]) -> FrozenSet[str]:
+    modules = set(_REFERENCE_MODULES)
+    if minor > REFERENCE_VERSION:
+        for version in sorted(v for v in _CHANGES if REFERENCE_VERSION < v <= minor):
+            added, removed = _CHANGES[version]
+            modules = (modules - removed) | added
+    else:
+        for version in sorted((v for v in _CHANGES if minor < v <= REFERENCE_VERSION), reverse=True):
+            added, removed = _CHANGES[version]
+            modules = (modules - added) | removed
+    return frozenset(modules)
+
+
+def stdlib_modules(py_version: str) -> FrozenSet[str]:
+    """
+    Return the top-level standard library modules of a Python version.
+
+    Args:
+        py_version: Version string such as "3.11.11". Versions outside
+            3.7-3.14 use the table of the nearest supported version.
+    """
+    return _modules_for(_minor(py_version))
+
+
+def removed_module_packages(py_version: str) -> Dict[str, str]:
+    """Return replacement packages for modules that are no longer stdlib in a Python version."""
+    modules = stdlib_modules(py_version)
+    return {name: package for name, package in REMOVED_MODULE_PACKAGES.items() if name not in modules}
+
+
+if __name__ == "__main__":
+    host = "{}.{}".format(*sys.version_info[:2])
+    table = stdlib_modules(host)
+    actual = frozenset(sys.stdlib_module_names)
+    print(f"Python {host}: {len(table)} modules in table, {len(actual)} in sys.stdlib_module_names")
+    print(f"  missing from table: {sorted(actual - table)}")
+    print(f"  not in interpreter: {sorted(table - actual)}")
+    sys.exit(0 if table == actual else 1)
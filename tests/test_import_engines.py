@@ -0,0 +1,129 @@
+import ast
+
+import pytest
+
+from dependency_analyzer import DependencyAnalyzer, ImportVisitor
+from import_scanner import scan_import_statements, scan_imports
+
+CASES = {
+    "conditional": (
+        "import sys\n"
+        "if sys.platform == 'win32':\n"
+        "    import winreg\n"
+        "else:\n"
+        "    import termios, tty as teletype\n",
+        {"sys", "winreg", "termios", "tty"},
+    ),
+    "try_except_import_error": (
+        "try:\n"
+        "    import ujson as json\n"
+        "except ImportError:\n"
+        "    import json\n"
+        "try: from lxml import etree\n"
+        "except ImportError: etree = None\n",
+        {"ujson", "json", "lxml"},
+    ),
+    "type_checking": (
+        "from typing import TYPE_CHECKING\n"
+        "if TYPE_CHECKING: import numpy\n"
+        "if TYPE_CHECKING:\n"
+        "    from pandas.core.frame import DataFrame\n",
+        {"typing", "numpy", "pandas"},
+    ),
+    "function_body": (
+        "def load():\n"
+        "    import yaml; from toml import loads\n"
+        "    return yaml, loads\n",
+        {"yaml", "toml"},
+    ),
+    "relative": (
+        "from . import helper\n"
+        "from .models import User\n"
+        "from ..shared.utils import slugify\n"
+        "from ... import root\n"
+        "from requests.adapters import HTTPAdapter\n",
+        {"requests"},
+    ),
+    "parenthesized": (
+        "from collections import (\n"
+        "    OrderedDict,  # kept for 3.6\n"
+        "    defaultdict as dd,\n"
+        ")\n"
+        "from os.path import (join,\n"
+        " exists)\n",
+        {"collections", "os"},
+    ),
+    "line_continuation": (
+        "import os, \\\n"
+        "    shutil\n"
+        "from urllib.parse import quote, \\\n"
+        "    unquote\n"
+        "import \\\n"
+        "    re\n",
+        {"os", "shutil", "urllib", "re"},
+    ),
+    "strings_and_comments": (
+        "# import commented_out\n"
+        "text = 'import not_a_module'\n"
+        'doc = """\n'
+        "import also_not_a_module\n"
+        'from fake import thing\n'
+        '"""\n'
+        "importer = 'x'  # from elsewhere import nothing\n"
+        "import real\n",
+        {"real"},
+    ),
+    "import_names_in_code": (
+        "import importlib\n"
+        "module = importlib.import_module('plugin')\n"
+        "def f(x):\n"
+        "    yield from x\n"
+        "    raise ValueError() from None\n",
+        {"importlib"},
+    ),
+}
+
+
+def ast_imports(source):
+    visitor = ImportVisitor()
+    visitor.visit(ast.parse(source))
+    return visitor
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_engines_agree(name):
+    source, expected = CASES[name]
+    assert scan_imports(source) == expected
+    assert ast_imports(source).imports == expected
+
+
+@pytest.mark.parametrize("name", sorted(CASES))
+def test_statements_agree(name):
+    source, _ = CASES[name]
+    assert sorted(scan_import_statements(source)) == sorted(ast_imports(source).statements)
+
+
+def test_relative_statements():
+    source, _ = CASES["relative"]
+    assert scan_import_statements(source) == [
+        ("", 1, ("helper",)),
+        ("models", 1, ("User",)),
+        ("shared.utils", 2, ("slugify",)),
+        ("", 3, ("root",)),
+        ("requests.adapters", 0, ("HTTPAdapter",)),
+    ]
+
+
+@pytest.mark.parametrize("engine", ["fast", "ast"])
+def test_untokenizable_source_falls_back_to_regex(engine):
+    # The unclosed bracket defeats the tokenizer and the parser alike
+    source = "import os\nfrom json import loads\nvalues = [1, 2\nimport yaml\n"
+    statements, diagnostics = DependencyAnalyzer._extract_statements(source, engine)
+    assert {module for module, _, _ in statements} == {"os", "json", "yaml"}
+    assert diagnostics and diagnostics[0].startswith("syntax error")
+
+
+@pytest.mark.parametrize("engine", ["fast", "ast"])
+def test_syntax_error_keeps_imports(engine):
+    source = "import os\ndef broken(:\n    pass\nfrom requests import get\n"
+    assert DependencyAnalyzer._extract_imports(source, engine) == {"os", "requests"}
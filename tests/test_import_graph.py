@@ -0,0 +1,65 @@
+from dependency_analyzer import DependencyAnalyzer
+from import_cache import ImportCache
+from import_scanner import scan_mapped_imports
+from project_walker import ProjectWalker
+
+
+def write_project(root):
+    (root / "main.py").write_text("import yaml\nimport pkg.core\n")
+    (root / "pkg").mkdir()
+    (root / "pkg" / "__init__.py").write_text("")
+    padding = "".join(f"VALUE_{i} = {i}\n" for i in range(200))
+    (root / "pkg" / "core.py").write_text("from . import helper\n" + padding)
+    (root / "pkg" / "helper.py").write_text("import requests\n")
+
+
+def test_reachable_through_parsed_file(tmp_path):
+    write_project(tmp_path)
+    analyzer = DependencyAnalyzer()
+    assert analyzer.analyze_project(tmp_path, entry_points=[tmp_path / "main.py"]) == ["pyyaml", "requests"]
+    assert tmp_path / "pkg" / "helper.py" in analyzer.reachable_files
+
+
+def test_reachable_through_mapped_file(tmp_path):
+    write_project(tmp_path)
+    analyzer = DependencyAnalyzer(large_file_size=1000)
+    assert analyzer.analyze_project(tmp_path, entry_points=[tmp_path / "main.py"]) == ["pyyaml", "requests"]
+    assert tmp_path / "pkg" / "helper.py" in analyzer.reachable_files
+    assert analyzer.reachable_files == {tmp_path / "main.py", tmp_path / "pkg" / "__init__.py",
+                                        tmp_path / "pkg" / "core.py", tmp_path / "pkg" / "helper.py"}
+
+
+def test_mapped_scan_statements(tmp_path):
+    path = tmp_path / "generated.py"
+    path.write_text(
+        "import os.path as osp, sys\n"
+        "from . import helper\n"
+        "from ..shared.models import (Model as M,\n"
+        "    Field)\n"
+        "from json import *\n"
+        '"""\nimport hidden\n"""\n'
+        "# import commented\n"
+    )
+    assert scan_mapped_imports(str(path)) == [
+        ("os.path", 0, ()),
+        ("sys", 0, ()),
+        ("", 1, ("helper",)),
+        ("shared.models", 2, ("Model", "Field")),
+        ("json", 0, ("*",)),
+    ]
+
+
+def test_reachable_files_answered_from_cache(tmp_path):
+    write_project(tmp_path)
+    cache_path = tmp_path / ".auto-python-toolkit" / "imports.sqlite"
+    files = ProjectWalker(tmp_path).find_python_files()
+    cache = ImportCache(cache_path, tmp_path, engine="fast")
+    DependencyAnalyzer(cache=cache).analyze_project(tmp_path, files, entry_points=[tmp_path / "main.py"])
+    cache.close()
+
+    cache = ImportCache(cache_path, tmp_path, engine="fast")
+    analyzer = DependencyAnalyzer(cache=cache)
+    assert analyzer.analyze_project(tmp_path, files, entry_points=[tmp_path / "main.py"]) == ["pyyaml", "requests"]
+    assert cache.misses == 0
+    assert cache.hits >= len(analyzer.reachable_files)
+    cache.close()
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from wheelhouse import normalize_name, parse_wheel_filename
+
+LOCK_VERSION = 1
+
+# Inputs that cannot change without recreating the environment
+VENV_INPUTS = ("python", "target", "platform", "uv", "layout")
+
+
+def parse_pins(text: str) -> Dict[str, str]:
+    """
+    Parse pinned requirements, as printed by uv pip compile or uv pip freeze.
+
+    Returns:
+        A dict mapping each normalized project name to its requirement line
+    """
+    pins = {}
+    for line in text.splitlines():
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("-"):
+            continue
+        name = line
+        for sep in ("==", " @ ", "@", ";", "["):
+            name = name.split(sep, 1)[0]
+        pins[normalize_name(name.strip())] = line
+    return pins
+
+
+def pin_version(line: str) -> str:
+    """
+    Return what a requirement line pins: the version, or the URL of a direct
+    reference that is not a wheel. uv pip freeze and uv pip compile spell
+    the same pin differently (markers, "name @ file://...whl" references),
+    so pins are compared by this rather than by their lines.
+    """
+    line = line.split(";", 1)[0].strip()
+    if "==" in line:
+        return line.split("==", 1)[1].lstrip("=").strip().lower()
+    if "@" in line:
+        url = line.split("@", 1)[1].strip()
+        try:
+            return parse_wheel_filename(url.rsplit("/", 1)[-1])[1].lower()
+        except ValueError:
+            return url
+    return line.lower()
+
+
+def same_pins(installed: Dict[str, str], resolved: Dict[str, str]) -> bool:
+    """Whether an environment holds exactly the resolved packages, however they are spelled."""
+    return (installed.keys() == resolved.keys()
+            and all(pin_version(installed[name]) == pin_version(line) for name, line in resolved.items()))
+
+
+def diff_pins(installed: Dict[str, str], resolved: Dict[str, str]) -> Tuple[List[str], List[str]]:
+    """
+    Compare the packages in an environment with the resolved set.
+
+    Returns:
+        (requirement lines to install, project names to uninstall)
+    """
+    to_install = sorted(line for name, line in resolved.items()
+                        if name not in installed or pin_version(installed[name]) != pin_version(line))
+    to_remove = sorted(name for name in installed if name not in resolved)
+    return to_install, to_remove
+
+
+class VenvLock:
+    """
+    Fingerprint of a built virtual environment.
+
+    The fingerprint covers the Python version, the target, the requested
+    dependencies, the uv version and whether the venv was cross-built. The lock also records the pinned
+    packages the requirements resolved to, so a later build can check
+    that the environment still holds exactly those packages and reuse it
+    without resolving or installing anything.
+    """
+
+    def __init__(self, path: Path):
+        self.path = Path(path)
+
+    @staticmethod
+    def fingerprint(inputs: Dict) -> str:
+        data = json.dumps({"version": LOCK_VERSION, **inputs}, sort_keys=True)
+        return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+    def load(self) -> Optional[Dict]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lock = json.load(f)
+        except (OSError, ValueError):
+            return None
+        if not isinstance(lock, dict) or lock.get("version") != LOCK_VERSION:
+            return None
+        return lock
+
+    def save(self, inputs: Dict, resolved: Dict[str, str]):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        lock = {
+            "version": LOCK_VERSION,
+            "fingerprint": self.fingerprint(inputs),
+            "inputs": inputs,
+            "resolved": resolved,
+        }
+        tmp = self.path.with_name(f".{self.path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(lock, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+    @staticmethod
+    def can_update(lock: Optional[Dict], inputs: Dict) -> bool:
+        """Whether an environment built for lock can be brought up to date in place."""
+        return lock is not None and all(lock["inputs"].get(k) == inputs.get(k) for k in VENV_INPUTS)
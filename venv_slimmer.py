@@ -0,0 +1,229 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import os
+import re
+import shutil
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Rules see a path relative to the venv root, split into parts, and whether
+# it is a directory; a matching directory is dropped with everything in it
+
+
+def _site_parts(parts: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """Return the part of a path below site-packages, or None if it is not in site-packages."""
+    if "site-packages" in parts:
+        return parts[parts.index("site-packages") + 1:]
+    return None
+
+
+def _is_dist_info(name: str, projects: Tuple[str, ...]) -> bool:
+    return name.endswith(".dist-info") and name.split("-", 1)[0].lower() in projects
+
+
+def _pycache(parts, is_dir):
+    return (is_dir and parts[-1] == "__pycache__") or (not is_dir and parts[-1].endswith((".pyc", ".pyo")))
+
+
+def _headers(parts, is_dir):
+    return len(parts) == 1 and is_dir and parts[0].lower() == "include"
+
+
+def _docs(parts, is_dir):
+    return len(parts) == 2 and is_dir and parts[0] == "share" and parts[1] in ("doc", "man", "info")
+
+
+def _tools(projects: Tuple[str, ...], scripts: Tuple[str, ...]) -> Callable:
+    def match(parts, is_dir):
+        site = _site_parts(parts)
+        if site is not None:
+            return len(site) == 1 and (site[0].split(".")[0] in projects or _is_dist_info(site[0], projects))
+        return (len(parts) == 2 and parts[0] in ("Scripts", "bin") and not is_dir
+                and re.match(rf"({'|'.join(scripts)})[\d.-]*(\.exe)?$", parts[1]) is not None)
+    return match
+
+
+def _dist_info_files(names: Tuple[str, ...]) -> Callable:
+    def match(parts, is_dir):
+        return not is_dir and len(parts) >= 2 and parts[-2].endswith(".dist-info") and parts[-1] in names
+    return match
+
+
+def _package_dirs(names: Tuple[str, ...]) -> Callable:
+    """Directories inside a package, never a top-level package of the same name."""
+    def match(parts, is_dir):
+        site = _site_parts(parts)
+        return is_dir and site is not None and len(site) >= 2 and site[-1] in names
+    return match
+
+
+def _sources(parts, is_dir):
+    site = _site_parts(parts)
+    return (not is_dir and site is not None
+            and (parts[-1] == "py.typed" or parts[-1].endswith((".pyi", ".pyx", ".pxd", ".c", ".cpp", ".h"))))
+
+
+# name: (description, match)
+RULES: Dict[str, Tuple[str, Callable]] = {
+    "pycache": ("bytecode compiled for the build host", _pycache),
+    "headers": ("C headers (Include/)", _headers),
+    "docs": ("documentation and man pages (share/doc, share/man)", _docs),
+    "installers": ("pip and wheel", _tools(("pip", "wheel"), ("pip", "wheel"))),
+    "dist-info-extras": ("INSTALLER, REQUESTED and direct_url.json metadata",
+                         _dist_info_files(("INSTALLER", "REQUESTED", "direct_url.json"))),
+    "tests": ("test suites inside packages", _package_dirs(("tests", "test"))),
+    "package-docs": ("docs and examples inside packages", _package_dirs(("docs", "doc", "examples"))),
+    "setuptools": ("setuptools and pkg_resources",
+                   _tools(("setuptools", "pkg_resources", "_distutils_hack", "distutils-precedence"),
+                          ("easy_install",))),
+    "sources": ("type stubs and C/Cython sources", _sources),
+    "dist-info-record": ("RECORD files, only needed to uninstall", _dist_info_files(("RECORD",))),
+}
+
+PRESETS = {
+    "safe": ["pycache", "headers", "docs", "installers", "dist-info-extras"],
+    "aggressive": ["pycache", "headers", "docs", "installers", "dist-info-extras",
+                   "tests", "package-docs", "setuptools", "sources", "dist-info-record"],
+}
+
+
+class VenvSlimmer:
+    """
+    Decides which parts of a venv are left out of the package.
+
+    The venv itself is never modified: packaging asks skip() about every
+    directory and file it is about to add, and report() measures what a
+    set of rules would remove without packaging anything.
+    """
+
+    def __init__(self, rules: List[str]):
+        unknown = [rule for rule in rules if rule not in RULES]
+        if unknown:
+            raise ValueError(f"Unknown slimming rules: {', '.join(unknown)} "
+                             f"(presets: {', '.join(PRESETS)}; rules: {', '.join(RULES)})")
+        self.rules = list(dict.fromkeys(rules))
+
+    @classmethod
+    def from_spec(cls, spec: str) -> "VenvSlimmer":
+        """Create a slimmer from a comma separated list of presets and rule names, e.g. "safe,tests"."""
+        rules = []
+        for item in spec.split(","):
+            item = item.strip()
+            rules.extend(PRESETS.get(item, [item] if item else []))
+        return cls(rules)
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[str]:
+        """Return the name of the first rule that removes a path relative to the venv root."""
+        parts = tuple(rel_path.replace("\\", "/").split("/"))
+        for rule in self.rules:
+            if RULES[rule][1](parts, is_dir):
+                return rule
+        return None
+
+    def skip(self, rel_path: str, is_dir: bool) -> bool:
+        return self.match(rel_path, is_dir) is not None
+
+    def counting_skip(self, venv_path: Path, removed: List[int]) -> Callable[[str, bool], bool]:
+        """
+        Return a skip() that also adds the files and bytes it leaves out to
+        removed ([files, bytes]), so packaging can report them without a
+        separate walk over the venv.
+        """
+        def skip(rel_path: str, is_dir: bool) -> bool:
+            if not self.skip(rel_path, is_dir):
+                return False
+            path = Path(venv_path) / rel_path
+            files, size = _tree_size(path) if is_dir else (1, path.stat().st_size)
+            removed[0] += files
+            removed[1] += size
+            return True
+        return skip
+
+    def report(self, venv_path: Path) -> Dict[str, Dict[str, List[int]]]:
+        """
+        Measure what the rules remove from a venv.
+
+        Returns:
+            {"rules": {rule: [files, bytes]}, "packages": {package: [files, bytes]},
+             "total": {"venv": [files, bytes], "removed": [files, bytes]}}
+        """
+        rules: Dict[str, List[int]] = {}
+        packages: Dict[str, List[int]] = {}
+        total = [0, 0]
+        removed = [0, 0]
+
+        def count(counter: Dict[str, List[int]], key: str, size: int):
+            entry = counter.setdefault(key, [0, 0])
+            entry[0] += 1
+            entry[1] += size
+
+        def walk(path: Path, rel: str, rule: Optional[str]):
+            with os.scandir(path) as it:
+                for entry in it:
+                    child = f"{rel}/{entry.name}" if rel else entry.name
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                    child_rule = rule or self.match(child, is_dir)
+                    if is_dir:
+                        walk(Path(entry.path), child, child_rule)
+                        continue
+                    size = entry.stat(follow_symlinks=False).st_size
+                    total[0] += 1
+                    total[1] += size
+                    if child_rule:
+                        removed[0] += 1
+                        removed[1] += size
+                        count(rules, child_rule, size)
+                        count(packages, _package_of(child), size)
+
+        walk(Path(venv_path), "", None)
+        return {"rules": rules, "packages": packages, "total": {"venv": total, "removed": removed}}
+
+
+def _package_of(rel_path: str) -> str:
+    """Return the site-packages entry a path belongs to, without version or extension."""
+    parts = tuple(rel_path.split("/"))
+    site = _site_parts(parts)
+    if not site:
+        return "(venv)"
+    name = site[0]
+    if name.endswith((".dist-info", ".egg-info")):
+        name = name.split("-", 1)[0]
+    elif len(site) == 1:
+        name = name.split(".", 1)[0]
+    return name
+
+
+def _tree_size(path: Path) -> Tuple[int, int]:
+    """Return the number of files under a directory and their total size."""
+    files = size = 0
+    for root, _, names in os.walk(path):
+        for name in names:
+            try:
+                size += os.lstat(os.path.join(root, name)).st_size
+            except OSError:
+                continue
+            files += 1
+    return files, size
+
+
+def prune_copy(slimmer: VenvSlimmer, tree: Path) -> List[int]:
+    """
+    Delete what the rules remove from a staged copy of a venv. Never call this on the venv itself.
+
+    Returns:
+        The [files, bytes] removed
+    """
+    removed = [0, 0]
+    skip = slimmer.counting_skip(tree, removed)
+    for root, dirs, files in os.walk(tree):
+        rel = Path(root).relative_to(tree).as_posix()
+        prefix = "" if rel == "." else rel + "/"
+        for name in list(dirs):
+            if skip(prefix + name, True):
+                shutil.rmtree(Path(root) / name)
+                dirs.remove(name)
+        for name in files:
+            if skip(prefix + name, False):
+                os.remove(Path(root) / name)
+    return removed
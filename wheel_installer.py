@@ -0,0 +1,305 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import configparser
+import csv
+import io
+import os
+import re
+import shutil
+import zipfile
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+from wheelhouse import normalize_name, parse_wheel_filename
+
+# Name written to the INSTALLER file of every distribution installed here
+INSTALLER_NAME = "auto-python-toolkit"
+
+# uv --python-platform values for the wheel platform tags of the targets
+UV_PLATFORMS = {
+    "win_amd64": "x86_64-pc-windows-msvc",
+    "win32": "i686-pc-windows-msvc",
+}
+
+_CPYTHON_TAG_RE = re.compile(r"cp(\d)(\d+)")
+
+# Imported by site at startup from site-packages, which Scripts/activate.bat
+# puts on PYTHONPATH; makes it a site directory so its .pth files run
+SITECUSTOMIZE = (
+    "# Written by auto-python-toolkit: this directory reaches sys.path through\n"
+    "# PYTHONPATH, where .pth files are not processed, so add it as a site directory\n"
+    "import os\n"
+    "import site\n"
+    "\n"
+    "site.addsitedir(os.path.dirname(os.path.abspath(__file__)))\n"
+)
+
+
+def wheel_rank(filename: str, py_version: str, platform: str) -> Optional[Tuple[int, int]]:
+    """
+    Check whether a wheel installs on a CPython version and platform tag.
+
+    Returns:
+        A sort key, lower for more specific wheels (built for this exact
+        platform and version first, pure Python last), or None if the wheel
+        does not fit the target
+    """
+    parts = filename[:-len(".whl")].split("-")
+    if len(parts) not in (5, 6):
+        return None
+    pythons, abis, platforms = (set(tag.split(".")) for tag in parts[-3:])
+    if platform in platforms:
+        platform_rank = 0
+    elif "any" in platforms:
+        platform_rank = 1
+    else:
+        return None
+
+    major, minor = (int(n) for n in py_version.split(".")[:2])
+    cp = f"cp{major}{minor}"
+    best = None
+    for python in pythons:
+        match = _CPYTHON_TAG_RE.fullmatch(python)
+        for abi in abis:
+            if python == cp and abi in (cp, f"{cp}m", "abi3", "none"):
+                rank = 0
+            elif (match and abi == "abi3" and int(match.group(1)) == major
+                  and int(match.group(2)) <= minor):
+                rank = 1
+            elif python in (f"py{major}{minor}", f"py{major}") and abi == "none":
+                rank = 2
+            else:
+                continue
+            best = rank if best is None else min(best, rank)
+    return None if best is None else (platform_rank, best)
+
+
+def find_wheel(files_dir: Path, requirement: str, py_version: str, platform: str) -> Optional[Path]:
+    """Return the best wheel in a directory for a pinned "name==version" requirement."""
+    name, _, version = requirement.split(";", 1)[0].partition("==")
+    name, version = normalize_name(name.split("[", 1)[0].strip()), version.strip()
+    candidates = []
+    for path in Path(files_dir).glob("*.whl"):
+        try:
+            wheel_name, wheel_version = parse_wheel_filename(path.name)
+        except ValueError:
+            continue
+        if wheel_name != name or wheel_version != version:
+            continue
+        rank = wheel_rank(path.name, py_version, platform)
+        if rank is not None:
+            candidates.append((rank, path.name, path))
+    return min(candidates)[2] if candidates else None
+
+
+class WheelInstaller:
+    """
+    Installs wheels into a Windows venv layout by unpacking them, without
+    running any interpreter, so a Linux host can assemble the environment
+    of a Windows target.
+
+    The layout has the directories a Windows venv has (Lib/site-packages,
+    Scripts, Include) and a Scripts/activate.bat that puts site-packages on
+    PYTHONPATH, for a matching Python installed on the target; a
+    sitecustomize module in site-packages then registers it as a site
+    directory, so .pth files such as pywin32's are processed. Wheels are
+    unpacked as the wheel format specifies, with RECORD rewritten to the
+    installed paths so they can be uninstalled again. Console scripts get
+    .cmd wrappers instead of the .exe launchers pip would build.
+    """
+
+    def __init__(self, venv_path: Path):
+        self.venv_path = Path(venv_path)
+        self.site_packages = self.venv_path / "Lib" / "site-packages"
+        self.scripts = self.venv_path / "Scripts"
+
+    def create_layout(self, py_version: str):
+        """Create an empty environment for a target Python version."""
+        self.site_packages.mkdir(parents=True, exist_ok=True)
+        self.scripts.mkdir(exist_ok=True)
+        (self.venv_path / "Include").mkdir(exist_ok=True)
+        (self.venv_path / "pyvenv.cfg").write_text(
+            "include-system-site-packages = false\n"
+            f"version = {py_version}\n"
+            "implementation = CPython\n"
+            f"installer = {INSTALLER_NAME}\n",
+            encoding="utf-8",
+        )
+        (self.scripts / "activate.bat").write_bytes(
+            b"@echo off\r\n"
+            b"for %%I in (\"%~dp0..\") do set \"VIRTUAL_ENV=%%~fI\"\r\n"
+            b"if defined PYTHONPATH (\r\n"
+            b"    set \"PYTHONPATH=%VIRTUAL_ENV%\\Lib\\site-packages;%PYTHONPATH%\"\r\n"
+            b") else (\r\n"
+            b"    set \"PYTHONPATH=%VIRTUAL_ENV%\\Lib\\site-packages\"\r\n"
+            b")\r\n"
+            b"set \"PATH=%VIRTUAL_ENV%\\Scripts;%PATH%\"\r\n"
+        )
+        self.write_site_hook()
+
+    def write_site_hook(self):
+        """Write the sitecustomize module that makes site-packages a site directory."""
+        hook = self.site_packages / "sitecustomize.py"
+        if not hook.is_file() or hook.read_text(encoding="utf-8") != SITECUSTOMIZE:
+            hook.write_text(SITECUSTOMIZE, encoding="utf-8")
+
+    def installed(self) -> Dict[str, str]:
+        """Return the installed distributions as pins, like parse_pins() of uv pip freeze."""
+        pins = {}
+        if not self.site_packages.is_dir():
+            return pins
+        for dist_info in self.site_packages.glob("*.dist-info"):
+            name, _, version = dist_info.name[:-len(".dist-info")].partition("-")
+            name = normalize_name(name)
+            pins[name] = f"{name}=={version}"
+        return pins
+
+    def _dist_info(self, name: str) -> Optional[Path]:
+        name = normalize_name(name)
+        for dist_info in self.site_packages.glob("*.dist-info"):
+            if normalize_name(dist_info.name.partition("-")[0]) == name:
+                return dist_info
+        return None
+
+    def _target(self, base: Path, rel: str) -> Path:
+        target = Path(os.path.normpath(base / rel))
+        if os.path.commonpath([target, self.venv_path]) != str(self.venv_path):
+            raise ValueError(f"Path outside the environment: {rel}")
+        return target
+
+    def install(self, wheel: Path) -> str:
+        """
+        Unpack a wheel into the environment.
+
+        Returns:
+            The normalized name of the installed distribution
+
+        Raises:
+            ValueError: If the file is not a valid wheel
+        """
+        wheel = Path(wheel)
+        name, _ = parse_wheel_filename(wheel.name)
+        try:
+            zf = zipfile.ZipFile(wheel)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"Not a wheel, {e}: {wheel}") from None
+        with zf:
+            members = [info for info in zf.infolist() if not info.is_dir()]
+            dist_info = next((info.filename.split("/")[0] for info in members
+                              if re.fullmatch(r"[^/]+\.dist-info/WHEEL", info.filename)), None)
+            if dist_info is None:
+                raise ValueError(f"Not a wheel, no .dist-info/WHEEL: {wheel}")
+            data_dir = dist_info[:-len(".dist-info")] + ".data"
+            schemes = {
+                "purelib": self.site_packages,
+                "platlib": self.site_packages,
+                "scripts": self.scripts,
+                "headers": self.venv_path / "Include" / name,
+                "data": self.venv_path,
+            }
+
+            hashes = {}
+            record_name = f"{dist_info}/RECORD"
+            if record_name in zf.namelist():
+                for row in csv.reader(io.TextIOWrapper(zf.open(record_name), encoding="utf-8")):
+                    if row:
+                        hashes[row[0]] = row[1:3]
+
+            installed = []
+            for info in members:
+                if info.filename.startswith("/") or ".." in info.filename.split("/"):
+                    raise ValueError(f"Wheel member outside the environment: {info.filename}")
+                top, _, rest = info.filename.partition("/")
+                if top == data_dir:
+                    scheme, _, rest = rest.partition("/")
+                    if scheme not in schemes:
+                        raise ValueError(f"Unknown wheel data scheme {scheme}: {wheel}")
+                    target = self._target(schemes[scheme], rest)
+                else:
+                    target = self._target(self.site_packages, info.filename)
+                target.parent.mkdir(parents=True, exist_ok=True)
+                with zf.open(info) as src, open(target, "wb") as dst:
+                    shutil.copyfileobj(src, dst, 1024 * 1024)
+                installed.append((target, hashes.get(info.filename, ["", ""])))
+
+        dist_dir = self.site_packages / dist_info
+        installed.extend((path, ["", ""]) for path in self._write_scripts(dist_dir))
+        (dist_dir / "INSTALLER").write_text(f"{INSTALLER_NAME}\n", encoding="utf-8")
+        installed.append((dist_dir / "INSTALLER", ["", ""]))
+
+        record = dist_dir / "RECORD"
+        with open(record, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f, lineterminator="\n")
+            for path, (digest, size) in installed:
+                if path == record:
+                    continue
+                writer.writerow([os.path.relpath(path, self.site_packages).replace(os.sep, "/"), digest, size])
+            writer.writerow([f"{dist_info}/RECORD", "", ""])
+        return name
+
+    def _write_scripts(self, dist_dir: Path) -> List[Path]:
+        """Write .cmd wrappers for the console and GUI scripts of a distribution."""
+        entry_points = dist_dir / "entry_points.txt"
+        if not entry_points.is_file():
+            return []
+        parser = configparser.ConfigParser(delimiters=("=",), interpolation=None)
+        parser.optionxform = str
+        try:
+            parser.read(entry_points, encoding="utf-8")
+        except configparser.Error:
+            return []
+
+        written = []
+        for section, python in (("console_scripts", "python"), ("gui_scripts", "pythonw")):
+            if not parser.has_section(section):
+                continue
+            for script, spec in parser.items(section):
+                module, _, attr = spec.split("[", 1)[0].strip().partition(":")
+                call = f"{module}.{attr.strip()}" if attr else f"{module}.main"
+                path = self.scripts / f"{script}.cmd"
+                path.write_bytes(
+                    f"@\"{python}\" -c \"import sys, {module.strip()}; sys.argv[0] = '{script}'; "
+                    f"sys.exit({call.strip()}())\" %*\r\n".encode("utf-8")
+                )
+                written.append(path)
+        return written
+
+    def uninstall(self, name: str) -> bool:
+        """
+        Remove an installed distribution and everything its RECORD lists.
+
+        Returns:
+            True if the distribution was installed
+        """
+        dist_dir = self._dist_info(name)
+        if dist_dir is None:
+            return False
+        parents = set()
+        record = dist_dir / "RECORD"
+        if record.is_file():
+            with open(record, "r", encoding="utf-8", newline="") as f:
+                for row in csv.reader(f):
+                    if not row:
+                        continue
+                    try:
+                        # Relative to site-packages, e.g. ../../Scripts/tool.cmd
+                        path = self._target(self.site_packages, row[0])
+                    except ValueError:
+                        continue
+                    try:
+                        path.unlink()
+                    except FileNotFoundError:
+                        pass
+                    parents.add(path.parent)
+        shutil.rmtree(dist_dir, ignore_errors=True)
+
+        # Drop directories left holding nothing but bytecode, deepest first
+        for parent in sorted(parents, key=lambda p: len(p.parts), reverse=True):
+            while parent != self.site_packages and parent != self.venv_path and parent.is_dir():
+                entries = list(parent.iterdir())
+                if any(entry.name != "__pycache__" for entry in entries):
+                    break
+                shutil.rmtree(parent)
+                parent = parent.parent
+        return True
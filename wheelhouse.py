@@ -0,0 +1,267 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+import functools
+import hashlib
+import html
+import json
+import os
+import re
+import shutil
+import subprocess
+import sys
+import sysconfig
+import threading
+import time
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, TextIO, Tuple
+
+from archive_writer import ArchiveWriter
+
+INDEX_FILE = "index.json"
+
+
+def normalize_name(name: str) -> str:
+    """Normalize a project name as PEP 503 requires."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+def parse_wheel_filename(filename: str) -> Tuple[str, str]:
+    """
+    Return the (normalized name, version) of a wheel file name.
+
+    Raises:
+        ValueError: If the file name is not a valid wheel name
+    """
+    parts = filename[:-len(".whl")].split("-") if filename.endswith(".whl") else []
+    if len(parts) not in (5, 6):
+        raise ValueError(f"Not a wheel file name: {filename}")
+    return normalize_name(parts[0]), parts[1]
+
+
+def python_tag(py_version: str) -> str:
+    """Return the CPython tag for a version, e.g. "3.11.11" -> "cp311"."""
+    major, minor = py_version.split(".")[:2]
+    return f"cp{major}{minor}"
+
+
+def host_platform() -> str:
+    """Return the wheel platform tag of the running interpreter, e.g. "win_amd64"."""
+    return sysconfig.get_platform().replace("-", "_").replace(".", "_")
+
+
+@functools.lru_cache(maxsize=None)
+def _has_pip(python: str) -> bool:
+    try:
+        subprocess.run([python, "-m", "pip", "--version"], check=True, capture_output=True, timeout=60)
+    except (OSError, subprocess.SubprocessError):
+        return False
+    return True
+
+
+class _QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+
+class Wheelhouse:
+    """
+    Local offline wheel cache, one directory per Python version and platform tag.
+
+    Each tag directory holds the wheels in files/ and a PEP 503 simple index
+    in simple/, so it can be used with --find-links, as a file:// index or
+    through serve(). Size, hash and last use of every wheel are tracked in a
+    JSON index at the root, which drives LRU pruning.
+    """
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def tag_dir(self, py_version: str, platform: str) -> Path:
+        return self.root / f"{python_tag(py_version)}-{platform}"
+
+    def files_dir(self, py_version: str, platform: str) -> Path:
+        return self.tag_dir(py_version, platform) / "files"
+
+    def _load_index(self) -> Dict:
+        try:
+            with open(self.root / INDEX_FILE, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {"wheels": {}}
+
+    def _save_index(self, index: Dict):
+        tmp = self.root / f".{INDEX_FILE}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(index, f, indent=2, sort_keys=True)
+        os.replace(tmp, self.root / INDEX_FILE)
+
+    def populate(self, py_version: str, platform: str, requirements: List[str],
+                 log: Optional[TextIO] = None) -> List[str]:
+        """
+        Download binary wheels for the requirements and everything they depend on,
+        for the given target rather than for the host.
+
+        Wheels already in the wheelhouse are reused by pip instead of downloaded again.
+
+        Returns:
+            File names of the wheels that were added
+
+        Raises:
+            FileNotFoundError: If pip is not installed for this Python
+            subprocess.CalledProcessError: If pip cannot resolve or download a requirement
+        """
+        if not _has_pip(sys.executable):
+            raise FileNotFoundError(f"pip is not installed for {sys.executable}; it is needed to download "
+                                    f"wheels (install it with: {sys.executable} -m ensurepip)")
+        files_dir = self.files_dir(py_version, platform)
+        files_dir.mkdir(parents=True, exist_ok=True)
+        before = {p.name for p in files_dir.glob("*.whl")}
+        major, minor = py_version.split(".")[:2]
+        output = {"stdout": log, "stderr": subprocess.STDOUT} if log else {}
+        subprocess.run(
+            [sys.executable, "-m", "pip", "download",
+             "--only-binary=:all:", "--platform", platform,
+             "--python-version", f"{major}.{minor}", "--implementation", "cp",
+             "--dest", str(files_dir), "--find-links", str(files_dir)] + list(requirements),
+            check=True, **output
+        )
+        added = sorted(p.name for p in files_dir.glob("*.whl") if p.name not in before)
+        self.add_files(py_version, platform, added)
+        return added
+
+    def add_files(self, py_version: str, platform: str, filenames: Iterable[str]):
+        """Record wheels placed in a tag's files/ directory and refresh its index."""
+        tag_dir = self.tag_dir(py_version, platform)
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            for name in filenames:
+                path = tag_dir / "files" / name
+                index["wheels"][f"{tag_dir.name}/{name}"] = {
+                    "size": path.stat().st_size,
+                    "sha256": _sha256(path),
+                    "added": now,
+                    "last_used": now,
+                }
+            self._save_index(index)
+            self._write_simple_index(tag_dir, index)
+
+    def _write_simple_index(self, tag_dir: Path, index: Dict):
+        """Regenerate the PEP 503 simple/ pages of a tag directory."""
+        projects = {}
+        prefix = f"{tag_dir.name}/"
+        for key, entry in index["wheels"].items():
+            if key.startswith(prefix):
+                filename = key[len(prefix):]
+                try:
+                    project, _ = parse_wheel_filename(filename)
+                except ValueError:
+                    continue
+                projects.setdefault(project, []).append((filename, entry["sha256"]))
+
+        simple = tag_dir / "simple"
+        if simple.exists():
+            shutil.rmtree(simple)
+        simple.mkdir(parents=True)
+        links = "".join(f'<a href="{p}/">{p}</a><br/>\n' for p in sorted(projects))
+        (simple / "index.html").write_text(_page("Simple index", links), encoding="utf-8")
+        for project, wheels in projects.items():
+            (simple / project).mkdir()
+            links = "".join(
+                f'<a href="../../files/{html.escape(f)}#sha256={digest}">{html.escape(f)}</a><br/>\n'
+                for f, digest in sorted(wheels)
+            )
+            (simple / project / "index.html").write_text(_page(f"Links for {project}", links),
+                                                         encoding="utf-8")
+
+    def mark_used(self, py_version: str, platform: str, venv_path: Path):
+        """Update the last-use time of every wheel installed in a venv."""
+        installed = set()
+        for dist_info in Path(venv_path).glob("**/site-packages/*.dist-info"):
+            name, _, version = dist_info.name[:-len(".dist-info")].partition("-")
+            installed.add((normalize_name(name), version))
+
+        prefix = f"{self.tag_dir(py_version, platform).name}/"
+        now = time.time()
+        with self._lock:
+            index = self._load_index()
+            for key, entry in index["wheels"].items():
+                if key.startswith(prefix):
+                    try:
+                        if parse_wheel_filename(key[len(prefix):]) in installed:
+                            entry["last_used"] = now
+                    except ValueError:
+                        continue
+            self._save_index(index)
+
+    def prune(self, max_bytes: Optional[int] = None, max_age_days: Optional[float] = None) -> Tuple[int, int]:
+        """
+        Delete least recently used wheels until the wheelhouse fits in max_bytes,
+        and any wheel not used for max_age_days.
+
+        Returns:
+            (number of wheels removed, bytes freed)
+        """
+        removed = freed = 0
+        with self._lock:
+            index = self._load_index()
+            entries = sorted(index["wheels"].items(), key=lambda item: item[1]["last_used"])
+            total = sum(entry["size"] for _, entry in entries)
+            cutoff = time.time() - max_age_days * 86400 if max_age_days is not None else None
+            touched = set()
+            for key, entry in entries:
+                too_big = max_bytes is not None and total > max_bytes
+                too_old = cutoff is not None and entry["last_used"] < cutoff
+                if not (too_big or too_old):
+                    continue
+                tag, _, filename = key.partition("/")
+                try:
+                    os.remove(self.root / tag / "files" / filename)
+                except FileNotFoundError:
+                    pass
+                del index["wheels"][key]
+                total -= entry["size"]
+                removed += 1
+                freed += entry["size"]
+                touched.add(tag)
+            self._save_index(index)
+            for tag in touched:
+                self._write_simple_index(self.root / tag, index)
+        return removed, freed
+
+    def export(self, dest: Path):
+        """Write the whole wheelhouse, index included, to a zip for transfer to offline sites."""
+        with ArchiveWriter(dest) as archive:
+            archive.add_tree(self.root, self.root.name)
+
+    def serve(self, host: str = "127.0.0.1", port: int = 0) -> ThreadingHTTPServer:
+        """
+        Create an HTTP server for the wheelhouse, a local stand-in for a package
+        index. Each tag is served at /<tag>/simple/. Call serve_forever() on
+        the result, or use serve_in_background().
+        """
+        handler = functools.partial(_QuietHandler, directory=str(self.root))
+        return ThreadingHTTPServer((host, port), handler)
+
+    def serve_in_background(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[ThreadingHTTPServer, str]:
+        """Start serve() on a daemon thread and return the server and its base URL."""
+        server = self.serve(host, port)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server, f"http://{host}:{server.server_address[1]}"
+
+
+def _sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def _page(title: str, body: str) -> str:
+    return (f"<!DOCTYPE html>\n<html>\n<head><title>{title}</title></head>\n"
+            f"<body>\n<h1>{title}</h1>\n{body}</body>\n</html>\n")